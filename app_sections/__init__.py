@@ -0,0 +1,32 @@
+"""
+أقسام التطبيق التفاعلي، تُستورد عند الطلب
+Sections of the Streamlit app, imported on demand
+
+Every entry of the sidebar maps to a module of this package exposing
+``render()``.  Only the selected section is imported, so a rerun never pays
+for the plotting or simulation imports of the other pages, and a module
+stays in ``sys.modules`` after its first import, so later reruns only call
+``render()``.
+"""
+
+import importlib
+
+# Bounds on the st.cache_data caches of the section modules
+CACHE_MAX_ENTRIES = 32
+CACHE_TTL = 3600  # seconds
+
+SECTIONS = {
+    "🏠 المقدمة والتعريفات": "intro",
+    "📚 أنواع خطأ القياس": "error_types",
+    "⚠️ تأثير خطأ القياس": "impact",
+    "🎯 الفرضيات الإحصائية": "hypotheses",
+    "🔬 منهجية الاختبار": "methodology",
+    "📈 المحاكاة والأمثلة": "simulations",
+    "💻 التطبيق العملي": "application",
+    "📖 ملخص ومراجع": "summary",
+}
+
+
+def render_section(title):
+    """Import the module behind sidebar entry ``title`` and render it."""
+    importlib.import_module(f".{SECTIONS[title]}", __name__).render()
@@ -0,0 +1,363 @@
+"""
+التطبيق العملي
+Practical application
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit as st
+
+from measurementerror.datastore import default_store, open_dataset
+from measurementerror.kernels import KERNELS
+from measurementerror.memory import format_bytes
+from measurementerror.stata import EXAMPLE_COMMAND, EXAMPLE_LOG, report
+from measurementerror.subgroups import Subgroup, in_iqr, subgroup_table, subgroup_tests
+
+from . import CACHE_MAX_ENTRIES, CACHE_TTL
+from .jobs import job_panel, submit
+
+# Choices of the memory ceiling of the test on uploaded data
+MEMORY_BUDGETS = (None, "512MiB", "1GiB", "2GiB", "4GiB")
+
+
+def subgroup_job(dataset, columns, y, x, z, groups, progress, **options):
+    """The subgroup table of the stored dataset, as a background job."""
+    frame = dataset.frame(columns)
+    return subgroup_table(subgroup_tests(frame, y, x, z, groups, progress=progress, **options))
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def admin_earnings_data(n=1000, seed=42):
+    rng = np.random.RandomState(seed)
+    admin_77 = np.clip(rng.lognormal(8.5, 0.7, n), 0, 16500)
+    admin_76 = admin_77 * rng.uniform(0.8, 1.2, n)
+    survey_77 = admin_77 + rng.normal(0, 1000, n)
+    return admin_77, admin_76, survey_77
+
+
+def parse_subgroups(text):
+    """One subgroup per line, "name | condition"; a leading "+" nests it in the previous one.
+
+    The condition is a pandas expression, IQR(column) or empty for all rows.
+    """
+    groups = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        name, _, condition = line.partition("|")
+        name, condition = name.strip(), condition.strip()
+        if condition.upper().startswith("IQR(") and condition.endswith(")"):
+            condition = in_iqr(condition[4:-1].strip().strip("`"))
+        groups.append(Subgroup(name, condition or None, nested=name.startswith("+")))
+    return groups
+
+
+def stored_dataset(uploaded):
+    """The upload in the shared dataset store, converted once per file.
+
+    The store is keyed by content, so every session uploading the same file
+    memory-maps the same columns.
+    """
+    file_id = getattr(uploaded, "file_id", uploaded.name)
+    cached = st.session_state.get('user_dataset')
+    dataset = default_store().get(cached[1]) if cached and cached[0] == file_id else None
+    if dataset is None:
+        with st.spinner("جاري تحويل الملف إلى أعمدة مخزنة..."):
+            dataset = open_dataset(uploaded)
+        st.session_state['user_dataset'] = (file_id, dataset.key)
+    return dataset
+
+
+SUBGROUP_EXAMPLE = """العينة الكاملة |
+الأجور في IQR | IQR(ssearn77)
+الذكور البيض | white == 1 & male == 1
++ أعزب | single == 1
++ عمر [25,65] | age >= 25 & age <= 65
++ دوام كامل (*) | fulltime == 1
++ ثانوية فأكثر | highschool == 1
++ أجور في IQR | IQR(ssearn77)"""
+
+
+def render():
+    st.markdown("""
+    <h1 style="text-align: center; color: #2e8b57;">
+        💻 التطبيق العملي: البيانات الإدارية
+    </h1>
+    <h3 style="text-align: center; color: #888;">
+        Empirical Application: Administrative Earnings Data
+    </h3>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    st.markdown("## 📋 البيانات المستخدمة")
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>مصدر البيانات:</h4>
+        <p><strong>1978 Current Population Survey - Social Security Earnings Records Exact Match File</strong></p>
+        <ul>
+            <li>بيانات مسحية من CPS 1978</li>
+            <li>سجلات الأجور الإدارية من الضمان الاجتماعي</li>
+            <li>إمكانية المطابقة بين المصدرين</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("""
+        <div class="definition-box">
+            <h4>Y: الأجور المسحية</h4>
+            <p>(Survey Earnings 1977)</p>
+            <p>من استبيان CPS</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="warning-box">
+            <h4>X: الأجور الإدارية</h4>
+            <p>(Admin Earnings 1977)</p>
+            <p>من سجلات الضمان الاجتماعي</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown("""
+        <div class="success-box">
+            <h4>Z: الأجور الإدارية السابقة</h4>
+            <p>(Admin Earnings 1976)</p>
+            <p>من سجلات السنة السابقة</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("## 🔬 النموذج الاقتصادي")
+    
+    st.latex(r"""
+    E_2^* = h(E_1^*, U)
+    """)
+    
+    st.markdown("""
+    <div class="term-box">
+        <h4>📖 التفسير:</h4>
+        <ul>
+            <li>$E_2^*$: الأجور الحقيقية في الفترة 2</li>
+            <li>$E_1^*$: الأجور الحقيقية في الفترة 1</li>
+            <li>$U$: صدمات للأجور</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("### نظام القياس:")
+    
+    st.latex(r"""
+    \begin{aligned}
+    A_t &= m_{A_t}(E_t^*, \eta_{A_t}), \quad t = 1, 2 \\
+    S_2 &= m_{S_2}(E_2^*, \eta_{S_2})
+    \end{aligned}
+    """)
+    
+    st.markdown("## ✅ تحقق قيد الاستبعاد")
+    
+    st.markdown("""
+    <div class="key-point">
+        <h4>💡 لماذا يصح قيد الاستبعاد؟</h4>
+        <p>الشرط المطلوب:</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    \eta_{S_2} \perp \!\!\! \perp (\eta_{A_1}, U) \mid E_2^*
+    """)
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>📖 التبرير:</h4>
+        <ul>
+            <li>خطأ القياس في المسح (ηS2) له مصادر مختلفة تماماً عن خطأ القياس الإداري (ηA1)</li>
+            <li>المسح يُجمع بواسطة محققين، في المنزل، في وقت مختلف</li>
+            <li>السجلات الإدارية تُجمع من أصحاب العمل</li>
+            <li>لا يوجد سبب لاعتقاد وجود علاقة مباشرة بين الخطأين</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 📊 نتائج الاختبار")
+    
+    results_empirical = {
+        "العينة": [
+            "العينة الكاملة",
+            "الأجور في IQR",
+            "الذكور البيض",
+            "+ أعزب",
+            "+ عمر [25,65]",
+            "+ دوام كامل (*)",
+            "+ ثانوية فأكثر",
+            "+ أجور في IQR"
+        ],
+        "إحصائية الاختبار": [0.151, 0.401, 0.073, 0.216, 0.009, 0.010, 0.009, 0.053],
+        "p-value": [0.000, 0.000, 0.000, 0.000, 0.012, 0.017, 0.030, 0.012],
+        "القيمة الحرجة 5%": [0.007, 0.024, 0.004, 0.015, 0.007, 0.009, 0.008, 0.037],
+        "حجم العينة": [31228, 15614, 12591, 5043, 1669, 972, 867, 342]
+    }
+    
+    df_empirical = pd.DataFrame(results_empirical)
+    
+    st.dataframe(df_empirical, use_container_width=True, hide_index=True)
+    
+    st.markdown("""
+    <div class="warning-box">
+        <h4>⚠️ الاستنتاج الرئيسي:</h4>
+        <p>نرفض الفرضية الصفرية لعدم وجود خطأ قياس في جميع العينات!</p>
+        <ul>
+            <li>p-values قريبة من الصفر أو صغيرة جداً</li>
+            <li>هناك دليل قوي على وجود خطأ قياس في البيانات الإدارية</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 📈 تصور البيانات")
+    
+    # Simulated data similar to empirical
+    admin_77, admin_76, survey_77 = admin_earnings_data()
+    
+    fig = make_subplots(rows=1, cols=2,
+                       subplot_titles=("توزيع الأجور", "الفرق بين المصدرين"))
+    
+    fig.add_trace(go.Histogram(
+        x=admin_77, name='إداري',
+        marker_color='#20b2aa', opacity=0.7
+    ), row=1, col=1)
+    
+    fig.add_trace(go.Histogram(
+        x=survey_77, name='مسحي',
+        marker_color='#11998e', opacity=0.7
+    ), row=1, col=1)
+    
+    diff = admin_77 - survey_77
+    fig.add_trace(go.Histogram(
+        x=diff, name='الفرق',
+        marker_color='#f5576c', opacity=0.7
+    ), row=1, col=2)
+    
+    fig.update_layout(height=400, template="plotly_white", barmode='overlay')
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("## 💻 كود Stata للاختبار")
+    
+    st.code(f". {EXAMPLE_COMMAND}\n\n{EXAMPLE_LOG}", language="stata")
+    
+    st.markdown("## 📂 تطبيق الاختبار على بياناتك (Your Data)")
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>📥 رفع ملف CSV أو Parquet:</h4>
+        <ul>
+            <li>يُحوَّل الملف مرة واحدة، على دفعات، إلى أعمدة رقمية مخزنة على القرص تتشاركها كل الجلسات</li>
+            <li>تُحذف المشاهدات الناقصة عند الاختبار (بما فيها "." من Stata)؛ الأعمدة النصية تُستبعد</li>
+            <li>يمكن اختيار عدة أعمدة لـ X و Z (نواة جداء ودوال مؤشر متعددة الأبعاد)</li>
+            <li>W1: متغيرات مشروطة إضافية، H0: E[Y | X,W1,Z] = E[Y | X,W1]</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    uploaded = st.file_uploader("ملف البيانات", type=["csv", "parquet"])
+    if uploaded is not None:
+        try:
+            dataset = stored_dataset(uploaded)
+        except (ValueError, ImportError, pd.errors.ParserError) as err:
+            st.error(f"تعذرت قراءة الملف: {err}")
+            return
+        columns = dataset.columns
+        if not columns:
+            st.error("لا توجد أعمدة رقمية في الملف")
+            return
+        st.caption(f"{dataset.rows:,} مشاهدة، {len(columns)} عمود رقمي"
+                   + (f" — أعمدة نصية مستبعدة: {', '.join(dataset.manifest['skipped'])}"
+                      if dataset.manifest['skipped'] else ""))
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            y_col = st.selectbox("Y", columns, index=0)
+        with col2:
+            x_cols = st.multiselect("X", columns, default=columns[1:2])
+        with col3:
+            z_cols = st.multiselect("Z", columns, default=columns[2:3])
+        with col4:
+            w_cols = st.multiselect("W1 (اختياري)", columns)
+        
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            statistic = st.selectbox("الإحصائية", ["CvM", "KS"])
+        with col2:
+            kernel = st.selectbox("النواة", list(KERNELS))
+        with col3:
+            bootnum = st.select_slider("bootnum", [100, 500, 1000, 5000], value=1000)
+        with col4:
+            use_float32 = st.checkbox("float32 (ذاكرة أقل)", value=False)
+        with col5:
+            budget = st.selectbox("سقف الذاكرة", MEMORY_BUDGETS,
+                                  format_func=lambda b: "بلا سقف" if b is None else b)
+        seed = st.text_input("بذرة مسماة (Named seed) — نفس الاسم يعيد نفس سحوبات Bootstrap",
+                             "").strip() or None
+        
+        run_key = (dataset.key, y_col, tuple(x_cols),
+                   tuple(z_cols), tuple(w_cols), statistic, kernel, bootnum, use_float32,
+                   budget, seed)
+        if st.button("🚀 تشغيل الاختبار", type="primary"):
+            try:
+                sample = dataset.sample(y_col, x_cols, z_cols, w=w_cols,
+                                        dtype="float32" if use_float32 else "float64")
+            except (ValueError, ImportError) as err:
+                st.error(f"خطأ: {err}")
+                return
+            
+            # The test runs in the background; reruns pick up the same job
+            submit('user_job', sample.dgmtest, key=("dgmtest", run_key), statistic=statistic,
+                   kernel=kernel, bootnum=bootnum, memory_budget=budget, seed=seed,
+                   measure_memory=True)
+            st.session_state['user_test'] = (run_key, sample.dropped)
+        
+        user_test = st.session_state.get('user_test')
+        job = job_panel('user_job', "Bootstrap")
+        if (job is not None and user_test is not None and user_test[0] == run_key
+                and job.key == ("dgmtest", run_key)):
+            dropped, result = user_test[1], job.result
+            st.caption(f"عدد المشاهدات: {result.n} — محذوفة لنقص القيم: {dropped}")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(result.statistic, f"{result.value:.6f}")
+            with col2:
+                st.metric("القيمة الحرجة 5%", f"{result.critical_value(0.05):.6f}")
+            with col3:
+                st.metric(f"p({result.statistic} < {result.statistic}*)", f"{result.pvalue:.4f}")
+            st.caption(f"bandwidth: {result.bandwidth:.8f} — "
+                       f"ذروة الذاكرة: {format_bytes(result.peak_bytes)}")
+            with st.expander("مخرجات بصيغة Stata (dgmtest)"):
+                st.code(report(result), language="stata")
+        
+        with st.expander("🧩 العينات الفرعية في تمريرة واحدة (Subgroups)"):
+            st.markdown("سطر لكل عينة: `الاسم | الشرط`؛ البادئة `+` تضيف الشرط إلى العينة السابقة.")
+            spec = st.text_area("تعريف العينات", SUBGROUP_EXAMPLE, height=220)
+            if st.button("📋 حساب جدول العينات الفرعية"):
+                try:
+                    groups = parse_subgroups(spec)
+                except ValueError as err:
+                    st.error(f"خطأ: {err}")
+                else:
+                    needed = [c for c in columns
+                              if c in (y_col, *x_cols, *z_cols, *w_cols) or c in spec]
+                    # One test per subgroup: in the background, like the full-sample test
+                    submit('user_subgroup_job', subgroup_job, dataset, needed, y_col, x_cols,
+                           z_cols, groups, key=("subgroups", run_key, spec),
+                           w=w_cols or None, statistic=statistic, kernel=kernel,
+                           bootnum=bootnum, seed=seed, memory_budget=budget)
+            
+            job = job_panel('user_subgroup_job', "العينات الفرعية (Bootstrap)")
+            if job is not None and job.key == ("subgroups", run_key, spec):
+                st.dataframe(job.result.round(4), use_container_width=True, hide_index=True)
@@ -0,0 +1,221 @@
+"""
+أنواع خطأ القياس
+Types of measurement error
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit as st
+
+from . import CACHE_MAX_ENTRIES, CACHE_TTL
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def error_types_data(n=200, seed=42):
+    rng = np.random.RandomState(seed)
+    x_true = rng.uniform(1, 10, n)
+    eta_classical = rng.normal(0, 1, n)
+    eta_nonclassical = rng.normal(0, 0.3 * x_true, n)  # Error increases with x
+    return x_true, eta_classical, eta_nonclassical
+
+
+def render():
+    st.markdown("""
+    <h1 style="text-align: center; color: #2e8b57;">
+        📚 أنواع خطأ القياس
+    </h1>
+    <h3 style="text-align: center; color: #888;">
+        Types of Measurement Error
+    </h3>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    st.markdown("## 🔄 التصنيف الرئيسي لخطأ القياس")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="definition-box">
+            <h3>1️⃣ خطأ القياس الكلاسيكي</h3>
+            <h4>Classical Measurement Error</h4>
+            <hr>
+            <p><strong>التعريف:</strong> خطأ القياس يكون مستقلاً عن:</p>
+            <ul>
+                <li>القيمة الحقيقية للمتغير X*</li>
+                <li>جميع المتغيرات الأخرى في النموذج</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("### الشروط الرياضية:")
+        st.latex(r"""
+        \begin{aligned}
+        E(\eta) &= 0 & \text{(المتوسط صفر)} \\
+        Cov(\eta, X^*) &= 0 & \text{(استقلال عن القيمة الحقيقية)} \\
+        Cov(\eta, \varepsilon) &= 0 & \text{(استقلال عن خطأ النموذج)}
+        \end{aligned}
+        """)
+    
+    with col2:
+        st.markdown("""
+        <div class="warning-box">
+            <h3>2️⃣ خطأ القياس غير الكلاسيكي</h3>
+            <h4>Non-Classical Measurement Error</h4>
+            <hr>
+            <p><strong>التعريف:</strong> خطأ القياس قد يعتمد على:</p>
+            <ul>
+                <li>القيمة الحقيقية للمتغير X*</li>
+                <li>متغيرات أخرى في النموذج</li>
+            </ul>
+            <p><strong>أمثلة:</strong></p>
+            <ul>
+                <li>أصحاب الدخل المرتفع يُبلغون بأقل (Under-reporting)</li>
+                <li>أصحاب الدخل المنخفض يُبلغون بأكثر (Over-reporting)</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("### الصيغة العامة:")
+        st.latex(r"""
+        \eta = \eta(X^*, \text{متغيرات أخرى})
+        """)
+    
+    st.markdown("---")
+    
+    st.markdown("## 📊 مقارنة بصرية بين النوعين")
+    
+    # Classical error vs. non-classical error (depends on x_true)
+    x_true, eta_classical, eta_nonclassical = error_types_data()
+    
+    fig = make_subplots(rows=1, cols=2, 
+                        subplot_titles=("خطأ القياس الكلاسيكي", "خطأ القياس غير الكلاسيكي"))
+    
+    # Classical
+    fig.add_trace(go.Scatter(
+        x=x_true, y=eta_classical,
+        mode='markers',
+        marker=dict(color='#20b2aa', size=8, opacity=0.6),
+        name='كلاسيكي'
+    ), row=1, col=1)
+    
+    fig.add_hline(y=0, line_dash="dash", line_color="red", row=1, col=1)
+    
+    # Non-classical
+    fig.add_trace(go.Scatter(
+        x=x_true, y=eta_nonclassical,
+        mode='markers',
+        marker=dict(color='#f5576c', size=8, opacity=0.6),
+        name='غير كلاسيكي'
+    ), row=1, col=2)
+    
+    fig.add_hline(y=0, line_dash="dash", line_color="red", row=1, col=2)
+    
+    fig.update_xaxes(title_text="X* (القيمة الحقيقية)", row=1, col=1)
+    fig.update_xaxes(title_text="X* (القيمة الحقيقية)", row=1, col=2)
+    fig.update_yaxes(title_text="η (خطأ القياس)", row=1, col=1)
+    fig.update_yaxes(title_text="η (خطأ القياس)", row=1, col=2)
+    
+    fig.update_layout(height=400, template="plotly_white", showlegend=False)
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>📌 لاحظ الفرق:</h4>
+        <ul>
+            <li><strong>الرسم الأيسر (كلاسيكي):</strong> تشتت الخطأ ثابت بغض النظر عن قيمة X* - لا توجد علاقة</li>
+            <li><strong>الرسم الأيمن (غير كلاسيكي):</strong> تشتت الخطأ يزداد مع زيادة X* - علاقة واضحة!</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 📋 أنواع فرعية أخرى لخطأ القياس")
+    
+    tab1, tab2, tab3 = st.tabs(["التصنيف الخاطئ", "خطأ التقريب", "خطأ عدم الاستجابة"])
+    
+    with tab1:
+        st.markdown("""
+        <div class="term-box">
+            <h4>🔀 التصنيف الخاطئ (Misclassification Error)</h4>
+            <p><strong>بالإنجليزية:</strong> Misclassification</p>
+            <hr>
+            <p><strong>التعريف:</strong> يحدث عندما يكون المتغير ثنائياً (0 أو 1) ويتم تصنيف بعض الملاحظات بشكل خاطئ.</p>
+            <p><strong>مثال:</strong></p>
+            <ul>
+                <li>شخص موظف (1) يُسجل كعاطل (0) أو العكس</li>
+                <li>شخص مريض يُشخص كسليم</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.latex(r"""
+        \begin{aligned}
+        P(X=1|X^*=0) &= \alpha_{01} & \text{(احتمال التصنيف الخاطئ من 0 إلى 1)} \\
+        P(X=0|X^*=1) &= \alpha_{10} & \text{(احتمال التصنيف الخاطئ من 1 إلى 0)}
+        \end{aligned}
+        """)
+    
+    with tab2:
+        st.markdown("""
+        <div class="term-box">
+            <h4>🔢 خطأ التقريب (Rounding Error)</h4>
+            <p><strong>بالإنجليزية:</strong> Rounding/Heaping Error</p>
+            <hr>
+            <p><strong>التعريف:</strong> يحدث عندما يميل المستجيبون إلى تقريب إجاباتهم.</p>
+            <p><strong>مثال:</strong></p>
+            <ul>
+                <li>الدخل 48,750 يُبلغ كـ 50,000</li>
+                <li>العمر 37 يُبلغ كـ 35 أو 40</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with tab3:
+        st.markdown("""
+        <div class="term-box">
+            <h4>❓ خطأ عدم الاستجابة (Non-response Error)</h4>
+            <p><strong>بالإنجليزية:</strong> Item Non-response</p>
+            <hr>
+            <p><strong>التعريف:</strong> يحدث عندما يرفض المستجيبون الإجابة على أسئلة معينة.</p>
+            <p><strong>المشكلة:</strong> عدم الاستجابة غالباً ما يكون انتقائياً وليس عشوائياً.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("## 🔍 خطأ القياس التفاضلي vs غير التفاضلي")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="success-box">
+            <h4>✅ خطأ القياس غير التفاضلي</h4>
+            <h5>Non-Differential Measurement Error</h5>
+            <hr>
+            <p><strong>التعريف:</strong> خطأ القياس في X لا يعتمد على Y</p>
+            <p>رياضياً:</p>
+        </div>
+        """, unsafe_allow_html=True)
+        st.latex(r"Y \perp \!\!\! \perp (X, Z) | X^*")
+        st.markdown("بمعنى: X و Z لا يوفران معلومات إضافية عن Y بعد معرفة X*")
+    
+    with col2:
+        st.markdown("""
+        <div class="warning-box">
+            <h4>⚠️ خطأ القياس التفاضلي</h4>
+            <h5>Differential Measurement Error</h5>
+            <hr>
+            <p><strong>التعريف:</strong> خطأ القياس في X يعتمد على Y</p>
+            <p><strong>مثال:</strong> المرضى قد يبلغون عن تعرضهم للعوامل بشكل مختلف عن الأصحاء</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="key-point">
+        <h4>💡 نقطة مهمة من ورقة Wilhelm (2018):</h4>
+        <p>الاختبار المقترح في الورقة يمكنه اكتشاف مجموعة واسعة من نماذج خطأ القياس غير الكلاسيكي، 
+        بما في ذلك العديد من النماذج التي لا يمكن تحديدها (غير قابلة للتعريف - Non-Identified)!</p>
+    </div>
+    """, unsafe_allow_html=True)
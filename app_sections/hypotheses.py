@@ -0,0 +1,262 @@
+"""
+الفرضيات الإحصائية
+Statistical hypotheses
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from measurementerror.gini import gini_test
+from measurementerror.simulation import simulate
+
+from . import CACHE_MAX_ENTRIES, CACHE_TTL
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def gini_example(prob_me, n=500, sigma_me=0.5, seed=0):
+    # Model I with the positive outcome exp(Y), as for earnings
+    x, y, z, _ = simulate("I", n, sigma_me, prob_me, np.random.default_rng(seed))
+    result = gini_test(np.exp(y), x, z, bootnum=500, seed=seed)
+    return result.value, result.critical_value(0.05), result.pvalue
+
+
+def render():
+    st.markdown("""
+    <h1 style="text-align: center; color: #2e8b57;">
+        🎯 الفرضيات الإحصائية للاختبار
+    </h1>
+    <h3 style="text-align: center; color: #888;">
+        Statistical Hypotheses for Testing
+    </h3>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    st.markdown("## 🎪 إطار العمل: ماذا نلاحظ وماذا لا نلاحظ؟")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("""
+        <div class="success-box">
+            <h4>✅ ما نلاحظه:</h4>
+            <ul>
+                <li><strong>Y:</strong> متغير النتيجة</li>
+                <li><strong>X:</strong> القياس الملاحظ</li>
+                <li><strong>Z:</strong> قياس ثانٍ أو أداة</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="warning-box">
+            <h4>❌ ما لا نلاحظه:</h4>
+            <ul>
+                <li><strong>X*:</strong> القيمة الحقيقية</li>
+                <li><strong>η:</strong> خطأ القياس</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown("""
+        <div class="info-box">
+            <h4>🤔 السؤال:</h4>
+            <p>كيف نختبر شيئاً يتعلق بـ X* الذي لا نلاحظه؟</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("## 📝 الفرضية الأولى: عدم وجود خطأ قياس")
+    
+    st.markdown("""
+    <div class="definition-box">
+        <h3>الفرضية الصفرية (Null Hypothesis):</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    H_0^{\text{no ME}}: P(X = X^*) = 1
+    """)
+    
+    st.markdown("""
+    <div class="term-box">
+        <h4>📖 تفسير الفرضية:</h4>
+        <p>نختبر ما إذا كان المتغير الملاحظ X مساوياً للمتغير الحقيقي X* 
+        باحتمال 1 (أي دائماً).</p>
+        <ul>
+            <li>إذا رفضنا H₀: هناك دليل على وجود خطأ قياس</li>
+            <li>إذا لم نرفض H₀: لا يوجد دليل كافٍ على وجود خطأ قياس</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 📝 الفرضية الثانية: عدم تأثير خطأ القياس على دالة معينة")
+    
+    st.markdown("""
+    <div class="definition-box">
+        <h3>فرضية تساوي الدوال (Functional Equality):</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    H_0^{\text{func}}: P\left(E[\Lambda(Y, X) | X^*, X] = 0\right) = 1
+    """)
+    
+    st.markdown("""
+    <div class="term-box">
+        <h4>📖 تفسير الفرضية:</h4>
+        <p>نختبر ما إذا كان خطأ القياس (إن وجد) يؤثر على دالة معينة نهتم بها.</p>
+        <p><strong>أمثلة:</strong></p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    tab1, tab2 = st.tabs(["اختبار تساوي التوقعات الشرطية", "اختبار تساوي معاملات Gini"])
+    
+    with tab1:
+        st.markdown("### تساوي التوقعات الشرطية:")
+        st.latex(r"""
+        P\left(E[Y|X^*] = E[Y|X]\right) = 1
+        """)
+        st.markdown("""
+        **التفسير:** هل التوقع الشرطي لـ Y معطى X* يساوي التوقع الشرطي لـ Y معطى X؟
+        """)
+    
+    with tab2:
+        st.markdown("### تساوي معاملات Gini الشرطية:")
+        st.latex(r"""
+        P\left(G^*_P(X^*) = G_P(X)\right) = 1
+        """)
+        st.markdown("""
+        **التفسير:** هل مقاييس عدم المساواة متساوية سواء استخدمنا X* أو X؟
+        """)
+        st.markdown("""
+        **الاختبار:** بدون خطأ قياس يكون $E[\\psi(Y, X) \\mid X, Z] = 0$ حيث
+        $\\psi = Y\\,(2F(Y|X) - 1 - G(X))$؛ يُقدَّر $G(X)$ بمعامل Gini الموزون بالنواة
+        (مجاميع تراكمية مرتبة، بدون مصفوفة $|Y_i - Y_j|$) ثم يُطبَّق اختبار DGM على $\\psi$.
+        """)
+        prob_me = st.select_slider("1-λ (احتمال خطأ القياس)", [0.0, 0.25, 0.5, 0.75, 1.0],
+                                   value=0.5, key="gini_prob_me")
+        if st.button("🧮 اختبار Gini على بيانات محاكاة (n=500)"):
+            with st.spinner("جاري الحساب..."):
+                value, critical, pvalue = gini_example(prob_me)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("CvM", f"{value:.6f}")
+            col2.metric("القيمة الحرجة 5%", f"{critical:.6f}")
+            col3.metric("p-value", f"{pvalue:.3f}")
+    
+    st.markdown("## 🔑 الفرضية الأساسية: قيد الاستبعاد (Exclusion Restriction)")
+    
+    st.markdown("""
+    <div class="formula-box">
+        <h3>Assumption 1: قيد الاستبعاد</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    Y \perp \!\!\! \perp Z \mid X^*
+    """)
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>📖 تفسير الفرضية:</h4>
+        <p><strong>Y مستقل عن Z شرطياً على X*</strong></p>
+        <p>بمعنى آخر: Z يؤثر على Y فقط من خلال X*، وليس مباشرة.</p>
+        <p><strong>مثال:</strong> إذا كان X* هو التعليم الحقيقي و Z هو المسافة من الجامعة:</p>
+        <ul>
+            <li>المسافة تؤثر على الأجور (Y) فقط من خلال تأثيرها على التعليم (X*)</li>
+            <li>بمجرد معرفة التعليم الحقيقي، المسافة لا تعطي معلومات إضافية عن الأجور</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 💡 الفكرة الأساسية: تحويل الفرضية إلى شيء قابل للاختبار")
+    
+    st.markdown("""
+    <div class="key-point">
+        <h4>🎯 النظرية الأساسية (Theorem 1):</h4>
+        <p>تحت قيد الاستبعاد، الفرضية الصفرية لعدم وجود خطأ قياس:</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    H_0: P(X = X^*) = 1
+    """)
+    
+    st.markdown("### تستلزم (تُضمن) الشرط الملاحظ:")
+    
+    st.latex(r"""
+    Y \perp \!\!\! \perp Z \mid X
+    """)
+    
+    st.markdown("""
+    <div class="success-box">
+        <h4>✨ لماذا هذا مهم؟</h4>
+        <ul>
+            <li>الشرط الثاني يعتمد فقط على المتغيرات الملاحظة (Y, X, Z)</li>
+            <li>يمكننا اختباره مباشرة بدون الحاجة لمعرفة X*</li>
+            <li>إذا رفضنا الشرط الثاني ← نرفض عدم وجود خطأ قياس</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 📊 رسم توضيحي للعلاقات")
+    
+    st.markdown("""
+    ```
+    الحالة بدون خطأ قياس:                    الحالة مع خطأ قياس:
+    
+         Z                                        Z
+         │                                        │
+         ▼                                        ▼
+        X* ────────► Y                           X* ────────► Y
+         │                                        │
+         │ (X = X*)                                │ (X ≠ X*)
+         ▼                                        ▼
+         X                                        X
+         
+    Y ⊥ Z | X ✓                               Y ⊥ Z | X ✗
+    ```
+    """)
+    
+    st.markdown("## 🔄 التكافؤ: متى يكون الاختبار له قوة؟")
+    
+    st.markdown("""
+    <div class="definition-box">
+        <h3>النظرية 2: شروط التكافؤ</h3>
+        <p>تحت الشروط التالية، الفرضية الصفرية مكافئة للشرط الملاحظ:</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    conditions = {
+        "الشرط": [
+            "قيد الاستبعاد الأقوى",
+            "الرتابة (Monotonicity)",
+            "الهيمنة العشوائية من الدرجة الأولى (FOSD)"
+        ],
+        "الصيغة الرياضية": [
+            r"$Y \perp (X, Z) | X^*$",
+            r"$E[\mu(Y)|X^*=x^*]$ رتيبة في $x^*$",
+            r"$P(X^* \geq x^*|X, Z=z_1) \leq P(X^* \geq x^*|X, Z=z_2)$"
+        ],
+        "التفسير": [
+            "X و Z لا يؤثران على Y إلا من خلال X*",
+            "العلاقة بين Y و X* رتيبة (مثل دالة إنتاج)",
+            "Z له علاقة كافية مع X* (شرط الصلة)"
+        ]
+    }
+    
+    df_conditions = pd.DataFrame(conditions)
+    st.dataframe(df_conditions, use_container_width=True, hide_index=True)
+    
+    st.markdown("""
+    <div class="key-point">
+        <h4>💡 أهمية التكافؤ:</h4>
+        <ul>
+            <li><strong>الاتجاه الأول:</strong> H₀ → Y ⊥ Z | X (صلاحية الاختبار)</li>
+            <li><strong>الاتجاه الثاني:</strong> Y ⊥ Z | X → H₀ (قوة الاختبار)</li>
+            <li>بدون التكافؤ، قد يفشل الاختبار في اكتشاف خطأ القياس حتى لو كان موجوداً</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
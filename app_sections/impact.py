@@ -0,0 +1,224 @@
+"""
+تأثير خطأ القياس
+Impact of measurement error (attenuation bias)
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit as st
+
+from . import CACHE_MAX_ENTRIES, CACHE_TTL
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def attenuation_data(n_sim, true_beta, sigma_x, sigma_eta, sigma_eps, seed=42):
+    rng = np.random.RandomState(seed)
+    x_star = rng.normal(0, sigma_x, n_sim)
+    eta = rng.normal(0, sigma_eta, n_sim)
+    eps = rng.normal(0, sigma_eps, n_sim)
+    return x_star, x_star + eta, true_beta * x_star + eps
+
+
+def render():
+    st.markdown("""
+    <h1 style="text-align: center; color: #2e8b57;">
+        ⚠️ تأثير خطأ القياس على التقديرات
+    </h1>
+    <h3 style="text-align: center; color: #888;">
+        Impact of Measurement Error on Estimates
+    </h3>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    st.markdown("## 📉 تحيز التخفيف (Attenuation Bias)")
+    
+    st.markdown("""
+    <div class="definition-box">
+        <h3>🔤 التعريف:</h3>
+        <p><strong>تحيز التخفيف (Attenuation Bias)</strong> هو ميل معاملات الانحدار إلى أن تكون أقرب إلى الصفر 
+        (أي أضعف) عندما يوجد خطأ قياس كلاسيكي في المتغير التفسيري.</p>
+        <p><strong>بالإنجليزية:</strong> The tendency of regression coefficients to be biased toward zero when there is classical measurement error in the explanatory variable.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("### 📐 الاشتقاق الرياضي")
+    
+    st.markdown("#### نبدأ بالنموذج الحقيقي:")
+    st.latex(r"Y = \alpha + \beta X^* + \varepsilon")
+    
+    st.markdown("#### لكننا نلاحظ X بدلاً من X*:")
+    st.latex(r"X = X^* + \eta")
+    
+    st.markdown("#### بالتعويض:")
+    st.latex(r"Y = \alpha + \beta (X - \eta) + \varepsilon = \alpha + \beta X + (\varepsilon - \beta\eta)")
+    
+    st.markdown("#### مقدر OLS يعطي:")
+    st.latex(r"""
+    \hat{\beta}_{OLS} \xrightarrow{p} \frac{Cov(X, Y)}{Var(X)} 
+    = \frac{Cov(X^* + \eta, \beta X^* + \varepsilon)}{Var(X^* + \eta)}
+    """)
+    
+    st.markdown("#### تحت فرضيات خطأ القياس الكلاسيكي:")
+    st.latex(r"""
+    \hat{\beta}_{OLS} \xrightarrow{p} \frac{\beta \cdot Var(X^*)}{Var(X^*) + Var(\eta)} 
+    = \beta \cdot \underbrace{\frac{Var(X^*)}{Var(X^*) + Var(\eta)}}_{\text{عامل التخفيف } \lambda}
+    """)
+    
+    st.markdown("""
+    <div class="formula-box">
+        <h3>📌 النتيجة الرئيسية:</h3>
+        <p>عامل التخفيف (Attenuation Factor):</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    \lambda = \frac{\sigma^2_{X^*}}{\sigma^2_{X^*} + \sigma^2_{\eta}} = \frac{\text{التباين الحقيقي}}{\text{التباين الكلي}}
+    """)
+    
+    st.markdown("""
+    <div class="warning-box">
+        <h4>⚠️ ملاحظات مهمة:</h4>
+        <ul>
+            <li>$0 < \lambda < 1$ دائماً</li>
+            <li>كلما زاد تباين خطأ القياس، قل λ وزاد التحيز</li>
+            <li>المعامل المقدر يكون أقرب للصفر من المعامل الحقيقي</li>
+            <li>هذا يسمى أيضاً <strong>Errors-in-Variables Bias</strong></li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 🎮 محاكاة تفاعلية: شاهد تأثير خطأ القياس")
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        st.markdown("### ⚙️ إعدادات المحاكاة")
+        n_sim = st.slider("حجم العينة (n)", 50, 500, 200, 50)
+        true_beta = st.slider("المعامل الحقيقي (β)", 0.5, 3.0, 1.5, 0.1)
+        sigma_x = st.slider("انحراف X* (σx)", 0.5, 3.0, 1.5, 0.1)
+        sigma_eta = st.slider("انحراف خطأ القياس (ση)", 0.0, 2.0, 0.5, 0.1)
+        sigma_eps = st.slider("انحراف خطأ النموذج (σε)", 0.3, 2.0, 0.5, 0.1)
+    
+    with col2:
+        x_star, x_obs, y = attenuation_data(n_sim, true_beta, sigma_x, sigma_eta, sigma_eps)
+        
+        # True regression
+        slope_true = true_beta
+        
+        # OLS regression (with measurement error)
+        if sigma_eta > 0:
+            slope_ols = np.cov(x_obs, y)[0,1] / np.var(x_obs)
+            lambda_factor = sigma_x**2 / (sigma_x**2 + sigma_eta**2)
+        else:
+            slope_ols = true_beta
+            lambda_factor = 1.0
+        
+        fig = go.Figure()
+        
+        # Scatter plot
+        fig.add_trace(go.Scatter(
+            x=x_obs, y=y,
+            mode='markers',
+            marker=dict(color='#20b2aa', size=8, opacity=0.5),
+            name='البيانات الملاحظة'
+        ))
+        
+        # True line
+        x_line = np.linspace(min(x_obs), max(x_obs), 100)
+        fig.add_trace(go.Scatter(
+            x=x_line, y=true_beta * x_line,
+            mode='lines',
+            line=dict(color='green', width=3),
+            name=f'العلاقة الحقيقية (β = {true_beta})'
+        ))
+        
+        # OLS line
+        fig.add_trace(go.Scatter(
+            x=x_line, y=slope_ols * x_line,
+            mode='lines',
+            line=dict(color='red', width=3, dash='dash'),
+            name=f'خط OLS (β̂ = {slope_ols:.3f})'
+        ))
+        
+        fig.update_layout(
+            title="مقارنة العلاقة الحقيقية مع تقدير OLS",
+            xaxis_title="X (الملاحظ)",
+            yaxis_title="Y",
+            height=450,
+            template="plotly_white",
+            legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Display metrics
+        col_m1, col_m2, col_m3 = st.columns(3)
+        
+        with col_m1:
+            st.metric("المعامل الحقيقي β", f"{true_beta:.3f}")
+        with col_m2:
+            st.metric("المعامل المقدر β̂", f"{slope_ols:.3f}", 
+                     delta=f"{slope_ols - true_beta:.3f}")
+        with col_m3:
+            st.metric("عامل التخفيف λ", f"{lambda_factor:.3f}")
+    
+    st.markdown("## 📊 نسبة الإشارة إلى الضوضاء (Signal-to-Noise Ratio)")
+    
+    st.latex(r"""
+    SNR = \frac{Var(X^*)}{Var(\eta)} = \frac{\sigma^2_{X^*}}{\sigma^2_{\eta}}
+    """)
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>📌 العلاقة مع عامل التخفيف:</h4>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    \lambda = \frac{SNR}{1 + SNR}
+    """)
+    
+    st.markdown("### 📈 تأثير SNR على التحيز")
+    
+    snr_values = np.linspace(0.1, 10, 100)
+    lambda_values = snr_values / (1 + snr_values)
+    bias_percent = (1 - lambda_values) * 100
+    
+    fig = make_subplots(rows=1, cols=2, 
+                        subplot_titles=("عامل التخفيف λ", "نسبة التحيز %"))
+    
+    fig.add_trace(go.Scatter(
+        x=snr_values, y=lambda_values,
+        mode='lines',
+        line=dict(color='#11998e', width=3),
+        name='λ'
+    ), row=1, col=1)
+    
+    fig.add_trace(go.Scatter(
+        x=snr_values, y=bias_percent,
+        mode='lines',
+        line=dict(color='#f5576c', width=3),
+        name='التحيز %'
+    ), row=1, col=2)
+    
+    fig.update_xaxes(title_text="SNR", row=1, col=1)
+    fig.update_xaxes(title_text="SNR", row=1, col=2)
+    fig.update_yaxes(title_text="λ", row=1, col=1)
+    fig.update_yaxes(title_text="نسبة التحيز %", row=1, col=2)
+    
+    fig.update_layout(height=400, template="plotly_white", showlegend=False)
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("""
+    <div class="key-point">
+        <h4>💡 الخلاصة:</h4>
+        <ul>
+            <li>عندما SNR = 1 (تباين الإشارة = تباين الضوضاء): λ = 0.5 أي تحيز 50%!</li>
+            <li>للحصول على تحيز أقل من 10%: نحتاج SNR > 9</li>
+            <li>لذلك من المهم جداً اختبار وجود خطأ القياس قبل التحليل</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
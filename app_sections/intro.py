@@ -0,0 +1,218 @@
+"""
+المقدمة والتعريفات
+Introduction and definitions
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from . import CACHE_MAX_ENTRIES, CACHE_TTL
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def observed_vs_true_data(n_points=100, seed=42):
+    rng = np.random.RandomState(seed)
+    x_true = rng.uniform(0, 10, n_points)
+    measurement_error = rng.normal(0, 1.5, n_points)
+    return x_true, measurement_error, x_true + measurement_error
+
+
+def render():
+    st.markdown("""
+    <h1 style="text-align: center; color: #2e8b57; font-size: 2.5em;">
+        🔍 اختبار وجود خطأ القياس في المتغيرات التفسيرية
+    </h1>
+    <h3 style="text-align: center; color: #888;">
+        Testing for the Presence of Measurement Error
+    </h3>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Quote from Griliches
+    st.markdown("""
+    <div class="definition-box">
+        <h3>💬 اقتباس مهم من Griliches (1986)</h3>
+        <p style="font-style: italic; font-size: 1.1em;">
+        "الاقتصاديون القياسيون لديهم موقف متناقض تجاه البيانات الاقتصادية. على مستوى واحد، 
+        'البيانات' هي العالم الذي نريد تفسيره، الحقائق الأساسية التي يدّعي الاقتصاديون توضيحها. 
+        وعلى مستوى آخر، هي مصدر كل مشاكلنا. عدم كمالها يجعل عملنا صعباً وأحياناً مستحيلاً."
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 📖 ما هو خطأ القياس؟ (Measurement Error)")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="term-box">
+            <h4>🔤 التعريف بالعربية:</h4>
+            <p><strong>خطأ القياس</strong> هو الفرق بين القيمة الحقيقية للمتغير والقيمة المُلاحظة أو المُقاسة.</p>
+            <p>بمعنى آخر: عندما نقيس شيئاً ما، القيمة التي نحصل عليها قد تختلف عن القيمة الحقيقية.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="term-box">
+            <h4>🔤 Definition in English:</h4>
+            <p><strong>Measurement Error</strong> is the difference between the true value of a variable and its observed or measured value.</p>
+            <p>In other words: what we measure may differ from the actual truth.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("### 📐 الصيغة الرياضية الأساسية")
+    
+    st.latex(r"""
+    \underbrace{X}_{\text{القيمة الملاحظة}} = \underbrace{X^*}_{\text{القيمة الحقيقية}} + \underbrace{\eta}_{\text{خطأ القياس}}
+    """)
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>📌 تفسير المعادلة:</h4>
+        <ul>
+            <li><strong>X (القيمة الملاحظة - Observed Value):</strong> ما نراه في البيانات</li>
+            <li><strong>X* (القيمة الحقيقية - True Value):</strong> القيمة الفعلية التي نريد قياسها</li>
+            <li><strong>η (خطأ القياس - Measurement Error):</strong> الفرق بين الاثنين</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 🎯 لماذا نهتم بخطأ القياس؟")
+    
+    st.markdown("""
+    <div class="warning-box">
+        <h4>⚠️ المشكلة الرئيسية:</h4>
+        <p>خطأ القياس في المتغيرات التفسيرية (المستقلة) يؤدي إلى:</p>
+        <ul>
+            <li>تقديرات منحازة (Biased Estimates)</li>
+            <li>استنتاجات إحصائية خاطئة</li>
+            <li>قرارات سياسية مبنية على معلومات غير دقيقة</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 📋 مصادر خطأ القياس (حسب Griliches)")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="example-box">
+            <h4>1️⃣ النموذج الخاطئ (Wrong Model)</h4>
+            <p><strong>بالإنجليزية:</strong> Model Misspecification</p>
+            <hr>
+            <p>معظم النماذج الاقتصادية تهمل بعض الاحتكاكات مثل:</p>
+            <ul>
+                <li>المنافسة غير الكاملة (Imperfect Competition)</li>
+                <li>تكاليف التعديل (Adjustment Costs)</li>
+                <li>عدم الانتباه (Inattention)</li>
+                <li>سوء تقدير الأسعار (Price Misperceptions)</li>
+            </ul>
+            <p>هذا يجعل الاختيار الأمثل في نموذج الباحث يختلف عن الاختيار الملاحظ في الواقع.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="example-box">
+            <h4>2️⃣ البيانات لا تقيس ما يُفترض (Poor Measurement)</h4>
+            <p><strong>بالإنجليزية:</strong> Data Quality Issues</p>
+            <hr>
+            <p>أمثلة:</p>
+            <ul>
+                <li>درجات الاختبارات قد لا تقيس المهارات الحقيقية</li>
+                <li>الأجور المُبلغ عنها في الاستبيانات تحتوي أخطاء</li>
+                <li>البيانات الإدارية قد تكون غير دقيقة</li>
+                <li>أخطاء في إدخال البيانات</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("## 🔬 أمثلة تطبيقية من الأدب الاقتصادي")
+    
+    examples_data = {
+        "المجال": [
+            "نظرية الاستثمار (Investment Theory)",
+            "تكوين المهارات (Skill Formation)", 
+            "عوائد التعليم (Returns to Education)",
+            "تأثير النقابات (Union Effects)"
+        ],
+        "المتغير الحقيقي X*": [
+            "Marginal q (q الهامشي)",
+            "المهارات الحقيقية",
+            "سنوات التعليم الفعلية",
+            "حالة العضوية النقابية الفعلية"
+        ],
+        "المتغير الملاحظ X": [
+            "Average q (q المتوسط)",
+            "درجات الاختبارات",
+            "سنوات التعليم المُبلغ عنها",
+            "العضوية المُبلغ عنها"
+        ],
+        "المصدر": [
+            "Hayashi (1982)",
+            "Cunha et al. (2010)",
+            "Kane & Rouse (1995)",
+            "Card (1996)"
+        ]
+    }
+    
+    df_examples = pd.DataFrame(examples_data)
+    st.dataframe(df_examples, use_container_width=True, hide_index=True)
+    
+    st.markdown("## 📊 تصور بصري: الفرق بين القيم الحقيقية والملاحظة")
+    
+    # Interactive visualization
+    x_true, measurement_error, x_observed = observed_vs_true_data()
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=x_true, y=x_observed,
+        mode='markers',
+        marker=dict(
+            size=10,
+            color=measurement_error,
+            colorscale='RdYlBu',
+            showscale=True,
+            colorbar=dict(title="خطأ القياس")
+        ),
+        text=[f"الحقيقي: {t:.2f}<br>الملاحظ: {o:.2f}<br>الخطأ: {e:.2f}" 
+              for t, o, e in zip(x_true, x_observed, measurement_error)],
+        hoverinfo='text',
+        name='الملاحظات'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=[0, 10], y=[0, 10],
+        mode='lines',
+        line=dict(color='red', dash='dash', width=2),
+        name='خط المساواة (لا خطأ)'
+    ))
+    
+    fig.update_layout(
+        title="العلاقة بين القيم الحقيقية والملاحظة",
+        xaxis_title="X* (القيمة الحقيقية - True Value)",
+        yaxis_title="X (القيمة الملاحظة - Observed Value)",
+        height=500,
+        template="plotly_white"
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("""
+    <div class="success-box">
+        <h4>🎓 ملاحظات على الرسم:</h4>
+        <ul>
+            <li>الخط الأحمر المتقطع يمثل الحالة المثالية حيث لا يوجد خطأ قياس (X = X*)</li>
+            <li>النقاط الزرقاء: قياس أقل من الحقيقة (Under-reporting)</li>
+            <li>النقاط الحمراء: قياس أكثر من الحقيقة (Over-reporting)</li>
+            <li>كلما ابتعدت النقطة عن الخط، زاد خطأ القياس</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,58 @@
+"""
+المهام الجارية في الخلفية
+Background jobs of the app
+
+Long computations are submitted to one :class:`measurementerror.jobs.JobManager`
+shared by all sessions; a page keeps only the job ID in ``st.session_state``.
+While the job runs, :func:`job_panel` shows its progress in a fragment that
+reruns on its own every ``POLL_SECONDS``, so the rest of the page stays
+usable, and reruns the whole page once the job has finished.  A page can
+also draw the job's partial result there as it is refined.
+"""
+
+import streamlit as st
+
+from measurementerror.jobs import CANCELLED, DONE, FAILED, JobManager
+
+POLL_SECONDS = 1.0
+
+
+@st.cache_resource
+def manager():
+    return JobManager()
+
+
+def submit(state_key, function, *args, key=None, **kwargs):
+    """Submit ``function`` and remember its job ID under ``state_key``."""
+    st.session_state[state_key] = manager().submit(function, *args, key=key, **kwargs)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _progress(job_id, label, partial):
+    job = manager().get(job_id)
+    if job is None or not job.running:
+        st.rerun()
+    text = f"{label}: {job.done}/{job.total}" if job.total else label
+    st.progress(job.fraction, text=text)
+    if st.button("⏹️ إلغاء (Cancel)", key=f"cancel-{job_id}"):
+        job.cancel()
+    if partial is not None and job.partial is not None:
+        partial(job.partial)
+
+
+def job_panel(state_key, label, partial=None):
+    """Progress of the job stored under ``state_key``; the job once it is done, else None.
+
+    ``partial``, if given, is called with the job's partial result while it runs.
+    """
+    job_id = st.session_state.get(state_key)
+    job = manager().get(job_id) if job_id is not None else None
+    if job is None:
+        return None
+    if job.running:
+        _progress(job_id, label, partial)
+    elif job.status == CANCELLED:
+        st.warning("⏹️ أُلغيت المهمة (Cancelled)")
+    elif job.status == FAILED:
+        st.error(f"خطأ: {job.error}")
+    return job if job.status == DONE else None
@@ -0,0 +1,370 @@
+"""
+منهجية الاختبار
+Test methodology
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from measurementerror.bandwidth import cv_scores, plugin_bandwidth, select_bandwidth
+from measurementerror.kernels import KERNELS
+from measurementerror.simulation import simulate
+from measurementerror.sweep import bandwidth_sweep
+
+from . import CACHE_MAX_ENTRIES, CACHE_TTL
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def bandwidth_curve(model, n, kernel, target, seed=42):
+    x, y, _, _ = simulate(model, n, 0.5, 0.5, np.random.default_rng(seed))
+    x = x / x.std()
+    grid, scores = cv_scores(x, y, kernel, target=target)
+    return {
+        'grid': grid, 'scores': scores,
+        'rot': select_bandwidth(y, x, "rot"),
+        'lscv': select_bandwidth(y, x, "lscv", kernel, target),
+        'plugin': plugin_bandwidth(x, y, kernel, target),
+    }
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def pvalue_curve(model, n, kernel, statistic, bootnum, seed=42):
+    x, y, z, _ = simulate(model, n, 0.5, 0.5, np.random.default_rng(seed))
+    results = bandwidth_sweep(y, x, z, statistic=statistic, kernel=kernel,
+                              bootnum=bootnum, seed=seed)
+    return pd.DataFrame({
+        'h': [r.bandwidth for r in results],
+        'statistic': [r.value for r in results],
+        'pvalue': [r.pvalue for r in results],
+        'critical_5': [r.critical_value(0.05) for r in results],
+    })
+
+
+def render():
+    st.markdown("""
+    <h1 style="text-align: center; color: #2e8b57;">
+        🔬 منهجية الاختبار
+    </h1>
+    <h3 style="text-align: center; color: #888;">
+        Test Methodology (Delgado & Gonzalez Manteiga, 2001)
+    </h3>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    st.markdown("## 📋 الخطوات الأساسية للاختبار")
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>🎯 الهدف:</h4>
+        <p>اختبار الاستقلال الشرطي:</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    H_0: E[Y|X, Z] = E[Y|X] \quad \text{(تقريباً في كل مكان)}
+    """)
+    
+    st.markdown("### الخطوة 1️⃣: إعادة صياغة الفرضية")
+    
+    st.markdown("""
+    <div class="term-box">
+        <p>نعيد صياغة الفرضية الصفرية كالتالي:</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    H_0: E[T(X, Z)] = 0
+    """)
+    
+    st.markdown("حيث:")
+    
+    st.latex(r"""
+    T(x, z) = E\left[f_X(X)\{Y - E[Y|X]\}\mathbf{1}\{X \leq x\}\mathbf{1}\{Z \leq z\}\right]
+    """)
+    
+    st.markdown("""
+    <div class="term-box">
+        <h4>📖 شرح المكونات:</h4>
+        <ul>
+            <li><strong>f_X(X):</strong> دالة الكثافة للمتغير X</li>
+            <li><strong>Y - E[Y|X]:</strong> البواقي (residuals) من انحدار Y على X</li>
+            <li><strong>1{X ≤ x}:</strong> دالة مؤشر (indicator function)</li>
+            <li><strong>1{Z ≤ z}:</strong> دالة مؤشر أخرى</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("### الخطوة 2️⃣: حساب إحصائية الاختبار")
+    
+    st.markdown("""
+    <div class="formula-box">
+        <h4>النظير التجريبي (Empirical Analogue):</h4>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    T_n(x, z) = \frac{1}{n^2} \sum_{i=1}^{n} \sum_{j=1}^{n} \frac{1}{h} K\left(\frac{X_i - X_j}{h}\right)
+    (Y_i - Y_j) \mathbf{1}\{X_i \leq x\}\mathbf{1}\{Z_i \leq z\}
+    """)
+    
+    st.markdown("""
+    <div class="term-box">
+        <h4>📖 شرح المكونات:</h4>
+        <ul>
+            <li><strong>n:</strong> حجم العينة</li>
+            <li><strong>h:</strong> معلمة النطاق (bandwidth)</li>
+            <li><strong>K(·):</strong> دالة النواة (kernel function)</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("### الخطوة 3️⃣: اختيار نوع إحصائية الاختبار")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="success-box">
+            <h4>📊 إحصائية Cramér-von Mises (CvM)</h4>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.latex(r"""
+        T_n^{CvM} = n \int T_n(x, z)^2 \, dF_n(x, z) = \sum_{i=1}^{n} T_n(X_i, Z_i)^2
+        """)
+        st.caption("بمقياس dgmtest في Stata: توزيعها تحت H0 لا يكبر مع n "
+                   "(Stata's dgmtest scale: the null distribution does not grow with n)")
+        
+        st.markdown("""
+        <p><strong>المميزات:</strong></p>
+        <ul>
+            <li>تجمع المعلومات من كل نقاط البيانات</li>
+            <li>أكثر استقراراً</li>
+        </ul>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="warning-box">
+            <h4>📊 إحصائية Kolmogorov-Smirnov (KS)</h4>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.latex(r"""
+        T_n^{KS} = \sup_{x,z} |\sqrt{n} T_n(x, z)|
+        """)
+        
+        st.markdown("""
+        <p><strong>المميزات:</strong></p>
+        <ul>
+            <li>تركز على أقصى انحراف</li>
+            <li>حساسة للانحرافات المحلية</li>
+        </ul>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("### الخطوة 4️⃣: حساب القيم الحرجة باستخدام Bootstrap")
+    
+    st.markdown("""
+    <div class="definition-box">
+        <h3>طريقة Multiplier Bootstrap:</h3>
+        <p>نولد عينات Bootstrap باستخدام متغير مضاعف V له:</p>
+        <ul>
+            <li>E[V] = 0</li>
+            <li>Var[V] = 1</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("#### توزيع Mammen (الافتراضي):")
+    
+    st.latex(r"""
+    V = \begin{cases}
+    \frac{-(\sqrt{5}-1)}{2} & \text{باحتمال } p = \frac{\sqrt{5}+1}{2\sqrt{5}} \\[10pt]
+    \frac{\sqrt{5}+1}{2} & \text{باحتمال } 1-p
+    \end{cases}
+    """)
+    
+    st.markdown("### الخطوة 5️⃣: اتخاذ القرار")
+    
+    st.markdown("""
+    <div class="key-point">
+        <h4>🎯 قاعدة القرار:</h4>
+        <ul>
+            <li>إذا كانت إحصائية الاختبار > القيمة الحرجة ← نرفض H₀</li>
+            <li>إذا كانت إحصائية الاختبار ≤ القيمة الحرجة ← لا نرفض H₀</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 🔧 اختيار دالة النواة (Kernel Function)")
+    
+    kernels_data = {
+        "النواة": ["Epanechnikov", "Gaussian", "Uniform", "Triangular", "Biweight"],
+        "الصيغة": [
+            r"$\frac{3}{4}(1-u^2)\mathbf{1}_{|u|\leq 1}$",
+            r"$\frac{1}{\sqrt{2\pi}}e^{-u^2/2}$",
+            r"$\frac{1}{2}\mathbf{1}_{|u|\leq 1}$",
+            r"$(1-|u|)\mathbf{1}_{|u|\leq 1}$",
+            r"$\frac{15}{16}(1-u^2)^2\mathbf{1}_{|u|\leq 1}$"
+        ],
+        "الخصائص": [
+            "الأمثل نظرياً (Optimal)",
+            "سلس، دعم غير محدود",
+            "بسيط، غير سلس",
+            "سلس، دعم محدود",
+            "أكثر سلاسة من Epanechnikov"
+        ]
+    }
+    
+    df_kernels = pd.DataFrame(kernels_data)
+    st.dataframe(df_kernels, use_container_width=True, hide_index=True)
+    
+    # Visualize kernels
+    st.markdown("### 📈 تصور دوال النواة")
+    
+    u = np.linspace(-2, 2, 200)
+    
+    fig = go.Figure()
+    
+    # Epanechnikov
+    k_epan = np.where(np.abs(u) <= 1, 0.75 * (1 - u**2), 0)
+    fig.add_trace(go.Scatter(x=u, y=k_epan, name='Epanechnikov', 
+                             line=dict(width=2)))
+    
+    # Gaussian
+    k_gauss = (1/np.sqrt(2*np.pi)) * np.exp(-u**2/2)
+    fig.add_trace(go.Scatter(x=u, y=k_gauss, name='Gaussian', 
+                             line=dict(width=2)))
+    
+    # Uniform
+    k_uniform = np.where(np.abs(u) <= 1, 0.5, 0)
+    fig.add_trace(go.Scatter(x=u, y=k_uniform, name='Uniform', 
+                             line=dict(width=2)))
+    
+    # Triangular
+    k_tri = np.where(np.abs(u) <= 1, 1 - np.abs(u), 0)
+    fig.add_trace(go.Scatter(x=u, y=k_tri, name='Triangular', 
+                             line=dict(width=2)))
+    
+    fig.update_layout(
+        title="مقارنة دوال النواة المختلفة",
+        xaxis_title="u",
+        yaxis_title="K(u)",
+        height=400,
+        template="plotly_white"
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("## 📏 اختيار معلمة النطاق (Bandwidth)")
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>القاعدة الافتراضية (Rule of Thumb):</h4>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.latex(r"""
+    h = n^{-1/(3q)}
+    """)
+    
+    st.markdown("""
+    حيث:
+    - n: حجم العينة
+    - q: بُعد المتغير (X, W₁)
+    """)
+    
+    st.markdown("""
+    <div class="warning-box">
+        <h4>⚠️ تحذير:</h4>
+        <p>اختيار h مهم جداً:</p>
+        <ul>
+            <li>h صغير جداً → تباين عالي</li>
+            <li>h كبير جداً → تحيز عالي</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("### 📐 اختيار h من البيانات (Data-Driven Bandwidth)")
+    
+    st.markdown("""
+    <div class="info-box">
+        <h4>بدائل القاعدة الافتراضية:</h4>
+        <ul>
+            <li><strong>LSCV:</strong> التحقق المتقاطع بترك مشاهدة واحدة، على شبكة كاملة من قيم h في تمريرة واحدة</li>
+            <li><strong>Plug-in:</strong> قاعدة Ruppert-Sheather-Wand لـ E[Y|X] أو المرجع الطبيعي لـ f_X</li>
+            <li>في dgmtest: <code>bw="lscv"</code> أو <code>bw="plugin"</code></li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        bw_model = st.selectbox("النموذج", ["I", "II", "III", "IV"], key="bw_model")
+    with col2:
+        bw_n = st.selectbox("n", [200, 500, 2682], index=2, key="bw_n")
+    with col3:
+        bw_kernel = st.selectbox("النواة", list(KERNELS), key="bw_kernel")
+    with col4:
+        bw_target = st.radio("الهدف", ["regression", "density"], key="bw_target",
+                             format_func=lambda t: "E[Y|X]" if t == "regression" else "f_X")
+    
+    curve = bandwidth_curve(bw_model, bw_n, bw_kernel, bw_target)
+    finite = np.isfinite(curve['scores'])
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=curve['grid'][finite], y=curve['scores'][finite],
+                             mode='lines+markers', name='CV(h)',
+                             line=dict(color='#20b2aa', width=2)))
+    for label, color in [('rot', '#888'), ('lscv', '#2e8b57'), ('plugin', '#f5576c')]:
+        fig.add_vline(x=curve[label], line_dash="dash", line_color=color,
+                      annotation_text=f"{label}: {curve[label]:.3f}")
+    fig.update_layout(
+        title="معيار التحقق المتقاطع مقابل h",
+        xaxis_title="h (بوحدات الانحراف المعياري لـ X)",
+        yaxis_title="CV(h)",
+        height=400,
+        template="plotly_white"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("### 🎚️ حساسية الاختبار لـ h (Bandwidth Sweep)")
+    
+    st.markdown("""
+    <div class="term-box">
+        <p>20 قيمة لـ h بين 0.25 و 4 أضعاف القاعدة الافتراضية، بنفس سحوبات Bootstrap
+        ونفس بنية المؤشرات 1{X ≤ x, Z ≤ z} لكل القيم، فيكون الفرق على المنحنى ناتجاً عن h وحده.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        sweep_statistic = st.radio("الإحصائية", ["CvM", "KS"], horizontal=True,
+                                   key="sweep_statistic")
+    with col2:
+        sweep_bootnum = st.select_slider("bootnum", [100, 200, 500], value=200,
+                                         key="sweep_bootnum")
+    
+    sweep_n = min(bw_n, 500)
+    with st.spinner("جاري حساب الاختبار على شبكة h..."):
+        sweep = pvalue_curve(bw_model, sweep_n, bw_kernel, sweep_statistic, sweep_bootnum)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=sweep['h'], y=sweep['pvalue'], mode='lines+markers',
+                             name='p-value', line=dict(color='#2e8b57', width=3)))
+    fig.add_hline(y=0.05, line_dash="dash", line_color="red",
+                  annotation_text="α = 5%")
+    fig.add_vline(x=sweep_n ** (-1 / 3), line_dash="dot", line_color="#888",
+                  annotation_text="n^(-1/3)")
+    fig.update_layout(
+        title=f"p-value مقابل h (النموذج {bw_model}، n = {sweep_n})",
+        xaxis_title="h (بوحدات الانحراف المعياري لـ X)",
+        yaxis_title="p-value",
+        yaxis_range=[0, 1],
+        height=400,
+        template="plotly_white"
+    )
+    st.plotly_chart(fig, use_container_width=True)
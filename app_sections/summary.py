@@ -0,0 +1,183 @@
+"""
+ملخص ومراجع
+Summary and references
+"""
+
+import pandas as pd
+import streamlit as st
+
+
+def render():
+    st.markdown("""
+    <h1 style="text-align: center; color: #2e8b57;">
+        📖 ملخص ومراجع
+    </h1>
+    <h3 style="text-align: center; color: #888;">
+        Summary and References
+    </h3>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    st.markdown("## 📝 ملخص النقاط الرئيسية")
+    
+    st.markdown("""
+    <div class="definition-box">
+        <h3>1️⃣ ما هو خطأ القياس؟</h3>
+        <p>الفرق بين القيمة الحقيقية (X*) والقيمة الملاحظة (X) للمتغير.</p>
+        <p><strong>X = X* + η</strong></p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="warning-box">
+        <h3>2️⃣ لماذا هو مهم؟</h3>
+        <ul>
+            <li>يسبب تحيز التخفيف (Attenuation Bias)</li>
+            <li>يؤدي إلى استنتاجات خاطئة</li>
+            <li>يؤثر على القرارات السياسية</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="success-box">
+        <h3>3️⃣ كيف نختبره؟</h3>
+        <p>بدلاً من اختبار H₀: P(X = X*) = 1 مباشرة:</p>
+        <ol>
+            <li>نستخدم قيد الاستبعاد: Y ⊥ Z | X*</li>
+            <li>نحوله إلى شرط قابل للاختبار: Y ⊥ Z | X</li>
+            <li>نستخدم اختبار Delgado & Gonzalez Manteiga</li>
+        </ol>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="info-box">
+        <h3>4️⃣ مميزات هذا النهج:</h3>
+        <ul>
+            <li>لا يتطلب تحديد (identification) النموذج</li>
+            <li>يعمل مع خطأ القياس غير الكلاسيكي</li>
+            <li>لا يحتاج افتراضات parametric</li>
+            <li>سهل التنفيذ</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 📚 المصطلحات الرئيسية")
+    
+    terms = {
+        "المصطلح بالعربية": [
+            "خطأ القياس",
+            "خطأ القياس الكلاسيكي",
+            "خطأ القياس غير الكلاسيكي",
+            "تحيز التخفيف",
+            "قيد الاستبعاد",
+            "الاستقلال الشرطي",
+            "دالة النواة",
+            "معلمة النطاق",
+            "التصنيف الخاطئ",
+            "نسبة الإشارة إلى الضوضاء"
+        ],
+        "المصطلح بالإنجليزية": [
+            "Measurement Error",
+            "Classical Measurement Error",
+            "Non-Classical Measurement Error",
+            "Attenuation Bias",
+            "Exclusion Restriction",
+            "Conditional Independence",
+            "Kernel Function",
+            "Bandwidth",
+            "Misclassification",
+            "Signal-to-Noise Ratio (SNR)"
+        ],
+        "الرمز": [
+            "η",
+            "Cov(η, X*) = 0",
+            "Cov(η, X*) ≠ 0",
+            "λ = σ²ₓ*/(σ²ₓ* + σ²η)",
+            "Y ⊥ Z | X*",
+            "Y ⊥ Z | X",
+            "K(·)",
+            "h",
+            "α₀₁, α₁₀",
+            "σ²ₓ*/σ²η"
+        ]
+    }
+    
+    df_terms = pd.DataFrame(terms)
+    st.dataframe(df_terms, use_container_width=True, hide_index=True)
+    
+    st.markdown("## 📖 المراجع الرئيسية")
+    
+    st.markdown("""
+    ### الأوراق الأساسية:
+    
+    1. **Wilhelm, D. (2018)**. "Testing for the Presence of Measurement Error." 
+       *CeMMAP Working Paper CWP45/18*.
+       
+    2. **Lee, Y.J. & Wilhelm, D. (2019)**. "Testing for the Presence of Measurement Error in Stata."
+       *CeMMAP Working Paper CWP47/19*.
+       
+    3. **Delgado, M.A. & Gonzalez Manteiga, W. (2001)**. "Significance Testing in Nonparametric 
+       Regression Based on the Bootstrap." *The Annals of Statistics*, 29(5), 1469-1507.
+    
+    ### مراجع إضافية:
+    
+    4. **Griliches, Z. (1986)**. "Economic Data Issues." *Handbook of Econometrics*, Vol. III.
+    
+    5. **Bound, J., Brown, C., & Mathiowetz, N. (2001)**. "Measurement Error in Survey Data."
+       *Handbook of Econometrics*, Vol. V.
+       
+    6. **Hausman, J.A. (1978)**. "Specification Tests in Econometrics." 
+       *Econometrica*, 46(6), 1251-1271.
+       
+    7. **Cunha, F., Heckman, J.J., & Schennach, S.M. (2010)**. "Estimating the Technology of 
+       Cognitive and Noncognitive Skill Formation." *Econometrica*, 78(3), 883-931.
+    """)
+    
+    st.markdown("## 🔗 روابط مفيدة")
+    
+    st.markdown("""
+    <div class="key-point">
+        <h4>💻 الكود المصدري:</h4>
+        <ul>
+            <li><strong>R:</strong> github.com/danielwilhelm/R-ME-test</li>
+            <li><strong>Stata:</strong> github.com/danielwilhelm/STATA-ME-test</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("## 🎓 نصائح للتطبيق العملي")
+    
+    st.markdown("""
+    <div class="success-box">
+        <h4>✅ قبل إجراء الاختبار:</h4>
+        <ol>
+            <li>تأكد من صحة قيد الاستبعاد في سياقك</li>
+            <li>تحقق من شرط الصلة (relevance) بين Z و X*</li>
+            <li>فكر في شرط الرتابة (monotonicity)</li>
+        </ol>
+    </div>
+    
+    <div class="warning-box">
+        <h4>⚠️ تحذيرات:</h4>
+        <ul>
+            <li>عدم رفض H₀ لا يعني بالضرورة عدم وجود خطأ قياس</li>
+            <li>قد يكون الخطأ صغيراً جداً مقارنة بضوضاء العينة</li>
+            <li>اختيار bandwidth مهم جداً</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    st.markdown("""
+    <div style="text-align: center; padding: 30px; background: linear-gradient(135deg, #20b2aa 0%, #48d1cc 100%); border-radius: 15px; color: white;">
+        <h2>🎉 شكراً لاستخدام هذا التطبيق!</h2>
+        <p>نأمل أن يكون هذا الشرح مفيداً لفهم اختبار وجود خطأ القياس</p>
+        <p style="font-size: 0.9em;">تم إعداده بناءً على أوراق Wilhelm (2018) و Lee & Wilhelm (2019)</p>
+        <hr style="border-color: rgba(255,255,255,0.3); margin: 20px 0;">
+        <p style="font-size: 1.2em; font-weight: bold;">من إعداد: د. مروان رودان</p>
+    </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,16 @@
+"""
+قياس أداء محرك الاختبار والمحاكاة
+Benchmarks of the test engine, the bootstrap and the simulation designs
+
+Not tests: every case times one piece of the engine and records its peak
+memory.  Run from the repository root:
+
+    python -m benchmarks.run                   # all cases, saved under benchmarks/results
+    python -m benchmarks.run -k bootstrap      # cases whose name contains "bootstrap"
+    python -m benchmarks.run --sizes 200 500   # only these sample sizes
+    python -m benchmarks.accel                 # Numba against NumPy on Models I-IV
+
+Each run is stored as JSON keyed by the current commit and compared with the
+latest earlier run on the same machine; slower or larger cases are flagged
+(see :mod:`benchmarks.run`).
+"""
@@ -0,0 +1,78 @@
+"""
+مقارنة مسار Numba بمسار NumPy على بيانات النماذج I-IV
+Speed of the compiled loops against the NumPy paths on Models I-IV data
+
+    python -m benchmarks.accel --ns 500 3000 20000 --bootnum 200
+
+Runs the full test (statistic and bootstrap) on one sample of every model
+with both paths, after a warm-up call that compiles the loops, and prints the
+time of each, the speedup and the largest relative difference between the
+two runs (statistic and bootstrap draws).
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from measurementerror import accel, dgmtest
+from measurementerror.simulation import MODELS, simulate
+
+
+def _timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    out = function(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def _relative_difference(a, b):
+    return max(abs(a.cvm - b.cvm) / abs(b.cvm),
+               float(np.max(np.abs(a.boot_cvm - b.boot_cvm) / np.abs(b.boot_cvm))))
+
+
+def compare(ns=(500, 3000), kernels=("epanechnikov", "gaussian"), bootnum=200,
+            sigma_me=0.5, prob_me=0.25, seed=0):
+    """One row per (model, n, kernel): NumPy and Numba seconds, speedup, difference."""
+    if not accel.AVAILABLE:
+        raise ImportError("this benchmark needs numba")
+    previous = accel.use_numba(True)
+    # Compile every loop before timing
+    x, y, z, _ = simulate("I", 50, sigma_me, prob_me, np.random.default_rng(seed))
+    for kernel in kernels:
+        dgmtest(y, x, z, kernel=kernel, bootnum=10, influence_bytes=0)
+    rows = []
+    try:
+        for model in MODELS:
+            for n in ns:
+                x, y, z, _ = simulate(model, n, sigma_me, prob_me, np.random.default_rng(seed))
+                for kernel in kernels:
+                    runs = {}
+                    for enabled in (False, True):
+                        accel.use_numba(enabled)
+                        runs[enabled] = _timed(dgmtest, y, x, z, kernel=kernel,
+                                               bootnum=bootnum, seed=seed)
+                    (numpy_result, numpy_time), (numba_result, numba_time) = runs[False], runs[True]
+                    rows.append({"model": model, "n": n, "kernel": kernel,
+                                 "numpy (s)": numpy_time, "numba (s)": numba_time,
+                                 "speedup": numpy_time / numba_time,
+                                 "max rel. diff": _relative_difference(numba_result, numpy_result)})
+    finally:
+        accel.use_numba(previous)
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("--ns", type=int, nargs="+", default=[500, 3000])
+    parser.add_argument("--kernels", nargs="+", default=["epanechnikov", "gaussian"])
+    parser.add_argument("--bootnum", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    table = compare(args.ns, args.kernels, args.bootnum, seed=args.seed)
+    with pd.option_context("display.float_format", "{:.3g}".format, "display.width", 120):
+        print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
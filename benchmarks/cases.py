@@ -0,0 +1,100 @@
+"""
+حالات القياس
+Benchmark cases
+
+A case prepares its data and returns the callable whose run is timed, so
+setup work (simulating the sample, building the influence matrix) stays
+out of the measurement.  Names read ``group[param=value,...]`` and can be
+selected with ``-k``:
+
+* ``statistic``: the process T_n and both statistics, CvM and KS;
+* ``bootstrap``: B multiplier draws of both statistics for a fitted sample;
+* ``nuisance``: the kernel sums behind f_h(X) and m_h(X), for every kernel;
+* ``dgp``: one sample of Models I-IV;
+* ``dgp_batch``: ``PAPER_REPS`` samples of Models I-IV in one vectorized call;
+* ``replication``: one Monte Carlo replication (sample plus test with the
+  paper's 100 bootstrap draws), the unit of the simulation section.
+
+All samples come from Model I (sigma_ME = 0.5, 1 - lambda = 0.25) unless the
+case is per model, with a fixed seed.
+"""
+
+from functools import partial
+
+import numpy as np
+
+from measurementerror.bootstrap import multiplier_bootstrap
+from measurementerror.dgm import (DEFAULT_BLOCK_BYTES, DEFAULT_GAUSSIAN_TOL,
+                                  DEFAULT_INFLUENCE_BYTES, _fit, _prepare, _Smoother,
+                                  _statistics, dgm_process)
+from measurementerror.kernels import KERNELS
+from measurementerror.simulation import (MODELS, PAPER_BOOTNUM, PAPER_REPS, Cell, replicate,
+                                         simulate, simulate_batch)
+
+SIZES = (200, 500, 3000, 31000)
+BOOTNUMS = (100, 1000, 5000)
+SIGMA_ME = 0.5
+PROB_ME = 0.25
+SEED = 0
+
+
+def _sample(n, model="I"):
+    x, y, z, _ = simulate(model, n, SIGMA_ME, PROB_ME, np.random.default_rng(SEED))
+    return x, y, z
+
+
+def statistic(n):
+    x, y, z = _sample(n)
+    return lambda: _statistics(dgm_process(y, x, z)[:, None])
+
+
+def bootstrap(n, bootnum):
+    x, y, z = _sample(n)
+    fit = _fit(y, x, z, "epanechnikov", None, "auto", "auto", DEFAULT_GAUSSIAN_TOL, None,
+               DEFAULT_BLOCK_BYTES, DEFAULT_INFLUENCE_BYTES)
+    return lambda: multiplier_bootstrap(fit.apply, fit.n, bootnum, "mammen", SEED)
+
+
+def nuisance(n, kernel):
+    y, x, _, h = _prepare(*_sample(n), kernel, None)
+    return lambda: _Smoother(x, kernel, h).sums(y)
+
+
+def dgp(n, model):
+    return lambda: simulate(model, n, SIGMA_ME, PROB_ME, np.random.default_rng(SEED))
+
+
+def dgp_batch(n, model):
+    return lambda: simulate_batch(model, n, SIGMA_ME, PROB_ME, PAPER_REPS, SEED)
+
+
+def replication(n, model):
+    cell = Cell(model, n, SIGMA_ME, PROB_ME)
+    return lambda: replicate(cell, 0, SEED, bootnum=PAPER_BOOTNUM)
+
+
+def warm_up():
+    """Load every code path once (the Numba loops in particular) before timing."""
+    x, y, z = _sample(200)
+    for kernel in KERNELS:
+        _fit(y, x, z, kernel, None, "auto", "auto", DEFAULT_GAUSSIAN_TOL, None,
+             DEFAULT_BLOCK_BYTES, 0).apply(np.ones((2, 200)))
+
+
+def case_name(group, **params):
+    return f"{group}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def cases(sizes=SIZES):
+    """(name, setup) pairs of every case at the given sample sizes."""
+    out = []
+    for n in sizes:
+        out.append((case_name("statistic", n=n), partial(statistic, n)))
+        out += [(case_name("bootstrap", n=n, B=b), partial(bootstrap, n, b)) for b in BOOTNUMS]
+        out += [(case_name("nuisance", n=n, kernel=k), partial(nuisance, n, k)) for k in KERNELS]
+        out += [(case_name("dgp", n=n, model=m), partial(dgp, n, m)) for m in MODELS]
+        out += [(case_name("dgp_batch", n=n, model=m), partial(dgp_batch, n, m))
+                for m in MODELS if n <= 3000]
+        out += [(case_name("replication", n=n, model=m), partial(replication, n, m))
+                for m in MODELS]
+    return out
@@ -0,0 +1,194 @@
+"""
+تشغيل حالات القياس وتسجيل الزمن والذاكرة ومقارنتها بتشغيل سابق
+Run the benchmark cases, store time and peak memory, flag regressions
+
+Every case is called once under :class:`measurementerror.memory.MemoryTracker`
+for its peak memory, then again without tracing, at least once and until
+``MIN_TIME`` has passed or ``MAX_REPEATS`` untraced calls were made; the
+recorded time is the fastest untraced call.
+
+Results go to ``benchmarks/results/<date>-<commit>.json`` together with the
+environment: host, Python, NumPy and whether the Numba loops were on.  The
+run is then compared with the latest earlier run of the same environment and
+``RESULTS_VERSION``, or with the run given by ``--compare`` (a file or a
+commit).  A case is flagged
+when it is more than ``--time-tolerance`` slower or ``--memory-tolerance``
+larger, beyond the noise floors, and the command then exits with status 1.
+"""
+
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from measurementerror import accel
+from measurementerror.memory import MemoryTracker, format_bytes
+
+from .cases import SIZES, cases, warm_up
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# Runs recorded before version 2 timed calls with tracemalloc on
+RESULTS_VERSION = 2
+MIN_TIME = 0.2  # seconds of repeated calls per case
+MAX_REPEATS = 5
+TIME_TOLERANCE = 0.2
+MEMORY_TOLERANCE = 0.1
+# Differences below these are noise whatever the ratio
+TIME_FLOOR = 0.005  # seconds
+MEMORY_FLOOR = 2**20  # bytes
+
+
+def measure(setup):
+    """(seconds, peak bytes, calls) of the callable returned by ``setup()``."""
+    run = setup()
+    with MemoryTracker(trace=True) as tracker:
+        run()
+    if tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is on outside the traced call; timings would include it")
+    times = []
+    while not times or (sum(times) < MIN_TIME and len(times) < MAX_REPEATS):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times), tracker.peak, len(times) + 1
+
+
+def _git(*args):
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                             cwd=RESULTS_DIR.parent)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def commit_id():
+    """Short hash of HEAD, with "-dirty" for uncommitted changes."""
+    commit = _git("rev-parse", "--short", "HEAD")
+    if commit is None:
+        return "unknown"
+    return commit + ("-dirty" if _git("status", "--porcelain", "--untracked-files=no") else "")
+
+
+def environment():
+    return {"host": platform.node(), "machine": platform.machine(),
+            "python": platform.python_version(), "numpy": np.__version__,
+            "numba": accel.numba_enabled()}
+
+
+def run_cases(pattern=None, sizes=SIZES, log=print):
+    """Measure every case whose name matches the regular expression ``pattern``."""
+    warm_up()
+    results = {}
+    for name, setup in cases(sizes):
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        seconds, peak, calls = measure(setup)
+        results[name] = {"time": seconds, "peak_bytes": peak, "calls": calls}
+        log(f"{name:<45} {seconds:10.4f} s {format_bytes(peak):>12}")
+    return results
+
+
+def save(results, directory=RESULTS_DIR):
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now()
+    record = {"version": RESULTS_VERSION, "commit": commit_id(),
+              "date": stamp.isoformat(timespec="seconds"),
+              "environment": environment(), "results": results}
+    path = directory / f"{stamp:%Y%m%d-%H%M%S}-{record['commit']}.json"
+    path.write_text(json.dumps(record, indent=1))
+    return path
+
+
+def _load(path):
+    return json.loads(Path(path).read_text())
+
+
+def find_baseline(reference=None, exclude=None, directory=RESULTS_DIR):
+    """Path of the run to compare with.
+
+    ``reference`` is a results file or a commit prefix; by default the latest
+    run of the current environment other than ``exclude``.
+    """
+    if reference is not None and Path(reference).is_file():
+        return Path(reference)
+    env = environment()
+    for path in sorted(directory.glob("*.json"), reverse=True):
+        if exclude is not None and path.resolve() == Path(exclude).resolve():
+            continue
+        record = _load(path)
+        if reference is not None:
+            if record["commit"].startswith(reference):
+                return path
+        elif (record["environment"] == env
+              and record.get("version", 1) == RESULTS_VERSION):
+            return path
+    return None
+
+
+def compare(results, baseline, time_tolerance=TIME_TOLERANCE,
+            memory_tolerance=MEMORY_TOLERANCE):
+    """Table of the cases run in both, with ratios and a regression flag."""
+    rows = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        time_ratio = new["time"] / old["time"]
+        memory_ratio = new["peak_bytes"] / max(old["peak_bytes"], 1)
+        slower = (time_ratio > 1 + time_tolerance
+                  and new["time"] - old["time"] > TIME_FLOOR)
+        larger = (memory_ratio > 1 + memory_tolerance
+                  and new["peak_bytes"] - old["peak_bytes"] > MEMORY_FLOOR)
+        rows.append({"case": name, "time": new["time"], "baseline time": old["time"],
+                     "time ratio": time_ratio, "peak": format_bytes(new["peak_bytes"]),
+                     "baseline peak": format_bytes(old["peak_bytes"]),
+                     "memory ratio": memory_ratio,
+                     "regression": ", ".join(flag for flag, on in
+                                             (("time", slower), ("memory", larger)) if on)})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    parser.add_argument("-k", dest="pattern", help="regular expression on case names")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--compare", help="results file or commit to compare with")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--no-save", action="store_true", help="do not store this run")
+    args = parser.parse_args(argv)
+
+    results = run_cases(args.pattern, args.sizes)
+    path = None if args.no_save else save(results)
+    if path is not None:
+        print(f"saved {path}")
+    baseline_path = find_baseline(args.compare, exclude=path)
+    if baseline_path is None:
+        print("no earlier run to compare with")
+        return 0
+    baseline = _load(baseline_path)
+    table = compare(results, baseline["results"], args.time_tolerance, args.memory_tolerance)
+    print(f"compared with {baseline['commit']} ({baseline['date']})")
+    if table.empty:
+        print("no case in common")
+        return 0
+    with pd.option_context("display.float_format", "{:.4g}".format, "display.width", 160,
+                           "display.max_rows", None):
+        print(table.to_string(index=False))
+    flagged = int((table["regression"] != "").sum())
+    print(f"{flagged} regression(s)" if flagged else "no regression")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+اختبار وجود خطأ القياس - النواة الحسابية
+Numerical core for testing the presence of measurement error
+Based on Wilhelm (2018), Lee & Wilhelm (2019) and Delgado & Gonzalez Manteiga (2001)
+"""
+
+from .bandwidth import select_bandwidth
+from .data import Sample, load_sample
+from .datastore import open_dataset
+from .dgm import DGMResult, dgm_process, dgmtest, rule_of_thumb_bandwidth
+from .gini import GiniResult, conditional_gini, gini_test
+from .kernels import KERNELS
+
+__all__ = [
+    "DGMResult",
+    "GiniResult",
+    "KERNELS",
+    "Sample",
+    "conditional_gini",
+    "dgm_process",
+    "dgmtest",
+    "gini_test",
+    "load_sample",
+    "open_dataset",
+    "rule_of_thumb_bandwidth",
+    "select_bandwidth",
+]
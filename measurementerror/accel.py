@@ -0,0 +1,107 @@
+"""
+تسريع اختياري بـ Numba مع بديل NumPy
+Optional Numba acceleration of the kernel and indicator passes
+
+When Numba is installed the engine switches, for
+
+* dense kernel sums (the Gaussian, or any kernel with ``smoothing="dense"``)
+  over at most ``DENSE_MAX_COLUMNS`` columns,
+* kernel sums of compact or truncated kernels for scalar X, which then run
+  over sorted windows instead of a stored sparse neighbor graph, and
+* the indicator pass for scalar X and Z, a Fenwick sweep per column,
+
+to the compiled loops of :mod:`measurementerror._numba_kernels`: parallel
+over rows or columns, without the GIL and without (rows x n) temporaries.
+The loops are compiled on first use and cached on disk.
+Without Numba, or with the environment variable ``MEASUREMENTERROR_NUMBA=0``,
+the NumPy paths are used.  Both agree up to rounding; :func:`use_numba`
+switches between them at run time, e.g. to compare or time them.
+Numba itself is only imported on first use.
+
+Numba's "workqueue" threading layer is selected unless ``NUMBA_THREADING_LAYER``
+says otherwise: TBB hangs at exit after a launch from a non-main thread (as
+in Streamlit) and GNU OpenMP hangs in forked pool workers.  Workqueue is
+fork-safe but not thread-safe, so compiled calls are serialised by a lock.
+"""
+
+import importlib.util
+import os
+import threading
+
+import numpy as np
+
+ENV_VAR = "MEASUREMENTERROR_NUMBA"
+# Dense kernel sums over more columns go to the BLAS products of the NumPy path
+DENSE_MAX_COLUMNS = 16
+AVAILABLE = importlib.util.find_spec("numba") is not None
+
+_enabled = AVAILABLE and os.environ.get(ENV_VAR, "1") != "0"
+_lock = threading.Lock()
+
+
+def _reset_lock():
+    # A fork taken while another thread held the lock must not inherit it
+    global _lock
+    _lock = threading.Lock()
+
+
+# Unix only; Windows starts workers fresh (spawn), with a new lock
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock)
+
+
+def numba_enabled():
+    """Whether the compiled loops are in use."""
+    return _enabled
+
+
+def use_numba(enabled=True):
+    """Switch the compiled loops on or off; returns the previous setting."""
+    global _enabled
+    if enabled and not AVAILABLE:
+        raise ImportError("the compiled loops require numba")
+    previous, _enabled = _enabled, bool(enabled)
+    return previous
+
+
+def compiled():
+    """The module of compiled loops (imports Numba)."""
+    import numba
+
+    if "NUMBA_THREADING_LAYER" not in os.environ:
+        numba.config.THREADING_LAYER = "workqueue"
+    from . import _numba_kernels
+    return _numba_kernels
+
+
+def run(loop, *args):
+    """Call the compiled loop named ``loop``, one call at a time."""
+    function = getattr(compiled(), loop)
+    with _lock:
+        function(*args)
+
+
+def kernel_code(kernel):
+    return compiled().KERNEL_CODES[kernel.lower()]
+
+
+def kernel_sums(x, values, kernel, h):
+    """Dense s0_i = sum_j K_h(X_i - X_j) and s1 = K_h @ values for (n, q) ``x``."""
+    n = x.shape[0]
+    s0 = np.empty(n)
+    s1 = np.zeros((n, values.shape[1]))
+    run("dense_kernel_sums", np.ascontiguousarray(x), np.ascontiguousarray(values),
+        kernel_code(kernel), float(h), s0, s1)
+    return s0, s1
+
+
+def dominance_sums(x, z, values):
+    """Compiled :func:`measurementerror.dominance.dominance_sums` for float64 (n,) x, z and (n, m) values."""
+    order = np.argsort(x, kind="stable")
+    _, z_rank = np.unique(z, return_inverse=True)
+    z_rank = z_rank.ravel().astype(np.int64)
+    n_z = int(z_rank.max()) + 1 if z_rank.size else 1
+    values_t = np.ascontiguousarray(values.T)
+    out_t = np.empty_like(values_t)
+    run("fenwick_dominance_sums", order, x[order], z_rank, n_z, values_t, out_t)
+    return out_t.T
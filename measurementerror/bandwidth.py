@@ -0,0 +1,288 @@
+"""
+اختيار عرض النطاق من البيانات: التحقق المتقاطع وقواعد Plug-in
+Data-driven bandwidths: least-squares cross-validation and plug-in rules
+
+All bandwidths are in standard deviations of X, the units of ``bw`` in
+:func:`measurementerror.dgm.dgmtest`.
+
+Least-squares cross-validation scores a whole grid of h at once.  For scalar
+X the data are linearly binned once (the grid is fine enough for the
+smallest h) and every h costs one FFT convolution of the shared bin counts;
+the leave-one-out sums subtract each observation's own weight, which is
+computed exactly in the binned representation, so an isolated point gets a
+leave-one-out sum of zero rather than rounding noise.  Multivariate X, and
+the regression score of the uniform kernel (binned to first order only), is
+scored in blocks of rows sorted by the first coordinate, each meeting only
+the columns inside the kernel window; the differences are shared by all h
+and memory stays at one block.  Scores are cached per dataset fingerprint
+(a hash of the data), kernel and grid, so repeated tests on the same data
+with another statistic, bootstrap size or seed reuse the search.
+
+Plug-in rules: normal reference for f_X (Silverman's rule for q = 1,
+Scott's for q > 1, converted to the kernel through its canonical
+bandwidth), and the rule of thumb of Ruppert, Sheather & Wand (1995) with a
+global quartic fit for E[Y | X].
+"""
+
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from .binned import BinnedKernel, fftconvolve, second_order
+from .kernels import (DEFAULT_GAUSSIAN_TOL, ROUGHNESS, SECOND_MOMENT, get_kernel,
+                      support_radius)
+
+SELECTORS = ("rot", "lscv", "plugin")
+TARGETS = ("regression", "density")
+DEFAULT_GRID_POINTS = 25
+# Grid of h, as multiples of the MSE-rate reference n^(-1/(q+4))
+GRID_RANGE = (0.1, 3.0)
+# Regression scores skip observations outside these quantiles of each coordinate
+DEFAULT_TRIM = 0.05
+CACHE_ENTRIES = 32
+# Bytes of one row block of pairwise differences for multivariate X
+DEFAULT_BLOCK_BYTES = 64 * 2**20
+
+_cache = OrderedDict()
+
+
+def _as_matrix(x):
+    x = np.asarray(x, dtype=np.float64)
+    return x[:, None] if x.ndim == 1 else x
+
+
+def _target(target):
+    if target not in TARGETS:
+        raise ValueError(f"target must be one of {TARGETS}, got {target!r}")
+    return target
+
+
+def default_grid(n, q=1, num=DEFAULT_GRID_POINTS):
+    """Geometric grid of bandwidths around n^(-1/(q+4))."""
+    ref = float(n) ** (-1.0 / (q + 4))
+    return ref * np.geomspace(*GRID_RANGE, num)
+
+
+def fingerprint(*arrays):
+    """Hash of the shapes and contents of ``arrays``."""
+    digest = hashlib.sha256()
+    for a in arrays:
+        a = np.ascontiguousarray(a, dtype=np.float64)
+        digest.update(repr(a.shape).encode())
+        digest.update(a.tobytes())
+    return digest.hexdigest()[:24]
+
+
+@lru_cache(maxsize=None)
+def _convolution_table(kernel, tol):
+    # (K * K)(u) tabulated on [-2r, 2r]; the integrated squared density needs it
+    r = support_radius(kernel, tol)
+    step = r / 2000.0
+    t = np.arange(-2000, 2001) * step
+    k = get_kernel(kernel)(t)
+    return np.arange(-4000, 4001) * step, np.convolve(k, k) * step
+
+
+def _binned_loo(x, y, grid, kernel, tol):
+    """Leave-one-out s0 (and s1, integrated squared density) for every h, scalar X."""
+    kern = get_kernel(kernel)
+    base = BinnedKernel(x, kernel, grid.min(), gaussian_tol=tol)
+    size, delta = base.grid.shape[0], base.delta
+    pos = (x - base.grid[0]) / delta
+    frac = pos - np.clip(np.floor(pos), 0, size - 2)
+    values = np.column_stack([np.ones_like(x)] + ([] if y is None else [y]))
+    counts = base.binning @ values
+    r = support_radius(kernel, tol)
+    conv_u, conv_k = _convolution_table(kernel, tol)
+
+    s0 = np.empty((grid.shape[0], x.shape[0]))
+    s1 = None if y is None else np.empty_like(s0)
+    square = np.empty(grid.shape[0])
+    for g, h in enumerate(grid):
+        reach = int(min(size - 1, np.floor(2.0 * r * h / delta)))
+        offsets = np.arange(-reach, reach + 1) * delta / h
+        weights = np.where(np.abs(offsets) <= r, kern(offsets), 0.0) / h
+        sums = base.binning.T @ fftconvolve(counts, weights[:, None], mode="same", axes=0)
+        # Own weight of observation i in B^T C B: its two bin shares against each other
+        own = ((1.0 - frac) ** 2 + frac**2) * weights[reach]
+        if reach:
+            own += 2.0 * frac * (1.0 - frac) * weights[reach + 1]
+        s0[g] = sums[:, 0] - own
+        if y is not None:
+            s1[g] = sums[:, 1] - own * y
+        conv = np.interp(offsets, conv_u, conv_k, left=0.0, right=0.0) / h
+        grid_conv = fftconvolve(counts[:, 0], conv, mode="same")
+        square[g] = (base.binning.T @ grid_conv).sum() / x.shape[0] ** 2
+    return s0, s1, square
+
+
+def _window_loo(x, y, grid, kernel, tol, block_bytes):
+    """Leave-one-out s0 and s1 for every h, multivariate X, in sorted row blocks.
+
+    Rows are sorted by the first coordinate, so a block of consecutive rows
+    only meets the columns within r h of its range in that coordinate.  The
+    differences for the widest window are formed once per block; every h
+    reads its own sub-window of them.
+    """
+    kern = get_kernel(kernel)
+    n, q = x.shape
+    order = np.argsort(x[:, 0], kind="stable")
+    xs, ys = x[order], y[order]
+    first = xs[:, 0]
+    reach = support_radius(kernel, tol) * grid
+    s0 = np.empty((grid.shape[0], n))
+    s1 = np.empty_like(s0)
+    step = int(max(1, block_bytes // (8 * n * (q + 1))))
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        lo = np.searchsorted(first, first[start] - reach, side="left")
+        hi = np.searchsorted(first, first[stop - 1] + reach, side="right")
+        diffs = xs[start:stop, None, :] - xs[None, lo[-1]:hi[-1], :]
+        rows = np.arange(stop - start)
+        for g, h in enumerate(grid):
+            part = diffs[:, lo[g] - lo[-1]:hi[g] - lo[-1]]
+            w = kern(part[..., 0] / h)
+            for c in range(1, q):
+                w *= kern(part[..., c] / h)
+            w /= h**q
+            w[rows, start + rows - lo[g]] = 0.0
+            s0[g, start:stop] = w.sum(axis=1)
+            s1[g, start:stop] = w @ ys[lo[g]:hi[g]]
+    inverse = np.empty(n, dtype=np.int64)
+    inverse[order] = np.arange(n)
+    return s0[:, inverse], s1[:, inverse]
+
+
+def _scores(x, y, grid, kernel, target, tol, trim):
+    n, q = x.shape
+    if target == "density":
+        if q != 1:
+            raise ValueError("density cross-validation supports scalar X only")
+        s0, _, square = _binned_loo(x[:, 0], None, grid, kernel, tol)
+        return square - 2.0 * s0.sum(axis=1) / (n * (n - 1))
+    if q == 1 and second_order(kernel):
+        s0, s1, _ = _binned_loo(x[:, 0], y, grid, kernel, tol)
+    else:
+        s0, s1 = _window_loo(x, y, grid, kernel, tol, DEFAULT_BLOCK_BYTES)
+    # Trimming weight: sparse tails would otherwise rule out every small h
+    lo, hi = np.quantile(x, [trim, 1.0 - trim], axis=0)
+    inner = np.all((x >= lo) & (x <= hi), axis=1)
+    s0, s1 = s0[:, inner], s1[:, inner]
+    # An inner observation without neighbors has no leave-one-out fit; such h are ruled out
+    floor = 1e-8 * get_kernel(kernel)(0.0) / grid ** q
+    empty = (s0 <= floor[:, None]).any(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resid = y[None, inner] - s1 / s0
+    scores = np.mean(resid**2, axis=1)
+    scores[empty] = np.inf
+    return scores
+
+
+def cv_scores(x, y=None, kernel="epanechnikov", grid=None, target="regression",
+              gaussian_tol=DEFAULT_GAUSSIAN_TOL, trim=DEFAULT_TRIM):
+    """Least-squares cross-validation score of every bandwidth in ``grid``.
+
+    Parameters
+    ----------
+    x : (n,) or (n, q) array_like
+        Regressors, already in the units of h.
+    y : (n,) array_like
+        Outcome; required for the regression target.
+    kernel : str
+    grid : array_like, optional
+        Bandwidths to score; defaults to :func:`default_grid`.
+    target : {"regression", "density"}
+        "regression" scores E[Y | X] by the mean of (Y_i - m_{-i}(X_i))^2;
+        "density" scores f_X by int f_h^2 - 2 n^-1 sum_i f_{-i}(X_i).
+    trim : float
+        The regression score averages over observations whose coordinates
+        all lie between their ``trim`` and 1 - ``trim`` quantiles.
+
+    Returns
+    -------
+    (grid, scores) : two arrays; bandwidths leaving an observation without
+    leave-one-out neighbors score +inf.
+    """
+    target = _target(target)
+    get_kernel(kernel)
+    x = _as_matrix(x)
+    n, q = x.shape
+    if target == "regression":
+        if y is None:
+            raise ValueError("regression cross-validation needs y")
+        y = np.asarray(y, dtype=np.float64).ravel()
+    grid = default_grid(n, q) if grid is None else np.sort(np.asarray(grid, dtype=np.float64))
+    if grid.ndim != 1 or grid.size == 0 or grid[0] <= 0:
+        raise ValueError("grid must be a non-empty vector of positive bandwidths")
+
+    if not 0 <= trim < 0.5:
+        raise ValueError("trim must lie in [0, 0.5)")
+    key = (fingerprint(x) if y is None else fingerprint(x, y), kernel.lower(), target,
+           fingerprint(grid), gaussian_tol, trim)
+    if key in _cache:
+        _cache.move_to_end(key)
+    else:
+        _cache[key] = _scores(x, y, grid, kernel.lower(), target, gaussian_tol, trim)
+        if len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return grid, _cache[key].copy()
+
+
+def lscv_bandwidth(x, y=None, kernel="epanechnikov", grid=None, target="regression",
+                   gaussian_tol=DEFAULT_GAUSSIAN_TOL, trim=DEFAULT_TRIM):
+    """Grid minimiser of the cross-validation score (see :func:`cv_scores`)."""
+    grid, scores = cv_scores(x, y, kernel, grid, target, gaussian_tol, trim)
+    if not np.isfinite(scores).any():
+        raise ValueError("every bandwidth in the grid leaves observations without neighbors")
+    return float(grid[np.argmin(scores)])
+
+
+def _canonical(kernel):
+    return (ROUGHNESS[kernel] / SECOND_MOMENT[kernel] ** 2) ** 0.2
+
+
+def plugin_bandwidth(x, y=None, kernel="epanechnikov", target="regression"):
+    """Plug-in bandwidth for f_X (normal reference) or E[Y | X] (Ruppert-Sheather-Wand)."""
+    target = _target(target)
+    kernel = kernel.lower()
+    get_kernel(kernel)
+    x = _as_matrix(x)
+    n, q = x.shape
+    if target == "density":
+        iqr = np.subtract(*np.percentile(x, [75, 25], axis=0)) / 1.349
+        scale = np.mean(np.minimum(x.std(axis=0), np.where(iqr > 0, iqr, np.inf)))
+        gauss = _canonical("gaussian")
+        return float(scale * (4.0 / (q + 2)) ** (1.0 / (q + 4)) * n ** (-1.0 / (q + 4))
+                     * _canonical(kernel) / gauss)
+    if q != 1:
+        raise ValueError("the regression plug-in supports scalar X only")
+    if y is None:
+        raise ValueError("the regression plug-in needs y")
+    y = np.asarray(y, dtype=np.float64).ravel()
+    u = x[:, 0]
+    # Global quartic fit: sigma^2 from its residuals, theta_22 = mean m''(X)^2
+    design = np.vander(u, 5, increasing=True)
+    coef, *_ = np.linalg.lstsq(design, y, rcond=None)
+    sigma2 = np.sum((y - design @ coef) ** 2) / max(n - 5, 1)
+    second = 2.0 * coef[2] + 6.0 * coef[3] * u + 12.0 * coef[4] * u**2
+    theta22 = np.mean(second**2)
+    if theta22 <= 0:
+        raise ValueError("the quartic fit is linear; the plug-in rule is undefined")
+    return float((ROUGHNESS[kernel] * sigma2 * np.ptp(u)
+                  / (SECOND_MOMENT[kernel] ** 2 * theta22 * n)) ** 0.2)
+
+
+def select_bandwidth(y, x, selector="lscv", kernel="epanechnikov", target="regression",
+                     grid=None, gaussian_tol=DEFAULT_GAUSSIAN_TOL, trim=DEFAULT_TRIM):
+    """Bandwidth from ``selector``: "rot" (n^(-1/(3q))), "lscv" or "plugin"."""
+    x = _as_matrix(x)
+    n, q = x.shape
+    if selector == "rot":
+        return float(n) ** (-1.0 / (3 * q))
+    if selector == "lscv":
+        return lscv_bandwidth(x, y, kernel, grid, target, gaussian_tol, trim)
+    if selector == "plugin":
+        return plugin_bandwidth(x, y, kernel, target)
+    raise ValueError(f"bandwidth selector must be one of {SELECTORS}, got {selector!r}")
@@ -0,0 +1,133 @@
+"""
+Bootstrap المضاعف (Multiplier Bootstrap) على دفعات
+Batched multiplier bootstrap for the DGM statistics
+
+The bootstrap process is linear in the multipliers, T*_b = M V_b, where the
+influence matrix M (n x n) depends on the data only.  Once M is built, B draws
+are a (B x n) @ (n x n) product; it is evaluated in chunks of ``chunk_size``
+draws so peak memory stays at one (chunk_size x n) block.  A seed given as a
+string selects a named, disk-cached stream (:mod:`measurementerror.weights`).
+"""
+
+import numpy as np
+
+_SQRT5 = np.sqrt(5.0)
+MAMMEN_LOW = -(_SQRT5 - 1.0) / 2.0
+MAMMEN_HIGH = (_SQRT5 + 1.0) / 2.0
+MAMMEN_P = (_SQRT5 + 1.0) / (2.0 * _SQRT5)
+
+# Bytes allowed for one (chunk_size x n) block of draws
+DEFAULT_CHUNK_BYTES = 64 * 2**20
+# With a progress callback, draws come in at least this many chunks
+PROGRESS_STEPS = 20
+
+
+def mammen(rng, size):
+    """Mammen (1993) two-point law with E[V] = 0, E[V^2] = E[V^3] = 1."""
+    return np.where(rng.random(size) < MAMMEN_P, MAMMEN_LOW, MAMMEN_HIGH)
+
+
+def rademacher(rng, size):
+    """V = +/-1 with probability 1/2 each."""
+    return np.where(rng.random(size) < 0.5, -1.0, 1.0)
+
+
+def gaussian(rng, size):
+    """V ~ N(0, 1)."""
+    return rng.standard_normal(size)
+
+
+MULTIPLIERS = {
+    "mammen": mammen,
+    "rademacher": rademacher,
+    "gaussian": gaussian,
+}
+
+
+def get_multiplier(name):
+    """Return the multiplier sampler registered under ``name`` (case-insensitive)."""
+    try:
+        return MULTIPLIERS[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"unknown multiplier distribution {name!r}; choose one of {', '.join(MULTIPLIERS)}"
+        ) from None
+
+
+def default_chunk_size(n, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    return int(max(1, chunk_bytes // (8 * max(n, 1))))
+
+
+def iter_multipliers(n, bootnum, multiplier="mammen", seed=None, chunk_size=None):
+    """Yield the B x n multiplier matrix as consecutive (chunk, n) row blocks.
+
+    Draws come from one generator in row order, so the concatenated blocks do
+    not depend on ``chunk_size``.  With a string ``seed`` the blocks are
+    read-only views of the cached matrix of that named stream.
+    """
+    draw = get_multiplier(multiplier)
+    chunk_size = default_chunk_size(n) if chunk_size is None else int(chunk_size)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if isinstance(seed, str):
+        from .weights import default_cache
+
+        matrix = default_cache().get(multiplier, n, bootnum, seed)
+        for start in range(0, bootnum, chunk_size):
+            yield matrix[start:start + chunk_size]
+        return
+    rng = np.random.default_rng(seed)
+    for start in range(0, bootnum, chunk_size):
+        yield draw(rng, (min(chunk_size, bootnum - start), n))
+
+
+def bootstrap_statistics(process):
+    """CvM and KS of every row of a (c, n) block of bootstrap processes.
+
+    Single-precision blocks are summed in float64.
+    """
+    n = process.shape[1]
+    if process.dtype == np.float64:
+        cvm = np.einsum("ij,ij->i", process, process)
+    else:
+        cvm = np.einsum("ij,ij->i", process, process, dtype=np.float64)
+    return cvm, np.sqrt(n) * np.abs(process).max(axis=1).astype(np.float64)
+
+
+def multiplier_bootstrap(apply, n, bootnum, multiplier="mammen", seed=None,
+                         chunk_size=None, progress=None):
+    """Bootstrap draws of the CvM and KS statistics.
+
+    Parameters
+    ----------
+    apply : callable
+        Maps a (c, n) block of multipliers to the (c, n) bootstrap processes
+        T*_b(X_l, Z_l); typically ``lambda v: v @ influence.T``.
+    n, bootnum : int
+        Sample size and number of replications B.
+    multiplier : {"mammen", "rademacher", "gaussian"}
+    seed : int, str or numpy.random.Generator, optional
+        A string names a cached stream, see :mod:`measurementerror.weights`.
+    chunk_size : int, optional
+        Draws per block; defaults to blocks of about 64 MiB.
+    progress : callable, optional
+        Called as ``progress(draws_done, bootnum)`` after every block; blocks
+        are then capped at bootnum / ``PROGRESS_STEPS`` draws.
+
+    Returns
+    -------
+    (boot_cvm, boot_ks) : two arrays of length ``bootnum``.
+    """
+    if progress is not None:
+        chunk_size = default_chunk_size(n) if chunk_size is None else chunk_size
+        chunk_size = min(chunk_size, max(1, -(-bootnum // PROGRESS_STEPS)))
+    boot_cvm = np.empty(bootnum)
+    boot_ks = np.empty(bootnum)
+    start = 0
+    for v in iter_multipliers(n, bootnum, multiplier, seed, chunk_size):
+        stop = start + v.shape[0]
+        boot_cvm[start:stop], boot_ks[start:stop] = bootstrap_statistics(apply(v))
+        start = stop
+        if progress is not None:
+            progress(stop, bootnum)
+    return boot_cvm, boot_ks
@@ -0,0 +1,267 @@
+"""
+واجهة سطر الأوامر دون Streamlit
+Command-line entry point: ``python -m measurementerror``
+
+Runs the test on a data file, or a Monte Carlo grid, without loading the
+app: only the numerical core is imported, so a batch script on a cluster
+starts in the time NumPy, SciPy and pandas take to import.
+
+    python -m measurementerror test data.parquet --y repearn77 --x ssearn77 --z ssearn76
+    python -m measurementerror simulate --model I II --n 200 500 --reps 1000
+
+``test`` prints one record (the statistics, bandwidth, critical values at
+1/5/10% and p(CvM < CvM*) of the dgmtest printout), ``simulate`` one row
+per cell of the grid, as JSON or CSV, to stdout or ``--output``; ``test
+--format stata`` prints the Stata log itself.  ``stata`` runs a Stata
+command line as is, and ``check`` the fixed-seed reference cases of
+:mod:`measurementerror.reference`:
+
+    python -m measurementerror stata data.csv "dgmtest repearn77 ssearn77 ssearn76, bootnum(5000)"
+    python -m measurementerror check
+"""
+
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from . import reference
+from .bandwidth import SELECTORS
+from .data import DTYPES, FORMATS, load_sample
+from .dgm import LEVELS, METHODS, SMOOTHERS, STATISTICS
+from .kernels import KERNELS
+from .simulation import (DEFAULT_TASK_SIZE, DGPS, MODELS, PAPER_BOOTNUM, PAPER_REPS,
+                         adaptive_rejection_rates, grid, rejection_rates)
+from .stata import (STATA_BOOTDIST, STATA_KERNELS, compare_report, parse_command, report,
+                    stata_options)
+from .store import ResultStore
+
+OUTPUT_FORMATS = ("json", "csv")
+TEST_FORMATS = OUTPUT_FORMATS + ("stata",)
+
+
+def _seed(text):
+    """An integer seed, or the name of a cached stream of multipliers."""
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+def _bandwidth(text):
+    if text.lower() in SELECTORS:
+        return text.lower()
+    try:
+        return float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"bw must be a number or one of {', '.join(SELECTORS)}") from None
+
+
+def test_record(result):
+    """Flat dict of a :class:`measurementerror.dgm.DGMResult`, as in the dgmtest printout."""
+    record = {"statistic": result.statistic, "value": result.value, "cvm": result.cvm,
+              "ks": result.ks, "n": result.n, "bandwidth": result.bandwidth,
+              "kernel": result.kernel, "multiplier": result.multiplier,
+              "bootnum": result.bootnum}
+    for level in LEVELS:
+        record[f"critical_{round(level * 100)}"] = result.critical_value(level)
+    record["pvalue"] = result.pvalue
+    return record
+
+
+def write(table, output_format, output=None, single=False):
+    """Write a DataFrame as JSON records or CSV to ``output`` (default stdout).
+
+    With ``single``, the JSON is the one record of ``table`` instead of a list.
+    """
+    if output_format == "json":
+        records = table.to_dict(orient="records")
+        # NumPy scalars as Python numbers, at full precision
+        text = json.dumps(records[0] if single else records, indent=1,
+                          default=lambda value: value.item()) + "\n"
+    else:
+        text = table.to_csv(index=False)
+    _write_text(text, output)
+
+
+def _write_text(text, output=None):
+    if output is None:
+        sys.stdout.write(text)
+    else:
+        with open(output, "w") as fh:
+            fh.write(text)
+
+
+def _sample(args, y, x, z, w):
+    if args.store:
+        from .datastore import open_dataset
+
+        return open_dataset(args.file, args.file_format).sample(y, x, z, w=w, dtype=args.dtype)
+    return load_sample(args.file, y, x, z, w=w, dtype=args.dtype, file_format=args.file_format)
+
+
+def run_test(args):
+    options = stata_options(test=args.statistic, kernel=args.kernel, bw=args.bw,
+                            bootnum=args.bootnum, bootdist=args.multiplier)
+    sample = _sample(args, args.y, args.x, args.z, args.w)
+    result = sample.dgmtest(seed=args.seed, method=args.method, smoothing=args.smoothing,
+                            memory_budget=args.memory_budget, **options)
+    if args.format == "stata":
+        _write_text(report(result, options["bw"]), args.output)
+        return 0
+    record = test_record(result)
+    record["dropped"] = sample.dropped
+    write(pd.DataFrame([record]), args.format, args.output, single=True)
+    return 0
+
+
+def _report(done, total, *_):
+    print(f"{done}/{total} replications", file=sys.stderr, flush=True)
+
+
+def run_simulate(args):
+    cells = grid(args.model, args.n, args.sigma_me, args.prob_me)
+    options = dict(bootnum=args.bootnum, statistic=args.statistic, kernel=args.kernel,
+                   seed=args.seed, workers=args.workers, task_size=args.task_size,
+                   dgp=args.dgp,
+                   store=ResultStore(args.store) if args.store else None,
+                   progress=None if args.quiet else _report)
+    if args.target_se is None:
+        table = rejection_rates(cells, args.reps, level=args.level, **options)
+    else:
+        table = adaptive_rejection_rates(cells, args.reps, level=args.level,
+                                         target_se=args.target_se, **options)
+    write(table, args.format, args.output)
+    return 0
+
+
+def run_stata(args):
+    y, x, z, w, options = parse_command(args.command)
+    options = stata_options(**options)
+    sample = _sample(args, y, x, z, w)
+    result = sample.dgmtest(seed=args.seed, **options)
+    _write_text(report(result, options["bw"]), args.output)
+    if args.compare is None:
+        return 0
+    with open(args.compare) as fh:
+        rows = pd.DataFrame(compare_report(fh.read(), result))
+    print(rows.to_string(index=False), file=sys.stderr)
+    return 1 if rows["match"].eq(False).any() else 0
+
+
+def run_check(args):
+    if args.export_stata is not None:
+        names = reference.export_stata(args.export_stata, args.pattern)
+        print(f"wrote {len(names)} case(s) and reference.do to {args.export_stata}")
+        return 0
+    if args.stata_logs is not None:
+        table = reference.compare_stata_logs(args.stata_logs, args.pattern)
+        if table.empty:
+            print("no <case>.log found")
+            return 1
+        print(table.to_string(index=False))
+        return 1 if table["match"].eq(False).any() else 0
+    if args.update:
+        cases = reference.update(args.pattern)
+        print(f"recorded {len(cases)} case(s) in {reference.REFERENCE_FILE}")
+        return 0
+    table = reference.check(args.pattern, args.rtol)
+    with pd.option_context("display.float_format", "{:.3g}".format, "display.width", 120):
+        print(table.to_string(index=False))
+    failed = int((~table["ok"]).sum())
+    print(f"{failed} case(s) differ" if failed else "all cases agree")
+    return 1 if failed else 0
+
+
+def _output_arguments(parser, formats=OUTPUT_FORMATS):
+    parser.add_argument("--format", choices=formats, default=formats[0])
+    parser.add_argument("-o", "--output", help="file to write instead of stdout")
+
+
+def _file_arguments(parser):
+    parser.add_argument("file")
+    parser.add_argument("--dtype", choices=list(DTYPES), default="float64")
+    parser.add_argument("--file-format", choices=FORMATS, default=None)
+    parser.add_argument("--store", action="store_true",
+                        help="read through the shared memory-mapped dataset store")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m measurementerror",
+                                     description=__doc__.splitlines()[2])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    test = commands.add_parser("test", help="run the DGM test on a CSV or Parquet file")
+    _file_arguments(test)
+    test.add_argument("--y", required=True, help="outcome column")
+    test.add_argument("--x", required=True, nargs="+", help="regressor column(s)")
+    test.add_argument("--z", required=True, nargs="+", help="second measurement column(s)")
+    test.add_argument("--w", nargs="+", default=None, help="W1 covariate column(s)")
+    test.add_argument("--statistic", choices=list(STATISTICS.values()), default="CvM")
+    test.add_argument("--kernel", choices=list(STATA_KERNELS), default="epanechnikov")
+    test.add_argument("--bw", type=_bandwidth, default=None,
+                      help=f"bandwidth in SDs of X, or one of {', '.join(SELECTORS)}")
+    test.add_argument("--bootnum", type=int, default=1000)
+    test.add_argument("--multiplier", "--bootdist", choices=list(STATA_BOOTDIST),
+                      default="mammen")
+    test.add_argument("--seed", type=_seed, default=None,
+                      help="integer seed, or a name for cached multipliers")
+    test.add_argument("--method", choices=METHODS, default="auto")
+    test.add_argument("--smoothing", choices=SMOOTHERS, default="auto")
+    test.add_argument("--memory-budget", default=None, help='e.g. "2GiB"')
+    _output_arguments(test, TEST_FORMATS)
+    test.set_defaults(run=run_test)
+
+    simulate = commands.add_parser("simulate", help="rejection rates of Models I-IV")
+    simulate.add_argument("--model", nargs="+", choices=MODELS, default=list(MODELS))
+    simulate.add_argument("--n", type=int, nargs="+", default=[200])
+    simulate.add_argument("--sigma-me", type=float, nargs="+", default=[0.5])
+    simulate.add_argument("--prob-me", type=float, nargs="+", default=[0.25],
+                          help="1 - lambda, the share of mismeasured observations")
+    simulate.add_argument("--reps", type=int, default=PAPER_REPS,
+                          help="replications per cell (the most, with --target-se)")
+    simulate.add_argument("--bootnum", type=int, default=PAPER_BOOTNUM)
+    simulate.add_argument("--level", type=float, default=0.05)
+    simulate.add_argument("--target-se", type=float, default=None,
+                          help="stop every cell once its rate is this precise")
+    simulate.add_argument("--statistic", choices=list(STATISTICS.values()), default="CvM")
+    simulate.add_argument("--kernel", choices=list(KERNELS), default="epanechnikov")
+    simulate.add_argument("--seed", type=int, default=0)
+    simulate.add_argument("--workers", type=int, default=None)
+    simulate.add_argument("--task-size", type=int, default=DEFAULT_TASK_SIZE)
+    simulate.add_argument("--dgp", choices=DGPS, default="replication")
+    simulate.add_argument("--store", default=None,
+                          help="checkpoint directory; an interrupted grid resumes from it")
+    simulate.add_argument("--quiet", action="store_true", help="no progress on stderr")
+    _output_arguments(simulate)
+    simulate.set_defaults(run=run_simulate)
+
+    stata = commands.add_parser("stata", help="run a Stata dgmtest command line on a file")
+    _file_arguments(stata)
+    stata.add_argument("command", help='e.g. "dgmtest y x z, bootnum(5000) kernel(gaussian)"')
+    stata.add_argument("--seed", type=_seed, default=None)
+    stata.add_argument("--compare", help="Stata log of the same command to compare with")
+    stata.add_argument("-o", "--output", help="file to write instead of stdout")
+    stata.set_defaults(run=run_stata)
+
+    check = commands.add_parser("check", help="run the fixed-seed reference cases")
+    check.add_argument("-k", dest="pattern", help="regular expression on case names")
+    check.add_argument("--rtol", type=float, default=reference.RTOL)
+    check.add_argument("--update", action="store_true", help="record the current results")
+    check.add_argument("--export-stata", metavar="DIR",
+                       help="write the cases Stata can run, with a do-file")
+    check.add_argument("--stata-logs", metavar="DIR",
+                       help="compare the <case>.log files Stata wrote with the Python runs")
+    check.set_defaults(run=run_check)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except (ValueError, ImportError, OSError) as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 2
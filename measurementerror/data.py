@@ -0,0 +1,227 @@
+"""
+قراءة بيانات المستخدم من ملفات CSV و Parquet على دفعات
+Chunked CSV / Parquet ingestion of the Y, X, Z (and W1) columns of a test
+
+Only the requested columns are read, each chunk is parsed straight into a
+float array of the chosen dtype (float32 halves the footprint), rows with a
+missing or non-finite value in any requested column are dropped chunk by
+chunk, and the surviving rows are concatenated once at the end.  The file is
+therefore never held as a whole, nor as pandas object columns: peak memory is
+one chunk plus the numeric output.  Parquet files are read batch by batch
+through ``pyarrow``, which is only needed for that format.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .dgm import dgmtest
+from .gini import gini_test
+
+DEFAULT_CHUNK_ROWS = 100_000
+FORMATS = ("csv", "parquet")
+DTYPES = {"float32": np.float32, "float64": np.float64}
+# Stata writes missing numbers as "." when exporting to CSV
+CSV_NA_VALUES = (".",)
+
+
+def _as_names(columns):
+    if columns is None:
+        return []
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+def _dtype(dtype):
+    if isinstance(dtype, str):
+        try:
+            return DTYPES[dtype.lower()]
+        except KeyError:
+            raise ValueError(f"dtype must be one of {', '.join(DTYPES)}, got {dtype!r}") from None
+    dtype = np.dtype(dtype).type
+    if dtype not in DTYPES.values():
+        raise ValueError(f"dtype must be float32 or float64, got {dtype.__name__}")
+    return dtype
+
+
+def detect_format(source, file_format=None):
+    """"csv" or "parquet", from ``file_format`` or the extension of the file name.
+
+    ``source`` may be a path or a file object with a ``name`` (e.g. a
+    Streamlit upload).
+    """
+    if file_format is None:
+        name = str(getattr(source, "name", source)).lower()
+        file_format = "parquet" if name.endswith((".parquet", ".pq")) else "csv"
+    file_format = file_format.lower()
+    if file_format not in FORMATS:
+        raise ValueError(f"file_format must be one of {FORMATS}, got {file_format!r}")
+    return file_format
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _parquet_file(source):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("reading Parquet files requires pyarrow (pip install pyarrow)") from None
+    _rewind(source)
+    return pq.ParquetFile(source)
+
+
+def list_columns(source, file_format=None):
+    """Column names of a CSV or Parquet file, reading only its header or schema."""
+    if detect_format(source, file_format) == "parquet":
+        return list(_parquet_file(source).schema_arrow.names)
+    _rewind(source)
+    columns = list(pd.read_csv(source, nrows=0).columns)
+    _rewind(source)
+    return columns
+
+
+def read_frame(source, columns, file_format=None):
+    """DataFrame of ``columns`` only, e.g. the covariates that define subgroups."""
+    columns = _as_names(columns)
+    if detect_format(source, file_format) == "parquet":
+        return _parquet_file(source).read(columns=columns).to_pandas()[columns]
+    _rewind(source)
+    return pd.read_csv(source, usecols=columns, na_values=list(CSV_NA_VALUES))[columns]
+
+
+def _csv_chunks(source, columns, dtype, chunk_rows):
+    _rewind(source)
+    reader = pd.read_csv(source, usecols=columns, dtype={c: dtype for c in columns},
+                         na_values=list(CSV_NA_VALUES), chunksize=chunk_rows,
+                         engine="c", low_memory=True)
+    with reader:
+        for chunk in reader:
+            yield chunk[columns].to_numpy(dtype=dtype)
+
+
+def _parquet_chunks(source, columns, dtype, chunk_rows):
+    parquet = _parquet_file(source)
+    import pyarrow as pa
+
+    arrow_type = pa.float32() if dtype is np.float32 else pa.float64()
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        out = np.empty((batch.num_rows, len(columns)), dtype=dtype)
+        for c, name in enumerate(columns):
+            # Nulls become NaN and are dropped with the other missing values
+            out[:, c] = batch.column(name).cast(arrow_type).to_numpy(zero_copy_only=False)
+        yield out
+
+
+def iter_chunks(source, columns, dtype="float64", chunk_rows=DEFAULT_CHUNK_ROWS,
+                file_format=None):
+    """Yield (rows, len(columns)) arrays of ``columns`` with incomplete rows dropped.
+
+    Each chunk also reports how many rows it dropped: the generator yields
+    ``(values, dropped)`` pairs.
+    """
+    columns = _as_names(columns)
+    dtype = _dtype(dtype)
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be positive")
+    if detect_format(source, file_format) == "parquet":
+        chunks = _parquet_chunks(source, columns, dtype, chunk_rows)
+    else:
+        chunks = _csv_chunks(source, columns, dtype, chunk_rows)
+    for values in chunks:
+        keep = np.isfinite(values).all(axis=1)
+        yield (values if keep.all() else values[keep]), int(keep.size - keep.sum())
+
+
+@dataclass
+class Sample:
+    """Complete cases of the columns of a test, read by :func:`load_sample`.
+
+    ``x`` and ``z`` are (n, k) matrices; ``w`` holds the W1 covariates (zero
+    columns when there are none).  The test conditions on (X, W1), which
+    :attr:`regressors` stacks.
+    """
+
+    y: np.ndarray = field(repr=False)
+    x: np.ndarray = field(repr=False)
+    z: np.ndarray = field(repr=False)
+    w: np.ndarray = field(repr=False)
+    columns: dict
+    dropped: int = 0
+
+    @property
+    def n(self):
+        return self.y.shape[0]
+
+    @property
+    def regressors(self):
+        return np.hstack([self.x, self.w]) if self.w.shape[1] else self.x
+
+    def dgmtest(self, **options):
+        """Run :func:`measurementerror.dgm.dgmtest` on the sample."""
+        w = self.w if self.w.shape[1] else None
+        return dgmtest(self.y, self.x, self.z, w=w, **options)
+
+    def gini_test(self, **options):
+        """Run :func:`measurementerror.gini.gini_test` on the sample."""
+        w = self.w if self.w.shape[1] else None
+        return gini_test(self.y, self.x, self.z, w=w, **options)
+
+
+def _roles(y, x, z, w):
+    """Column names by role, checked: one Y, at least one X and Z, no column twice."""
+    groups = {"y": _as_names(y), "x": _as_names(x), "z": _as_names(z), "w": _as_names(w)}
+    if len(groups["y"]) != 1:
+        raise ValueError("y must name exactly one column")
+    for role in ("x", "z"):
+        if not groups[role]:
+            raise ValueError(f"{role} must name at least one column")
+    columns = [c for role in ("y", "x", "z", "w") for c in groups[role]]
+    if len(set(columns)) != len(columns):
+        raise ValueError("a column can only play one role")
+    return groups
+
+
+def load_sample(source, y, x, z, w=None, dtype="float64", chunk_rows=DEFAULT_CHUNK_ROWS,
+                file_format=None):
+    """Read the Y, X, Z and optional W1 columns of a CSV or Parquet file.
+
+    Parameters
+    ----------
+    source : str, path or file object
+        CSV or Parquet file; uploads are accepted as file objects.
+    y : str
+        Outcome column.
+    x, z, w : str or list of str
+        Regressor, second measurement and W1 covariate columns.
+    dtype : {"float64", "float32"}
+        Storage type of the parsed columns.
+    chunk_rows : int
+        Rows parsed per chunk; bounds the memory used while reading.
+    file_format : {"csv", "parquet"}, optional
+        Defaults to the file extension.
+
+    Returns
+    -------
+    Sample
+    """
+    groups = _roles(y, x, z, w)
+    columns = [c for role in ("y", "x", "z", "w") for c in groups[role]]
+
+    parts, dropped = [], 0
+    for values, lost in iter_chunks(source, columns, dtype, chunk_rows, file_format):
+        parts.append(values)
+        dropped += lost
+    data = np.concatenate(parts) if parts else np.empty((0, len(columns)), dtype=_dtype(dtype))
+    del parts
+
+    out, start = {}, 0
+    for role in ("y", "x", "z", "w"):
+        stop = start + len(groups[role])
+        out[role] = data[:, start:stop]
+        start = stop
+    return Sample(y=out["y"][:, 0], x=out["x"], z=out["z"], w=out["w"],
+                  columns=groups, dropped=dropped)
+
@@ -0,0 +1,249 @@
+"""
+مخزن بيانات عمودي مُعيَّن في الذاكرة ومشترك بين الجلسات
+Columnar, memory-mapped dataset store shared across sessions and processes
+
+A CSV or Parquet file is parsed once, chunk by chunk, into one float64
+``.npy`` file per numeric column (missing values as NaN; text columns are
+left out) under ``<cache>/datasets/<content hash>/``.  The SHA-256 of the
+file's bytes is the key, so the same upload from any browser session, or
+the same file configured by path, maps to the same directory; later reads
+memory-map the columns read-only, and every session and worker process
+shares the pages of the OS cache instead of holding its own parsed copy.
+
+A dataset is written under a temporary directory and renamed into place
+with its manifest, so a reader never sees a half-written dataset.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .data import (CSV_NA_VALUES, DEFAULT_CHUNK_ROWS, Sample, _as_names, _dtype,
+                   _parquet_file, _rewind, _roles, detect_format)
+from .store import DEFAULT_CACHE_DIR
+
+HASH_BLOCK = 2**20
+MANIFEST = "manifest.json"
+# Header bytes reserved in every column file, rewritten once the length is known
+NPY_HEADER = 128
+
+
+def content_hash(source):
+    """SHA-256 hex digest of the bytes of a path or file object."""
+    digest = hashlib.sha256()
+    if hasattr(source, "read"):
+        _rewind(source)
+        for block in iter(lambda: source.read(HASH_BLOCK), b""):
+            digest.update(block)
+        _rewind(source)
+    else:
+        with open(source, "rb") as fh:
+            for block in iter(lambda: fh.read(HASH_BLOCK), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _npy_header(rows):
+    header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d,), }" % rows
+    header = header.ljust(NPY_HEADER - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + np.uint16(len(header)).tobytes() + header.encode("latin1")
+
+
+def _numeric(column):
+    """float64 values of a chunk of one column, or None if it holds text."""
+    if pd.api.types.is_bool_dtype(column) or pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = pd.to_numeric(column, errors="coerce")
+    if (values.isna() & column.notna()).any():
+        return None
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _csv_frames(source, chunk_rows):
+    _rewind(source)
+    reader = pd.read_csv(source, na_values=list(CSV_NA_VALUES), chunksize=chunk_rows,
+                         engine="c", low_memory=True)
+    with reader:
+        yield from reader
+
+
+def _parquet_frames(source, chunk_rows, text):
+    parquet = _parquet_file(source)
+    import pyarrow as pa
+
+    numeric = []
+    for field in parquet.schema_arrow:
+        if (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+                or pa.types.is_boolean(field.type) or pa.types.is_decimal(field.type)):
+            numeric.append(field.name)
+        else:
+            text.add(field.name)
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=numeric):
+        yield batch.to_pandas()
+
+
+class StoredDataset:
+    """Read-only view of one stored dataset; columns are memory-mapped on demand."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as fh:
+            self.manifest = json.load(fh)
+        self.key = self.manifest["key"]
+        self.rows = self.manifest["rows"]
+        self._files = dict(self.manifest["files"])
+
+    @property
+    def columns(self):
+        """Names of the stored (numeric) columns, in file order."""
+        return list(self._files)
+
+    def column(self, name):
+        """Read-only memory map of column ``name``."""
+        try:
+            file = self._files[name]
+        except KeyError:
+            raise ValueError(f"column {name!r} is not in the dataset (text columns are "
+                             f"not stored)") from None
+        return np.load(os.path.join(self.path, file), mmap_mode="r")
+
+    def frame(self, columns):
+        """DataFrame of ``columns`` (a copy, for pandas expressions)."""
+        columns = _as_names(columns)
+        return pd.DataFrame({name: np.asarray(self.column(name)) for name in columns})
+
+    def sample(self, y, x, z, w=None, dtype="float64"):
+        """Complete cases of the Y, X, Z and W1 columns, as :func:`measurementerror.data.load_sample`.
+
+        Without missing values, float64 single columns are views of the maps.
+        """
+        groups = _roles(y, x, z, w)
+        dtype = _dtype(dtype)
+        names = [c for role in ("y", "x", "z", "w") for c in groups[role]]
+        maps = {name: self.column(name) for name in names}
+        keep = np.ones(self.rows, dtype=bool)
+        for values in maps.values():
+            keep &= np.isfinite(values)
+        complete = bool(keep.all())
+
+        def role(names):
+            cols = [maps[name] if complete else maps[name][keep] for name in names]
+            if len(cols) == 1:
+                return np.asarray(cols[0], dtype=dtype)[:, None]
+            if not cols:
+                return np.empty((int(keep.sum()), 0), dtype=dtype)
+            return np.column_stack(cols).astype(dtype, copy=False)
+
+        return Sample(y=role(groups["y"])[:, 0], x=role(groups["x"]), z=role(groups["z"]),
+                      w=role(groups["w"]), columns=groups, dropped=int(keep.size - keep.sum()))
+
+
+class DatasetStore:
+    """Directory of datasets keyed by the content hash of their source file.
+
+    Layout::
+
+        <root>/<hash>/manifest.json
+        <root>/<hash>/<index>.npy          (one float64 vector per column)
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.join(DEFAULT_CACHE_DIR, "datasets") if root is None else root
+        os.makedirs(self.root, exist_ok=True)
+
+    def get(self, key):
+        """The stored dataset with content hash ``key``, or None."""
+        path = os.path.join(self.root, key)
+        if not os.path.exists(os.path.join(path, MANIFEST)):
+            return None
+        return StoredDataset(path)
+
+    def datasets(self):
+        """Manifests of every stored dataset (key, source name, rows, columns)."""
+        out = []
+        for key in sorted(os.listdir(self.root)):
+            dataset = self.get(key)
+            if dataset is not None:
+                out.append(dataset.manifest)
+        return out
+
+    def open(self, source, file_format=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """The dataset of a CSV / Parquet file, converting it on first use."""
+        key = content_hash(source)
+        dataset = self.get(key)
+        if dataset is None:
+            dataset = self._ingest(source, key, detect_format(source, file_format), chunk_rows)
+        return dataset
+
+    def _ingest(self, source, key, file_format, chunk_rows):
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be positive")
+        tmp = tempfile.mkdtemp(dir=self.root, prefix=".ingest-")
+        handles, text, rows = {}, set(), 0
+        try:
+            frames = (_parquet_frames(source, chunk_rows, text) if file_format == "parquet"
+                      else _csv_frames(source, chunk_rows))
+            for frame in frames:
+                for name in frame.columns:
+                    if name in text:
+                        continue
+                    values = _numeric(frame[name])
+                    if values is None:
+                        # A column with any text is left out, even if it began numeric
+                        text.add(name)
+                        handle = handles.pop(name, None)
+                        if handle is not None:
+                            handle.close()
+                            os.remove(handle.name)
+                        continue
+                    if name not in handles:
+                        path = os.path.join(tmp, f"{len(handles) + len(text)}.npy")
+                        handles[name] = handle = open(path, "w+b")
+                        handle.write(_npy_header(0))
+                        # Rows before the column's first chunk are missing
+                        handle.write(np.full(rows, np.nan).tobytes())
+                    handles[name].write(values.tobytes())
+                rows += len(frame)
+            files = []
+            for name, handle in handles.items():
+                handle.seek(0)
+                handle.write(_npy_header(rows))
+                handle.close()
+                files.append((str(name), os.path.basename(handle.name)))
+            manifest = {"key": key, "source": str(getattr(source, "name", source)),
+                        "format": file_format, "rows": rows, "files": files,
+                        "skipped": sorted(map(str, text))}
+            with open(os.path.join(tmp, MANIFEST), "w") as fh:
+                json.dump(manifest, fh)
+            try:
+                os.replace(tmp, os.path.join(self.root, key))
+            except OSError:
+                # Another session stored the same file first
+                if self.get(key) is None:
+                    raise
+        finally:
+            for handle in handles.values():
+                handle.close()
+            shutil.rmtree(tmp, ignore_errors=True)
+        return self.get(key)
+
+
+_default_store = None
+
+
+def default_store():
+    """The store under ``MEASUREMENTERROR_CACHE`` (default ~/.cache/measurementerror)."""
+    global _default_store
+    if _default_store is None:
+        _default_store = DatasetStore()
+    return _default_store
+
+
+def open_dataset(source, file_format=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """:meth:`DatasetStore.open` on the default store."""
+    return default_store().open(source, file_format, chunk_rows)
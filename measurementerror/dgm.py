@@ -0,0 +1,488 @@
+"""
+محرك اختبار Delgado & Gonzalez Manteiga (2001)
+Vectorized engine for the DGM test shown in the methodology section
+
+H0: E[Y | X, W1, Z] = E[Y | X, W1].  With X collecting (X, W1), the process
+
+    T_n(x, z) = n^-2 sum_i sum_j h^-q K((X_i - X_j) / h) (Y_i - Y_j) 1{X_i <= x} 1{Z_i <= z}
+
+is evaluated at every sample point (X_l, Z_l).  The sum over j collapses to the
+density-weighted residual e_i = n^-1 f_h(X_i) (Y_i - m_h(X_i)), so the whole
+process takes two passes: kernel sums over j, then indicator sums over i.
+Neither pass loops over pairs in Python and neither holds an n x n matrix; the
+indicator pass (componentwise over all columns of X, W1 and Z) is the sorted
+dominance count of :mod:`measurementerror.dominance`, compact product kernels
+only visit the neighbor pairs listed by :mod:`measurementerror.neighbors` (a
+KD-tree when q > 1), and large samples can use the binned FFT smoother of
+:mod:`measurementerror.binned`.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+from scipy import sparse
+
+from . import accel
+from .bandwidth import select_bandwidth
+from .binned import BinnedKernel, second_order
+from .bootstrap import get_multiplier, multiplier_bootstrap
+from .dominance import dominance_sums, orthant_sums
+from .kernels import DEFAULT_GAUSSIAN_TOL, get_kernel, is_compact
+from .memory import MemoryTracker, plan_bootstrap
+from .neighbors import WindowKernel, kernel_graph
+
+# Bytes allowed for one (rows x n) block of kernel weights or indicators
+DEFAULT_BLOCK_BYTES = 64 * 2**20
+# Largest n x n bootstrap influence matrix that is precomputed
+DEFAULT_INFLUENCE_BYTES = 512 * 2**20
+
+STATISTICS = {"cvm": "CvM", "ks": "KS"}
+METHODS = ("auto", "sorted", "dense")
+SMOOTHERS = ("auto", "dense", "neighbors", "binned")
+# "auto" bins the Gaussian kernel for scalar X beyond this sample size
+AUTO_BINNED_MIN_N = 10_000
+# "auto" uses the sorted indicator pass for three indicator columns beyond
+# this sample size; with four or more the blocked products stay faster
+AUTO_SORTED_MIN_N = 30_000
+LEVELS = (0.01, 0.05, 0.10)
+
+
+@dataclass
+class DGMResult:
+    """Outcome of :func:`dgmtest`.
+
+    ``process`` holds T_n(X_l, Z_l) for every observation; ``boot_cvm`` and
+    ``boot_ks`` are the multiplier-bootstrap draws of both statistics, so the
+    p-value and critical values of either one can be read off the same run.
+    ``peak_bytes`` is the most memory :func:`dgmtest` allocated at any one time,
+    recorded under a memory budget or with ``measure_memory`` (0 otherwise).
+    """
+
+    cvm: float
+    ks: float
+    boot_cvm: np.ndarray = field(repr=False)
+    boot_ks: np.ndarray = field(repr=False)
+    process: np.ndarray = field(repr=False)
+    n: int = 0
+    bandwidth: float = 0.0
+    kernel: str = "epanechnikov"
+    multiplier: str = "mammen"
+    statistic: str = "CvM"
+    peak_bytes: int = 0
+
+    @property
+    def bootnum(self):
+        return len(self.boot_cvm)
+
+    @property
+    def value(self):
+        return self.cvm if self.statistic == "CvM" else self.ks
+
+    @property
+    def boot(self):
+        return self.boot_cvm if self.statistic == "CvM" else self.boot_ks
+
+    @property
+    def pvalue(self):
+        """Share of bootstrap draws above the statistic, p(CvM < CvM*)."""
+        return float(np.mean(self.boot > self.value))
+
+    def critical_value(self, level=0.05):
+        return float(np.quantile(self.boot, 1.0 - level))
+
+    @property
+    def critical_values(self):
+        return {level: self.critical_value(level) for level in LEVELS}
+
+    def reject(self, level=0.05):
+        return self.value > self.critical_value(level)
+
+
+def rule_of_thumb_bandwidth(n, q=1):
+    """Default bandwidth h = n^(-1/(3q)) of Lee & Wilhelm (2019)."""
+    return float(n) ** (-1.0 / (3 * q))
+
+
+def _as_columns(a, name, n=None):
+    a = np.asarray(a, dtype=np.float64)
+    if a.ndim == 1:
+        a = a[:, None]
+    if a.ndim != 2:
+        raise ValueError(f"{name} must be a vector or an (n, k) matrix")
+    if n is not None and a.shape[0] != n:
+        raise ValueError(f"{name} has {a.shape[0]} rows, expected {n}")
+    if not np.all(np.isfinite(a)):
+        raise ValueError(f"{name} contains missing or infinite values")
+    return a
+
+
+def _standardize(x):
+    # Only differences X_i - X_j enter the kernel, so scaling is enough
+    sd = x.std(axis=0)
+    sd[sd == 0] = 1.0
+    return x / sd
+
+
+def _statistic_name(statistic):
+    try:
+        return STATISTICS[statistic.lower()]
+    except KeyError:
+        raise ValueError(f"statistic must be 'CvM' or 'KS', got {statistic!r}") from None
+
+
+def _block_rows(n, width, block_bytes=DEFAULT_BLOCK_BYTES):
+    return int(max(1, min(n, block_bytes // (8 * max(width, 1)))))
+
+
+def _kernel_block(x, start, stop, kern, h):
+    """Rows start:stop of the product-kernel matrix h^-q prod_c K((X_ic - X_jc) / h)."""
+    q = x.shape[1]
+    w = kern((x[start:stop, None, 0] - x[None, :, 0]) / h)
+    for c in range(1, q):
+        w *= kern((x[start:stop, None, c] - x[None, :, c]) / h)
+    w *= h ** -q
+    return w
+
+
+def _kernel_sums(x, values, kern, h, block_bytes=DEFAULT_BLOCK_BYTES):
+    """Return s0_i = sum_j K_h(X_i - X_j) and s1_i = sum_j K_h(X_i - X_j) values_j.
+
+    ``x`` is (n, q) and ``values`` is (n, m).  Rows are processed in blocks of
+    at most ``block_bytes``.
+    """
+    n = x.shape[0]
+    s0 = np.empty(n)
+    s1 = np.empty((n, values.shape[1]))
+    step = _block_rows(n, n, block_bytes)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        w = _kernel_block(x, start, stop, kern, h)
+        s0[start:stop] = w.sum(axis=1)
+        s1[start:stop] = w @ values
+    return s0, s1
+
+
+class _Smoother:
+    """Applies K_h(X_i - X_j) to columns: dense row blocks, a neighbor graph or bins.
+
+    "auto" uses the exact neighbor graph for compact kernels; the Gaussian gets
+    dense blocks, or the binned FFT approximation for scalar X with more than
+    ``AUTO_BINNED_MIN_N`` observations.  "binned" with the uniform kernel
+    falls back to the exact neighbor graph: binning its jump at the edge of
+    the support is only first-order accurate.  "neighbors" with the Gaussian
+    truncates it at the radius implied by ``gaussian_tol``.  With Numba (see
+    :mod:`measurementerror.accel`) dense blocks and scalar-X neighbor sums
+    run as compiled loops.
+    """
+
+    def __init__(self, x, kernel, h, smoothing="auto", gaussian_tol=DEFAULT_GAUSSIAN_TOL,
+                 block_bytes=DEFAULT_BLOCK_BYTES, grid_size=None):
+        if smoothing not in SMOOTHERS:
+            raise ValueError(f"smoothing must be one of {SMOOTHERS}, got {smoothing!r}")
+        n, q = x.shape
+        if smoothing == "auto":
+            if is_compact(kernel):
+                smoothing = "neighbors"
+            elif q == 1 and n > AUTO_BINNED_MIN_N:
+                smoothing = "binned"
+            else:
+                smoothing = "dense"
+        elif smoothing == "binned" and not second_order(kernel):
+            smoothing = "neighbors"
+        self.x = x
+        self.h = h
+        self.kern = get_kernel(kernel)
+        self.kernel = kernel.lower()
+        self.smoothing = smoothing
+        self.block_bytes = block_bytes
+        self.graph = None
+        self.s0 = None
+        if smoothing == "neighbors":
+            if q == 1 and accel.numba_enabled():
+                self.graph = WindowKernel(x[:, 0], kernel, h, gaussian_tol)
+            else:
+                # Pairs of 16 bytes (weight, index and working copies) per block
+                self.graph = kernel_graph(x, kernel, h, gaussian_tol, block_bytes // 16)
+        elif smoothing == "binned":
+            if q != 1:
+                raise ValueError("binned smoothing needs scalar X")
+            self.graph = BinnedKernel(x[:, 0], kernel, h, grid_size, gaussian_tol)
+        if self.graph is not None:
+            self.s0 = self.graph @ np.ones(n)
+
+    def sums(self, values):
+        """Return (s0, K @ values) with s0_i = sum_j K_h(X_i - X_j)."""
+        if self.graph is not None:
+            return self.s0, self.graph @ values
+        if accel.numba_enabled() and values.shape[1] <= accel.DENSE_MAX_COLUMNS:
+            self.s0, out = accel.kernel_sums(self.x, values, self.kernel, self.h)
+        else:
+            self.s0, out = _kernel_sums(self.x, values, self.kern, self.h, self.block_bytes)
+        return self.s0, out
+
+    def rows(self, start, stop):
+        """Rows start:stop of the kernel matrix, equal to its columns by symmetry."""
+        if self.graph is None:
+            return _kernel_block(self.x, start, stop, self.kern, self.h)
+        if sparse.issparse(self.graph):
+            return self.graph[start:stop].toarray()
+        return self.graph.rows(start, stop)
+
+
+def _indicator_block(points, start, stop):
+    """Rows start:stop of the matrix 1{points_i <= points_l} (componentwise)."""
+    ind = points[None, :, 0] <= points[start:stop, 0, None]
+    for c in range(1, points.shape[1]):
+        ind &= points[None, :, c] <= points[start:stop, c, None]
+    return ind
+
+
+def _indicator_matrix(points, block_bytes=DEFAULT_BLOCK_BYTES):
+    n = points.shape[0]
+    out = np.empty((n, n))
+    step = _block_rows(n, n, block_bytes)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        out[start:stop] = _indicator_block(points, start, stop)
+    return out
+
+
+def _indicator_sums_dense(points, values, block_bytes=DEFAULT_BLOCK_BYTES):
+    """Return sum_i values_i 1{points_i <= points_l} (componentwise) for every l."""
+    n = points.shape[0]
+    out = np.empty((n, values.shape[1]))
+    step = _block_rows(n, n, block_bytes)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        out[start:stop] = _indicator_block(points, start, stop).astype(np.float64) @ values
+    return out
+
+
+def _indicator_sums(points, values, method="auto", block_bytes=DEFAULT_BLOCK_BYTES):
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    n, d = points.shape
+    if method == "auto":
+        method = "sorted" if d <= 2 or (d == 3 and n > AUTO_SORTED_MIN_N) else "dense"
+    if method == "dense":
+        return _indicator_sums_dense(points, values, block_bytes)
+    if d == 2:
+        if accel.numba_enabled():
+            return accel.dominance_sums(points[:, 0], points[:, 1], values)
+        return dominance_sums(points[:, 0], points[:, 1], values)
+    return orthant_sums(points, values)
+
+
+def _statistics(process):
+    """CvM = sum_l T_n(X_l, Z_l)^2 and KS = sqrt(n) max_l |T_n(X_l, Z_l)| per column."""
+    n = process.shape[0]
+    return (process**2).sum(axis=0), np.sqrt(n) * np.abs(process).max(axis=0)
+
+
+def _prepare(y, x, z, kernel, bw, w=None):
+    y = _as_columns(y, "y")
+    if y.shape[1] != 1:
+        raise ValueError("y must be a single outcome vector")
+    n = y.shape[0]
+    if n < 2:
+        raise ValueError("no complete observations")
+    x = _as_columns(x, "x", n)
+    if w is not None:
+        x = np.hstack([x, _as_columns(w, "w", n)])
+    x = _standardize(x)
+    z = _as_columns(z, "z", n)
+    get_kernel(kernel)
+    if bw is None:
+        h = rule_of_thumb_bandwidth(n, x.shape[1])
+    elif isinstance(bw, str):
+        h = select_bandwidth(y[:, 0], x, bw.lower(), kernel)
+    else:
+        h = float(bw)
+    if h <= 0:
+        raise ValueError("bandwidth must be positive")
+    return y, x, z, h
+
+
+def _process(y, points, smoother, method, block_bytes):
+    n = y.shape[0]
+    s0, s1 = smoother.sums(y)
+    e = (s0[:, None] * y - s1) / n**2
+    resid = (y - s1 / s0[:, None])[:, 0]
+    return _indicator_sums(points, e, method, block_bytes), resid
+
+
+def _influence_matrix(points, resid, smoother, method, block_bytes, dtype=np.float64):
+    """M with T*_b = M V_b: M_li = n^-2 sum_r 1{P_r <= P_l} (s0_r d_ri - K_ri) e_i.
+
+    Feeding Y*_i = V_i e_i through the (linear) process gives the multiplier
+    bootstrap, so the kernel and indicator passes are paid once for all draws.
+    M is built in float64 a block of columns at a time and stored as ``dtype``.
+    """
+    n = points.shape[0]
+    out = np.empty((n, n), dtype=dtype)
+    step = _block_rows(n, n, block_bytes)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        g = np.ascontiguousarray(smoother.rows(start, stop).T)
+        np.negative(g, out=g)
+        g[np.arange(start, stop), np.arange(stop - start)] += smoother.s0[start:stop]
+        g *= resid[start:stop] / n**2
+        out[:, start:stop] = _indicator_sums(points, g, method, block_bytes)
+    return out
+
+
+@dataclass
+class _Fit:
+    """Sample statistics plus ``apply``, the map from multipliers V to T*."""
+
+    n: int
+    bandwidth: float
+    cvm: float
+    ks: float
+    process: np.ndarray
+    apply: object
+    chunk_size: int = None
+
+    def result(self, boot_cvm, boot_ks, kernel, multiplier, statistic, peak_bytes=0):
+        return DGMResult(
+            cvm=self.cvm, ks=self.ks, boot_cvm=boot_cvm, boot_ks=boot_ks,
+            process=self.process, n=self.n, bandwidth=self.bandwidth,
+            kernel=kernel.lower(), multiplier=multiplier.lower(), statistic=statistic,
+            peak_bytes=peak_bytes,
+        )
+
+
+def _fit(y, x, z, kernel, bw, method, smoothing, gaussian_tol, grid_size, block_bytes,
+         influence_bytes, w=None, tracker=None, chunk_size=None):
+    """Sample statistics and the bootstrap map.
+
+    Under the budget of ``tracker`` (see :mod:`measurementerror.memory`) the
+    blocks are capped, and the influence matrix dtype and the chunk size are
+    planned from the memory still free; ``influence_bytes`` is then ignored.
+    """
+    if tracker is not None:
+        block_bytes = tracker.block_bytes(block_bytes)
+    y, x, z, h = _prepare(y, x, z, kernel, bw, w)
+    n = y.shape[0]
+    points = np.hstack([x, z])
+    smoother = _Smoother(x, kernel, h, smoothing, gaussian_tol, block_bytes, grid_size)
+    process, resid = _process(y, points, smoother, method, block_bytes)
+    s0 = smoother.s0
+    cvm, ks = _statistics(process)
+
+    if tracker is not None and tracker.budget is not None:
+        dtype, chunk_size = plan_bootstrap(n, tracker.available, block_bytes, chunk_size)
+    else:
+        dtype = np.float64 if 8 * n * n <= influence_bytes else None
+
+    if dtype is not None:
+        influence = _influence_matrix(points, resid, smoother, method, block_bytes, dtype)
+
+        def apply(v):
+            return v.astype(dtype, copy=False) @ influence.T
+    else:
+        def apply(v):
+            w = resid[:, None] * v.T
+            _, kw = smoother.sums(w)
+            e = (s0[:, None] * w - kw) / n**2
+            return _indicator_sums(points, e, method, block_bytes).T
+
+    return _Fit(n, h, float(cvm[0]), float(ks[0]), process[:, 0], apply, chunk_size)
+
+
+def dgm_process(y, x, z, kernel="epanechnikov", bw=None, method="auto",
+                smoothing="auto", gaussian_tol=DEFAULT_GAUSSIAN_TOL, grid_size=None,
+                block_bytes=DEFAULT_BLOCK_BYTES, w=None):
+    """Evaluate T_n(X_l, Z_l) at every sample point.
+
+    The W1 covariates ``w`` are appended to ``x``: smoothing and indicators
+    run over (X, W1).  Each column is rescaled to unit standard deviation
+    before smoothing, so ``bw`` is expressed in standard deviations (default:
+    the rule of thumb for q = dim(X, W1)).
+    ``method`` picks the indicator pass: "sorted" dominance counting (O(n
+    log^(d-1) n) for d = dim(X, W1, Z)), "dense" blocked matrix products, or
+    "auto": sorted for d = 2, and for d = 3 beyond ``AUTO_SORTED_MIN_N``.
+    Both keep O(n k) memory for k columns.
+    ``smoothing`` picks the kernel pass: "neighbors" (pairs within the
+    kernel support; the Gaussian is truncated at mass ``gaussian_tol``),
+    "binned" (linear binning on ``grid_size`` points plus FFT, scalar X only;
+    "neighbors" for the uniform kernel),
+    "dense" row blocks, or "auto" (see :class:`_Smoother`).
+    """
+    y, x, z, h = _prepare(y, x, z, kernel, bw, w)
+    smoother = _Smoother(x, kernel, h, smoothing, gaussian_tol, block_bytes, grid_size)
+    process, _ = _process(y, np.hstack([x, z]), smoother, method, block_bytes)
+    return process[:, 0]
+
+
+def dgmtest(y, x, z, statistic="CvM", kernel="epanechnikov", bw=None,
+            bootnum=1000, multiplier="mammen", seed=None, method="auto",
+            smoothing="auto", gaussian_tol=DEFAULT_GAUSSIAN_TOL, grid_size=None,
+            chunk_size=None, block_bytes=DEFAULT_BLOCK_BYTES,
+            influence_bytes=DEFAULT_INFLUENCE_BYTES, w=None, memory_budget=None,
+            measure_memory=False, progress=None):
+    """Delgado & Gonzalez Manteiga test of H0: E[Y | X, W1, Z] = E[Y | X, W1].
+
+    Parameters
+    ----------
+    y, x, z : array_like
+        Outcome, mismeasured regressor and second measurement / instrument.
+        ``x`` and ``z`` may be vectors or (n, k) matrices.
+    statistic : {"CvM", "KS"}
+        Statistic reported by ``result.value`` and ``result.pvalue``; both are
+        always computed.
+    kernel : str
+        One of :data:`measurementerror.kernels.KERNELS`.
+    bw : float or {"rot", "lscv", "plugin"}, optional
+        Bandwidth in standard deviations of X, or a selector applied to the
+        regression of Y on X (see :mod:`measurementerror.bandwidth`);
+        defaults to the rule of thumb n^(-1/(3q)).
+    bootnum : int
+        Number of multiplier-bootstrap replications.
+    multiplier : {"mammen", "rademacher", "gaussian"}
+        Distribution of the bootstrap multipliers V.
+    seed : int, str or numpy.random.Generator, optional
+        Seed for the multiplier draws.  A string names a stream cached on
+        disk (:mod:`measurementerror.weights`): tests under the same name and
+        n reuse identical draws across runs and sessions.
+    method : {"auto", "sorted", "dense"}
+        Indicator pass, see :func:`dgm_process`.
+    smoothing : {"auto", "neighbors", "binned", "dense"}
+        Kernel pass, see :func:`dgm_process`.
+    gaussian_tol : float
+        Kernel mass dropped when the Gaussian is truncated.
+    grid_size : int, optional
+        Grid points of the binned smoother (default: 20 per bandwidth).
+    chunk_size : int, optional
+        Bootstrap draws evaluated per block; bounds the (chunk_size x n)
+        working memory.  Results do not depend on it.
+    influence_bytes : int
+        Largest n x n influence matrix to precompute.  Above it every chunk
+        re-runs the kernel and indicator passes instead.
+    w : array_like, optional
+        W1 covariates, a vector or (n, k) matrix, conditioned on together
+        with X under both hypotheses.
+    memory_budget : int or str, optional
+        Ceiling on the memory the run allocates, in bytes or as "2GiB".
+        Blocks, chunks and the influence matrix (float64, float32 or none)
+        are then sized to fit, see :mod:`measurementerror.memory`; the
+        result records the actual peak in ``peak_bytes``.
+    measure_memory : bool
+        Record the peak in ``peak_bytes`` without a budget too (0 otherwise).
+        Allocations are then traced, which slows small tests about twofold.
+    progress : callable, optional
+        ``progress(draws_done, bootnum)``, called as the bootstrap advances
+        (see :mod:`measurementerror.jobs`).
+
+    Returns
+    -------
+    DGMResult
+    """
+    statistic = _statistic_name(statistic)
+    get_multiplier(multiplier)
+    with MemoryTracker(memory_budget, trace=measure_memory or None) as tracker:
+        fit = _fit(y, x, z, kernel, bw, method, smoothing, gaussian_tol, grid_size,
+                   block_bytes, influence_bytes, w, tracker, chunk_size)
+        boot_cvm, boot_ks = multiplier_bootstrap(fit.apply, fit.n, bootnum, multiplier, seed,
+                                                 fit.chunk_size, progress)
+    return fit.result(boot_cvm, boot_ks, kernel, multiplier, statistic, tracker.peak)
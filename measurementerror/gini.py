@@ -0,0 +1,255 @@
+"""
+اختبار تساوي معاملات Gini الشرطية
+Conditional Gini test: the Gini hypothesis of the hypotheses section
+
+Without measurement error Y is independent of Z given X, so every function
+of (Y, X) has the same mean given (X, Z) as given X.  For the conditional
+Gini coefficient G(x) = 2 Cov(Y, F(Y | x) | X = x) / E[Y | X = x] take
+
+    psi(Y, X) = Y (2 F(Y | X) - 1 - G(X)),    E[psi | X] = 0,
+
+and test E[psi | X, W1, Z] = 0 with the DGM process of :mod:`measurementerror.dgm`
+applied to the estimated psi_i.  F(. | X_i) and G(X_i) are kernel-weighted
+over the neighbors of X_i (weights K_h(X_i - X_j)) using the identity
+
+    G = sum_j w_j Y_j (2 F_mid(Y_j) - 1) / sum_j w_j Y_j,
+
+with F_mid(y) = W(Y < y) + W(Y = y) / 2, so no |Y_i - Y_j| pair is formed:
+the columns of the kernel matrix are relabelled by the rank of Y once, after
+which every row's weights are already in Y order and F_mid is a cumulative
+sum along the row (ties handled as runs).  Compact kernels use the sparse
+neighbor graph, so a pass costs O(n log n + pairs); otherwise rows come in
+dense blocks.  With binned smoothing (scalar X; "auto" for the Gaussian on
+large samples) every row of K is the linear blend of two grid rows of
+:class:`~measurementerror.binned.BinnedKernel`, so the cumulative sums and
+the Gini of every observation follow from those of the G grid rows: O(G n).
+
+The bootstrap is the multiplier bootstrap of the mean test with psi_i as the
+outcome; the estimation of F and G inside psi_i is not propagated into it.
+"""
+
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+from scipy import sparse
+
+from .binned import BinnedKernel, second_order
+from .bootstrap import get_multiplier, multiplier_bootstrap
+from .dgm import (AUTO_BINNED_MIN_N, DEFAULT_BLOCK_BYTES, DEFAULT_INFLUENCE_BYTES, SMOOTHERS,
+                  DGMResult, _block_rows, _fit, _kernel_block, _prepare, _statistic_name)
+from .kernels import DEFAULT_GAUSSIAN_TOL, get_kernel, is_compact
+from .memory import MemoryTracker
+from .neighbors import kernel_graph
+
+# Working arrays per stored weight in the Gini pass (weights, ranks, sums, runs)
+GINI_COPIES = 12
+
+
+@dataclass
+class GiniResult(DGMResult):
+    """Outcome of :func:`gini_test`: a :class:`DGMResult` for the process of psi_i.
+
+    ``gini`` holds G_h(X_i), the Gini coefficient of Y among the kernel
+    neighbors of every observation, and ``pseudo`` the psi_i tested.
+    """
+
+    gini: np.ndarray = field(default=None, repr=False)
+    pseudo: np.ndarray = field(default=None, repr=False)
+
+
+def _gini_rows(data, ranks, indptr, y_sorted, groups, own_rank):
+    """Weighted F_mid(Y_i) and Gini of rows whose entries are in Y-rank order.
+
+    ``data`` and ``ranks`` (column ranks) are the row entries, CSR-style with
+    ``indptr``; ``groups`` maps ranks to tie groups and ``own_rank`` gives the
+    rank of every row's own observation.
+    """
+    rows = indptr.shape[0] - 1
+    counts = np.diff(indptr)
+    row_of = np.repeat(np.arange(rows), counts)
+    cum = np.cumsum(data)
+    cum -= np.concatenate([[0.0], cum])[indptr[:-1]][row_of]
+    g = groups[ranks]
+    new_run = np.ones(data.shape[0], dtype=bool)
+    new_run[1:] = (row_of[1:] != row_of[:-1]) | (g[1:] != g[:-1])
+    starts = np.flatnonzero(new_run)
+    run_id = np.cumsum(new_run) - 1
+    ends = np.append(starts[1:], data.shape[0]) - 1
+    w_le = cum[ends][run_id]
+    w_lt = w_le - np.add.reduceat(data, starts)[run_id]
+    s0 = cum[indptr[1:] - 1]
+    wy = data * y_sorted[ranks]
+    mass = np.bincount(row_of, wy, minlength=rows)
+    spread = np.bincount(row_of, wy * (w_lt + w_le - s0[row_of]), minlength=rows)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gini = np.where(mass > 0, spread / (s0 * mass), 0.0)
+    own = ranks == own_rank[row_of]
+    cdf = np.empty(rows)
+    cdf[row_of[own]] = (w_lt[own] + w_le[own]) / (2 * s0[row_of[own]])
+    return cdf, gini
+
+
+def _gini_binned(y_sorted, groups, order, rank, x, kernel, h, grid_size, gaussian_tol,
+                 block_bytes):
+    binned = BinnedKernel(x[:, 0], kernel, h, grid_size, gaussian_tol)
+    n, size = y_sorted.shape[0], binned.grid.shape[0]
+    reach = binned.weights.shape[0] // 2
+    left, frac = binned.left[order], binned.frac[order]
+    # K_h between grid points d apart is table[d + size + 1], zero beyond the reach
+    table = np.zeros(2 * size + 3)
+    table[size + 1 - reach:size + 2 + reach] = binned.weights
+
+    total = np.empty(size)  # S_g, row sums of grid row g
+    mass = np.empty(size)  # P_g = sum_j R_gj Y_j
+    cross = np.empty((size, 3))  # A_g,g+d = sum_j R_gj Y_j M_g+d,j for d = -1, 0, 1
+    own = np.empty((n, 2))  # M_left_i and M_left_i+1 at observation i
+    # Grid rows per block: about the kernel reach, within the block budget
+    step = int(np.clip(2 * reach + 2, 2, max(2, _block_rows(size, n, block_bytes // GINI_COPIES))))
+    for g0 in range(0, size, step - 1):
+        g1 = min(g0 + step, size)
+        # Only observations binned within reach of the block carry weight
+        cols = np.flatnonzero((left >= g0 - reach - 1) & (left <= g1 + reach))
+        g = np.arange(g0, g1)[:, None] + (size + 1)
+        offset = g - left[cols]
+        rows = (1 - frac[cols]) * table[offset] + frac[cols] * table[offset - 1]
+        cum = np.cumsum(rows, axis=1)
+        # M = W(Y < Y_j) + W(Y <= Y_j) per row; tie runs share the run's sums
+        run = groups[cols]
+        last = np.searchsorted(run, run, side="right") - 1
+        first = np.searchsorted(run, run, side="left")
+        mid = 2 * cum - rows
+        tied = np.flatnonzero(last != first)
+        if tied.size:
+            exclusive = cum - rows
+            mid[:, tied] = cum[:, last[tied]] + exclusive[:, first[tied]]
+        ry = rows * y_sorted[cols]
+        total[g0:g1] = cum[:, -1] if cols.size else 0.0
+        mass[g0:g1] = ry.sum(axis=1)
+        cross[g0:g1, 1] = np.einsum("ij,ij->i", ry, mid)
+        cross[g0 + 1:g1, 0] = np.einsum("ij,ij->i", ry[1:], mid[:-1])
+        cross[g0:g1 - 1, 2] = np.einsum("ij,ij->i", ry[:-1], mid[1:])
+        inner = np.flatnonzero((left >= g0) & (left + 1 < g1))
+        at = np.searchsorted(cols, inner)
+        own[inner, 0] = mid[left[inner] - g0, at]
+        own[inner, 1] = mid[left[inner] + 1 - g0, at]
+        if g1 == size:
+            break
+
+    a, b = 1 - frac, frac
+    s0 = a * total[left] + b * total[left + 1]
+    weighted = a * mass[left] + b * mass[left + 1]
+    spread = (a * a * cross[left, 1] + a * b * (cross[left, 2] + cross[left + 1, 0])
+              + b * b * cross[left + 1, 1]) - s0 * weighted
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gini_sorted = np.where(weighted > 0, spread / (s0 * weighted), 0.0)
+    cdf_sorted = (a * own[:, 0] + b * own[:, 1]) / (2 * s0)
+    return gini_sorted[rank], cdf_sorted[rank]
+
+
+def conditional_gini(y, x, kernel="epanechnikov", bw=None, smoothing="auto",
+                     gaussian_tol=DEFAULT_GAUSSIAN_TOL, grid_size=None,
+                     block_bytes=DEFAULT_BLOCK_BYTES, w=None):
+    """Kernel estimates G_h(X_i) and F_h(Y_i | X_i) at every observation.
+
+    ``y`` must be nonnegative (a Gini of 0 is returned where all neighbors
+    have Y = 0).  ``x``, ``w``, ``bw``, ``smoothing`` and ``grid_size`` are
+    as in :func:`measurementerror.dgm.dgm_process`, with "auto" choosing as
+    :class:`measurementerror.dgm._Smoother` does, except that the Gaussian
+    on multivariate X beyond ``AUTO_BINNED_MIN_N`` observations uses the
+    neighbor graph (truncated at mass ``gaussian_tol``).
+
+    Returns
+    -------
+    (gini, cdf) : two arrays of length n.
+    """
+    y, x, _, h = _prepare(y, x, np.zeros(np.shape(y)[0]), kernel, bw, w)
+    return _gini_pass(y[:, 0], x, kernel, h, smoothing, gaussian_tol, grid_size, block_bytes)
+
+
+def _gini_pass(y, x, kernel, h, smoothing, gaussian_tol, grid_size, block_bytes):
+    if smoothing not in SMOOTHERS:
+        raise ValueError(f"smoothing must be one of {SMOOTHERS}, got {smoothing!r}")
+    if np.any(y < 0):
+        raise ValueError("the Gini coefficient needs a nonnegative outcome")
+    n, q = x.shape
+    if smoothing == "auto":
+        if is_compact(kernel):
+            smoothing = "neighbors"
+        elif n > AUTO_BINNED_MIN_N:
+            smoothing = "binned" if q == 1 else "neighbors"
+        else:
+            smoothing = "dense"
+    elif smoothing == "binned" and not second_order(kernel):
+        # As in the test: binning the uniform kernel is only first-order accurate
+        smoothing = "neighbors"
+    if smoothing == "binned" and q != 1:
+        raise ValueError("binned smoothing needs scalar X")
+    order = np.argsort(y, kind="stable")
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    y_sorted = y[order]
+    groups = np.concatenate([[0], np.cumsum(y_sorted[1:] != y_sorted[:-1])])
+    if smoothing == "binned":
+        return _gini_binned(y_sorted, groups, order, rank, x, kernel, h, grid_size,
+                            gaussian_tol, block_bytes)
+    gini = np.empty(n)
+    cdf = np.empty(n)
+
+    if smoothing == "neighbors":
+        graph = kernel_graph(x, kernel, h, gaussian_tol, block_bytes // 16)
+        graph = sparse.csr_matrix((graph.data, rank[graph.indices], graph.indptr), shape=(n, n))
+        graph.sort_indices()
+        start = 0
+        while start < n:
+            # Rows holding about block_bytes / GINI_COPIES stored weights
+            limit = graph.indptr[start] + block_bytes // (8 * GINI_COPIES)
+            stop = min(max(np.searchsorted(graph.indptr, limit, side="right") - 1, start + 1), n)
+            p0, p1 = graph.indptr[start], graph.indptr[stop]
+            cdf[start:stop], gini[start:stop] = _gini_rows(
+                graph.data[p0:p1], graph.indices[p0:p1].astype(np.int64),
+                graph.indptr[start:stop + 1] - p0, y_sorted, groups, rank[start:stop])
+            start = stop
+    else:
+        kern = get_kernel(kernel)
+        step = _block_rows(n, n, block_bytes // GINI_COPIES)
+        for start in range(0, n, step):
+            stop = min(start + step, n)
+            block = _kernel_block(x, start, stop, kern, h)[:, order]
+            indptr = np.arange(stop - start + 1, dtype=np.int64) * n
+            ranks = np.tile(np.arange(n), stop - start)
+            cdf[start:stop], gini[start:stop] = _gini_rows(
+                block.ravel(), ranks, indptr, y_sorted, groups, rank[start:stop])
+    return gini, cdf
+
+
+def gini_test(y, x, z, statistic="CvM", kernel="epanechnikov", bw=None,
+              bootnum=1000, multiplier="mammen", seed=None, method="auto",
+              smoothing="auto", gaussian_tol=DEFAULT_GAUSSIAN_TOL, grid_size=None, chunk_size=None,
+              block_bytes=DEFAULT_BLOCK_BYTES, influence_bytes=DEFAULT_INFLUENCE_BYTES,
+              w=None, memory_budget=None, measure_memory=False, progress=None):
+    """Test of equal conditional Gini coefficients, P(G*_P(X*) = G_P(X)) = 1.
+
+    Estimates psi_i = Y_i (2 F_h(Y_i | X_i) - 1 - G_h(X_i)) (see the module
+    docstring) and runs the DGM test of E[psi | X, W1, Z] = E[psi | X, W1]
+    on it with the same kernel and bandwidth.  Arguments are those of
+    :func:`measurementerror.dgm.dgmtest`; ``y`` must be nonnegative and
+    ``smoothing`` and ``grid_size`` apply to both the Gini and the test pass.
+
+    Returns
+    -------
+    GiniResult
+    """
+    statistic = _statistic_name(statistic)
+    get_multiplier(multiplier)
+    with MemoryTracker(memory_budget, trace=measure_memory or None) as tracker:
+        y, x, z, h = _prepare(y, x, z, kernel, bw, w)
+        gini, cdf = _gini_pass(y[:, 0], x, kernel, h, smoothing, gaussian_tol, grid_size,
+                               tracker.block_bytes(block_bytes))
+        pseudo = y[:, 0] * (2 * cdf - 1 - gini)
+        fit = _fit(pseudo, x, z, kernel, h, method, smoothing, gaussian_tol, grid_size,
+                   block_bytes, influence_bytes, None, tracker, chunk_size)
+        boot_cvm, boot_ks = multiplier_bootstrap(fit.apply, fit.n, bootnum, multiplier, seed,
+                                                 fit.chunk_size, progress)
+    result = fit.result(boot_cvm, boot_ks, kernel, multiplier, statistic, tracker.peak)
+    return GiniResult(**{f.name: getattr(result, f.name) for f in fields(result)},
+                      gini=gini, pseudo=pseudo)
@@ -0,0 +1,135 @@
+"""
+تشغيل المهام الطويلة في الخلفية مع التقدم والإلغاء
+Background execution of long computations with progress and cancellation
+
+A :class:`JobManager` runs functions on a small thread pool and keeps their
+state in :class:`Job` records, so a caller (the Streamlit script, which is
+re-executed on every interaction) only holds a job ID, polls the progress
+and picks the result up on a later run without recomputing it.  Submitting
+again under the same ``key`` returns the existing job unless it failed or
+was cancelled.
+
+The function receives a ``progress(done, total, partial=None)`` callback.
+Calling it records the progress, and ``partial`` if given (a result so far,
+e.g. a power curve being refined), and is also where cancellation takes
+effect: once
+:meth:`Job.cancel` was called it raises :class:`JobCancelled`, which unwinds
+the function at its next progress report.  :func:`measurementerror.dgm.dgmtest`,
+:func:`measurementerror.simulation.simulate_pvalues` and
+:func:`measurementerror.simulation.adaptive_rejection_rates` accept such a
+callback.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 2
+# Finished jobs kept for retrieval; the oldest are dropped beyond this
+DEFAULT_MAX_JOBS = 32
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by its progress callback once it was cancelled."""
+
+
+class Job:
+    """State of one submitted function: status, progress, result or error."""
+
+    def __init__(self, key=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.status = PENDING
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.partial = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def fraction(self):
+        if self.status == DONE:
+            return 1.0
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    @property
+    def running(self):
+        return self.status not in FINISHED
+
+    def cancel(self):
+        """Ask the job to stop at its next progress report."""
+        self._cancel.set()
+
+    def progress(self, done, total, partial=None):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+        self.done, self.total = done, total
+        if partial is not None:
+            self.partial = partial
+
+    def _run(self, function, args, kwargs):
+        if self._cancel.is_set():
+            self.status = CANCELLED
+        else:
+            self.status = RUNNING
+            try:
+                self.result = function(*args, progress=self.progress, **kwargs)
+                self.status = DONE
+            except JobCancelled:
+                self.status = CANCELLED
+            except Exception as err:  # reported to the caller through the job
+                self.error = err
+                self.status = FAILED
+        self.finished = time.time()
+
+
+class JobManager:
+    """Thread pool plus the table of jobs, shared by every session of the app."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_jobs=DEFAULT_MAX_JOBS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+
+    def submit(self, function, *args, key=None, **kwargs):
+        """Run ``function(*args, progress=..., **kwargs)`` in the background; returns the job ID."""
+        with self._lock:
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and job.status not in (FAILED, CANCELLED):
+                        return job.id
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._evict()
+        self._pool.submit(job._run, function, args, kwargs)
+        return job.id
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.running]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """The job with ID ``job_id``, or None if unknown or evicted."""
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+
+def substep(progress, index, count):
+    """Progress callback for step ``index`` of ``count`` equal steps of one job."""
+    def report(done, total, partial=None):
+        progress(index * total + done, count * total, partial)
+    return report
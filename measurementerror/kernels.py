@@ -0,0 +1,93 @@
+"""
+دوال النواة المستخدمة في اختبار Delgado & Gonzalez Manteiga
+Kernel functions used by the DGM test (same table as the methodology section)
+"""
+
+import numpy as np
+from scipy.special import ndtri
+
+# Gaussian mass allowed outside the truncation window (per coordinate)
+DEFAULT_GAUSSIAN_TOL = 1e-8
+
+
+def epanechnikov(u):
+    return 0.75 * np.clip(1.0 - u * u, 0.0, None)
+
+
+def gaussian(u):
+    return np.exp(-0.5 * u * u) / np.sqrt(2.0 * np.pi)
+
+
+def uniform(u):
+    return 0.5 * (np.abs(u) <= 1.0)
+
+
+def triangular(u):
+    return np.clip(1.0 - np.abs(u), 0.0, None)
+
+
+def biweight(u):
+    return (15.0 / 16.0) * np.clip(1.0 - u * u, 0.0, None) ** 2
+
+
+KERNELS = {
+    "epanechnikov": epanechnikov,
+    "gaussian": gaussian,
+    "uniform": uniform,
+    "triangular": triangular,
+    "biweight": biweight,
+}
+
+# Half-width of the support in units of h; the Gaussian is unbounded
+SUPPORT = {
+    "epanechnikov": 1.0,
+    "gaussian": np.inf,
+    "uniform": 1.0,
+    "triangular": 1.0,
+    "biweight": 1.0,
+}
+
+# R(K) = int K(u)^2 du and mu_2(K) = int u^2 K(u) du, for plug-in bandwidths
+ROUGHNESS = {
+    "epanechnikov": 3.0 / 5.0,
+    "gaussian": 1.0 / (2.0 * np.sqrt(np.pi)),
+    "uniform": 1.0 / 2.0,
+    "triangular": 2.0 / 3.0,
+    "biweight": 5.0 / 7.0,
+}
+SECOND_MOMENT = {
+    "epanechnikov": 1.0 / 5.0,
+    "gaussian": 1.0,
+    "uniform": 1.0 / 3.0,
+    "triangular": 1.0 / 6.0,
+    "biweight": 1.0 / 7.0,
+}
+
+
+def get_kernel(name):
+    """Return the kernel function registered under ``name`` (case-insensitive)."""
+    try:
+        return KERNELS[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"unknown kernel {name!r}; choose one of {', '.join(KERNELS)}"
+        ) from None
+
+
+def is_compact(name):
+    return np.isfinite(SUPPORT[name.lower()])
+
+
+def support_radius(name, tol=DEFAULT_GAUSSIAN_TOL):
+    """Half-width r (in units of h) outside which K is zero or neglected.
+
+    Compact kernels return 1.  The Gaussian is truncated at the r with
+    P(|N(0, 1)| > r) = ``tol``: each coordinate of the truncated kernel keeps
+    mass 1 - tol and every dropped weight is below phi(r) / h.
+    """
+    get_kernel(name)
+    if is_compact(name):
+        return SUPPORT[name.lower()]
+    if not 0 < tol < 1:
+        raise ValueError("tol must lie in (0, 1)")
+    return float(-ndtri(tol / 2.0))
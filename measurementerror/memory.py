@@ -0,0 +1,166 @@
+"""
+تشغيل الاختبار تحت سقف للذاكرة وقياس ذروتها
+Memory ceiling and peak-memory accounting for the test engine
+
+At CPS scale an n x n float64 matrix no longer fits (n = 31k gives 7.8 GB),
+so the engine can run under a byte ceiling.  Allocations are counted with
+``tracemalloc``, which sees every NumPy buffer, so the ceiling and the
+reported peak refer to the memory the run itself allocates on top of what
+was already in use.  Tracing roughly doubles the run time of a small test,
+so it is only on under a ceiling or when the peak is asked for.  :func:`plan_bootstrap` then picks, from the memory still
+free once the sample statistic is computed, how the bootstrap runs:
+
+* the influence matrix in float64 when it fits;
+* otherwise in float32.  Only the stored matrix and the (chunk x n) products
+  with the multipliers are single precision; the sample statistic, the
+  kernel and indicator passes that build the matrix and the sums behind the
+  bootstrap statistics stay in float64.  The relative rounding error of the
+  draws, about 1e-6, is far below the Monte Carlo error of any p-value;
+* otherwise no matrix: every chunk of draws reruns the kernel and indicator
+  passes, in O(n) memory per draw.
+
+The chunk size is the largest that fits in what is left.
+"""
+
+import os
+import re
+import threading
+import tracemalloc
+
+import numpy as np
+
+from .bootstrap import default_chunk_size
+
+# Share of the ceiling given to one kernel or indicator block
+BLOCK_SHARE = 16
+# Blocks alive at once while the influence matrix is built
+BUILD_BLOCKS = 6
+# (chunk x n) float64 arrays alive at once per chunk of draws, plus the
+# length-n index and rank arrays of one sorted indicator pass
+INFLUENCE_CHUNK_COPIES = 4
+RECOMPUTE_CHUNK_COPIES = 8
+INDICATOR_ROWS = 16
+INFLUENCE_DTYPES = (np.float64, np.float32)
+
+# Trackers inside their context, and whether they started tracemalloc
+_lock = threading.Lock()
+_users = 0
+_owned = False
+
+_UNITS = {"": 1, "b": 1, "k": 2**10, "kb": 10**3, "kib": 2**10, "m": 2**20, "mb": 10**6,
+          "mib": 2**20, "g": 2**30, "gb": 10**9, "gib": 2**30}
+
+
+def _reset_after_fork():
+    # A forked worker starts with no tracker of its own, whatever the parent was doing
+    global _lock, _users, _owned
+    _lock = threading.Lock()
+    if _owned and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _users, _owned = 0, False
+
+
+# Unix only; Windows starts workers fresh (spawn), with no tracker running
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def parse_bytes(value):
+    """Bytes from an int or a string such as "512MiB", "2 GB" or "1.5g"."""
+    if isinstance(value, str):
+        match = re.fullmatch(r"\s*([0-9.]+)\s*([a-zA-Z]*)\s*", value)
+        if match is None or match.group(2).lower() not in _UNITS:
+            raise ValueError(f"cannot read a byte count from {value!r}")
+        value = float(match.group(1)) * _UNITS[match.group(2).lower()]
+    value = int(value)
+    if value <= 0:
+        raise ValueError("a memory budget must be positive")
+    return value
+
+
+def format_bytes(value):
+    """Human-readable binary size, e.g. "1.5 GiB"."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024 or unit == "GiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+class MemoryTracker:
+    """Context manager counting the bytes allocated inside it.
+
+    ``used`` is the current and ``peak`` the highest allocation since entry.
+    Only a tracker with a ``budget``, or with ``trace=True``, traces; others
+    cost nothing and report a peak of 0.  ``tracemalloc`` is started by the
+    first tracing tracker and stopped by the last one to exit (unless it was
+    already tracing before), so trackers may overlap across threads.
+
+    ``tracemalloc`` counts the whole process: while trackers overlap, the
+    peak of each also counts the others' allocations, and the peak is only
+    reset when no other tracker is active.  Peaks and budgets are then upper
+    bounds, conservative for a budget, not the run's own.
+    """
+
+    def __init__(self, budget=None, trace=None):
+        self.budget = None if budget is None else parse_bytes(budget)
+        self.trace = self.budget is not None if trace is None else bool(trace)
+        self.peak = 0
+        self._base = 0
+
+    def __enter__(self):
+        global _users, _owned
+        if self.trace:
+            with _lock:
+                if _users == 0:
+                    _owned = not tracemalloc.is_tracing()
+                    if _owned:
+                        tracemalloc.start()
+                    tracemalloc.reset_peak()
+                _users += 1
+                self._base = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc):
+        global _users, _owned
+        if self.trace:
+            with _lock:
+                self.peak = max(0, tracemalloc.get_traced_memory()[1] - self._base)
+                _users -= 1
+                if _users == 0 and _owned:
+                    tracemalloc.stop()
+                    _owned = False
+        return False
+
+    @property
+    def used(self):
+        if not self.trace:
+            return 0
+        return max(0, tracemalloc.get_traced_memory()[0] - self._base)
+
+    @property
+    def available(self):
+        """Bytes left under the budget (None without one)."""
+        return None if self.budget is None else self.budget - self.used
+
+    def block_bytes(self, block_bytes):
+        """``block_bytes`` capped at the share of the budget given to one block."""
+        return block_bytes if self.budget is None else min(block_bytes, self.budget // BLOCK_SHARE)
+
+
+def plan_bootstrap(n, available, block_bytes, chunk_size=None):
+    """Influence-matrix dtype (None: no matrix) and chunk size fitting in ``available`` bytes.
+
+    Raises MemoryError when not even one draw at a time fits.
+    """
+    row = 8 * n
+    limit = default_chunk_size(n) if chunk_size is None else int(chunk_size)
+    work = BUILD_BLOCKS * block_bytes + INDICATOR_ROWS * row
+    for dtype in INFLUENCE_DTYPES:
+        rest = available - np.dtype(dtype).itemsize * n * n - work
+        if rest >= INFLUENCE_CHUNK_COPIES * row:
+            return dtype, int(min(limit, rest // (INFLUENCE_CHUNK_COPIES * row)))
+    rest = available - work
+    if rest < RECOMPUTE_CHUNK_COPIES * row:
+        raise MemoryError(f"the memory budget leaves {format_bytes(max(available, 0))}, "
+                          f"too little for the bootstrap at n = {n}")
+    return None, int(min(limit, rest // (RECOMPUTE_CHUNK_COPIES * row)))
@@ -0,0 +1,297 @@
+"""
+حالات مرجعية بذور ثابتة للتحقق من ثبات النتائج العددية
+Fixed-seed reference cases of the test, and their recorded results
+
+Every case draws a sample of Models I-IV from a fixed seed, runs
+:func:`measurementerror.dgm.dgmtest` with options given in Stata's terms
+(:func:`measurementerror.stata.stata_options`, plus engine options where a
+case exercises a particular pass) and compares n, the bandwidth, both
+statistics, the 1/5/10% critical values and the p-value with the values
+recorded in ``reference_cases.json``.  n must agree exactly, the bandwidth,
+statistics and critical values to ``RTOL`` (the compiled and NumPy passes
+differ by rounding only), and the p-value, a count of bootstrap draws over
+bootnum, to ``PVALUE_DRAWS`` draws: a statistic that ties a bootstrap
+draw can fall on either side of it after rounding.
+:data:`INVALID_INPUTS` are samples the test must reject, with the message,
+and :data:`STATA_NUMBERS` values with their ``%9.0g`` display.
+
+:func:`stata_scale` sets the engine against the Stata example log
+(:data:`measurementerror.stata.EXAMPLE_LOG`, n = 2682): the default
+bandwidth must print as in the log, and the CvM statistic,
+sum_l T_n(X_l, Z_l)^2 = n int T_n^2 dF_n, must keep null critical values of
+the same size at n = 300 and n = 2682, as the O(1) values of the log do
+(n times the statistic would grow them about ninefold).
+
+:func:`export_stata` writes the data of every case that Stata can run as
+CSV with a do-file of the matching ``dgmtest`` commands; the logs it
+produces are set against the Python results by :func:`compare_stata_logs`.
+
+    python -m measurementerror check            # compare with the recorded values
+    python -m measurementerror check --update   # record the current values
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from . import accel
+from .dgm import LEVELS, dgmtest, rule_of_thumb_bandwidth
+from .simulation import simulate
+from .stata import EXAMPLE_LOG, compare_report, parse_report, report, stata_number, stata_options
+from .weights import seed_sequence
+
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "reference_cases.json")
+RTOL = 1e-9
+# Compared exactly, and in bootstrap draws (p-value * bootnum); everything else to RTOL
+EXACT_FIELDS = ("n",)
+PVALUE_FIELD = "pvalue"
+PVALUE_DRAWS = 1
+SIGMA_ME = 0.5
+PROB_ME = 0.25
+# Null samples (no measurement error) of the CvM scale check, the larger of
+# the size of the Stata example; their 5% critical values may differ by
+# at most SCALE_RATIO either way
+SCALE_SIZES = (300, 2682)
+SCALE_RATIO = 2.0
+SCALE_SEED = 11
+SCALE_CASES = ("stata_bandwidth", "cvm_scale")
+
+
+@dataclass(frozen=True)
+class ReferenceCase:
+    """One fixed-seed run: the sample design, the Stata options and any engine options."""
+
+    name: str
+    model: str
+    n: int
+    seed: object
+    stata: dict = field(default_factory=dict, hash=False)
+    engine: dict = field(default_factory=dict, hash=False)
+    w: int = 0
+    z: int = 1
+
+    def data(self):
+        """(y, x, z, w) of the case; ``w`` is None without W1 covariates."""
+        rng = np.random.default_rng(seed_sequence(self.seed) if isinstance(self.seed, str)
+                                    else self.seed)
+        x, y, z, x_star = simulate(self.model, self.n, SIGMA_ME, PROB_ME, rng)
+        if self.z > 1:
+            extra = [x_star + rng.normal(0, 0.3, self.n) for _ in range(self.z - 1)]
+            z = np.column_stack([z, *extra])
+        w = rng.normal(size=(self.n, self.w)) if self.w else None
+        return y, x, z, w
+
+    @property
+    def stata_compatible(self):
+        """Whether Stata's dgmtest can run the case: no engine options, named seed or selector."""
+        bw = self.stata.get("bw")
+        return (not self.engine and not isinstance(self.seed, str) and self.z == 1
+                and (bw is None or isinstance(bw, (int, float))))
+
+    def run(self):
+        y, x, z, w = self.data()
+        return dgmtest(y, x, z, w=w, seed=self.seed, **stata_options(**self.stata),
+                       **self.engine)
+
+
+CASES = (
+    ReferenceCase("default", "I", 300, 1, {"bootnum": 499}),
+    ReferenceCase("ks_gaussian", "II", 300, 2, {"test": "ks", "kernel": "gaussian",
+                                                "bootnum": 499}),
+    ReferenceCase("rectangle_rademacher", "III", 300, 3,
+                  {"kernel": "rectangle", "bootdist": "rademacher", "bootnum": 499}),
+    ReferenceCase("triangle_normal_bw", "IV", 300, 4,
+                  {"kernel": "triangle", "bootdist": "normal", "bw": 0.3, "bootnum": 499}),
+    ReferenceCase("biweight_size", "I", 500, 5, {"kernel": "biweight", "bootnum": 499}),
+    ReferenceCase("w1_covariates", "II", 400, 6, {"bootnum": 499}, w=2),
+    ReferenceCase("bivariate_z", "III", 400, 7, {"test": "ks", "bootnum": 499}, z=2),
+    ReferenceCase("lscv_bandwidth", "I", 300, 8, {"bw": "lscv", "bootnum": 299}),
+    ReferenceCase("dense_passes", "II", 300, 9, {"bootnum": 299},
+                  {"method": "dense", "smoothing": "dense"}),
+    ReferenceCase("binned_gaussian", "I", 5000, 10, {"kernel": "gaussian", "bootnum": 199},
+                  {"smoothing": "binned"}),
+    ReferenceCase("named_seed", "IV", 300, "reference", {"bootnum": 299}),
+)
+
+
+# Samples dgmtest must reject with ValueError, and the message it gives
+INVALID_INPUTS = (
+    ("empty_sample", {"y": [], "x": [], "z": []}, "no complete observations"),
+    ("one_observation", {"y": [1.0], "x": [0.5], "z": [0.4]}, "no complete observations"),
+)
+
+
+# Values and how Stata displays them in %9.0g, tiny and huge ones included
+STATA_NUMBERS = (
+    (0.51238949, ".51238949"), (0.0262, ".0262"), (2682, "2682"), (-0.5, "-.5"),
+    (0.0719747903997501, ".07197479"), (-0.0719747903997501, "-.0719748"),
+    (123456789, "123456789"), (12345.6789, "12345.679"), (1e-4, ".0001"),
+    (1e-5, "1.00e-05"), (-1e-5, "-1.00e-05"), (1.5e12, "1.50e+12"),
+    (1234567890, "1.23e+09"), (-123456789, "-1.23e+08"), (1e-100, "1.0e-100"),
+    (1.7e308, "1.7e+308"), (float("nan"), "."),
+)
+
+
+def record(result):
+    """The compared quantities of a result."""
+    out = {"n": int(result.n), "bandwidth": float(result.bandwidth), "cvm": float(result.cvm),
+           "ks": float(result.ks)}
+    for level in LEVELS:
+        out[f"critical_{round(level * 100)}"] = result.critical_value(level)
+    out["pvalue"] = result.pvalue
+    return out
+
+
+def select(pattern=None):
+    """Cases whose name matches the regular expression ``pattern``."""
+    return [case for case in CASES if pattern is None or re.search(pattern, case.name)]
+
+
+def load(path=REFERENCE_FILE):
+    with open(path) as fh:
+        return json.load(fh)["cases"]
+
+
+def update(pattern=None, path=REFERENCE_FILE):
+    """Record the current results of the selected cases; returns them."""
+    cases = load(path) if os.path.exists(path) else {}
+    for case in select(pattern):
+        cases[case.name] = record(case.run())
+    with open(path, "w") as fh:
+        json.dump({"numpy": np.__version__, "numba": accel.numba_enabled(),
+                   "cases": dict(sorted(cases.items()))}, fh, indent=1)
+        fh.write("\n")
+    return cases
+
+
+def _rejects(inputs, message):
+    try:
+        dgmtest(**inputs)
+    except Exception as err:
+        return isinstance(err, ValueError) and str(err) == message
+    return False
+
+
+def stata_scale():
+    """Rows of :func:`check` setting the engine against the Stata example log."""
+    logged = parse_report(EXAMPLE_LOG)
+    bandwidth = rule_of_thumb_bandwidth(int(logged["n"]))
+    rows = [{"case": "stata_bandwidth",
+             "max_rel_error": _relative_error(logged["bandwidth"], bandwidth),
+             "field": "bandwidth",
+             "ok": stata_number(bandwidth) == stata_number(logged["bandwidth"])}]
+    critical = []
+    for n in SCALE_SIZES:
+        x, y, z, _ = simulate("I", n, SIGMA_ME, 0.0, np.random.default_rng(SCALE_SEED))
+        critical.append(dgmtest(y, x, z, seed=SCALE_SEED, bootnum=199).critical_value(0.05))
+    ratio = critical[-1] / critical[0]
+    rows.append({"case": "cvm_scale", "max_rel_error": abs(ratio - 1), "field": "critical_5",
+                 "ok": 1 / SCALE_RATIO <= ratio <= SCALE_RATIO})
+    return rows
+
+
+def _relative_error(expected, actual):
+    return abs(actual - expected) / max(abs(expected), np.finfo(float).tiny)
+
+
+def check(pattern=None, rtol=RTOL, path=REFERENCE_FILE):
+    """Run the selected cases against the recorded values.
+
+    Returns
+    -------
+    DataFrame, one row per case: the largest relative error of the fields
+    compared to ``rtol``, the field it is in, the p-value difference in
+    bootstrap draws (``pvalue_draws``) and whether the case passes
+    (``ok``).  Cases without recorded values fail.  The selected :data:`INVALID_INPUTS` follow, ``ok`` when
+    the test rejects them with their message, a row for
+    :data:`STATA_NUMBERS` and the rows of :func:`stata_scale`.
+    """
+    expected = load(path)
+    rows = []
+    for case in select(pattern):
+        actual = record(case.run())
+        if case.name not in expected:
+            rows.append({"case": case.name, "max_rel_error": np.nan, "field": "",
+                         "ok": False})
+            continue
+        recorded = expected[case.name]
+        errors = {name: _relative_error(recorded[name], value)
+                  for name, value in actual.items()
+                  if name not in EXACT_FIELDS and name != PVALUE_FIELD}
+        worst = max(errors, key=errors.get)
+        bootnum = stata_options(**case.stata)["bootnum"]
+        draws = abs(actual[PVALUE_FIELD] - recorded[PVALUE_FIELD]) * bootnum
+        ok = (all(actual[name] == recorded[name] for name in EXACT_FIELDS)
+              and round(draws, 6) <= PVALUE_DRAWS
+              and all(error <= rtol for error in errors.values()))
+        rows.append({"case": case.name, "max_rel_error": errors[worst], "field": worst,
+                     "pvalue_draws": draws, "ok": ok})
+    for name, inputs, message in INVALID_INPUTS:
+        if pattern is None or re.search(pattern, name):
+            rows.append({"case": name, "max_rel_error": np.nan, "field": "error",
+                         "ok": _rejects(inputs, message)})
+    if pattern is None or re.search(pattern, "stata_number"):
+        wrong = [value for value, text in STATA_NUMBERS if stata_number(value) != text]
+        rows.append({"case": "stata_number", "max_rel_error": np.nan,
+                     "field": ", ".join(map(repr, wrong)) or "display", "ok": not wrong})
+    if pattern is None or any(re.search(pattern, name) for name in SCALE_CASES):
+        rows += [row for row in stata_scale()
+                 if pattern is None or re.search(pattern, row["case"])]
+    return pd.DataFrame(rows)
+
+
+def _stata_command(case, variables):
+    text = " ".join(f"{name}({value})" for name, value in case.stata.items())
+    return f"dgmtest {' '.join(variables)}" + (f", {text}" if text else "")
+
+
+def export_stata(directory, pattern=None):
+    """Write ``<case>.csv`` for the Stata-compatible cases and ``reference.do`` to run them.
+
+    Stata logs every case to ``<case>.log`` next to the data.  Returns the
+    names of the exported cases.
+    """
+    os.makedirs(directory, exist_ok=True)
+    lines, names = [], []
+    for case in select(pattern):
+        if not case.stata_compatible:
+            continue
+        y, x, z, w = case.data()
+        columns = {"y": y, "x": x, "z": z}
+        for k in range(case.w):
+            columns[f"w{k + 1}"] = w[:, k]
+        command = _stata_command(case, list(columns))
+        pd.DataFrame(columns).to_csv(os.path.join(directory, f"{case.name}.csv"), index=False,
+                                     float_format="%.17g")
+        lines += [f'import delimited "{case.name}.csv", clear',
+                  f'log using "{case.name}.log", text replace',
+                  command, "log close", ""]
+        names.append(case.name)
+    with open(os.path.join(directory, "reference.do"), "w") as fh:
+        fh.write("\n".join(lines))
+    return names
+
+
+def compare_stata_logs(directory, pattern=None):
+    """Rows of :func:`measurementerror.stata.compare_report` for every ``<case>.log`` found."""
+    rows = []
+    for case in select(pattern):
+        path = os.path.join(directory, f"{case.name}.log")
+        if not os.path.exists(path):
+            continue
+        with open(path) as fh:
+            text = fh.read()
+        for row in compare_report(text, case.run()):
+            rows.append({"case": case.name, **row})
+    return pd.DataFrame(rows)
+
+
+def reports(pattern=None):
+    """The Stata-style log of every selected case."""
+    return {case.name: report(case.run(), stata_options(**case.stata)["bw"])
+            for case in select(pattern)}
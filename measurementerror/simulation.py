@@ -0,0 +1,475 @@
+"""
+محرك محاكاة مونت كارلو لحجم وقوة الاختبار
+Monte Carlo size / power engine for Models I-IV of the simulation section
+
+Every replication draws its data and its bootstrap multipliers from its own
+SeedSequence, keyed by (seed, model, n, sigma_ME, 1 - lambda, replication).
+Replications are grouped into tasks and spread over a process pool; since no
+stream is shared between tasks, the results are identical for any number of
+workers and any task size, and adding cells to a grid leaves the others
+unchanged.  With a :class:`~measurementerror.store.ResultStore` every finished
+task is checkpointed to disk, so an interrupted grid resumes where it stopped.
+
+:func:`adaptive_rejection_rates` adds replications to every cell in batches
+and stops a cell once its rejection rate is precise enough or clearly on one
+side of the nominal level.  Whether a cell stops depends only on its own
+replications, which are the same as above, so the result does not depend on
+the order in which the pool finishes tasks either.
+
+:func:`simulate_batch` and :func:`iter_simulate` draw R samples of a cell as
+(R, n) arrays in vectorized calls.  Each variable of the model (X*, D, eps,
+eta_X, the noise of Z) has its own stream, keyed by (seed, cell), which is
+consumed row by row, so streaming in chunks yields the same rows as one
+call.  With ``dgp="batch"`` the engine takes replication r's data from row r
+of these streams instead of from the replication's own stream; results then
+differ from the default, but stay independent of workers and task size.
+"""
+
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .dgm import dgmtest
+from .store import missing_runs
+
+MODELS = ("I", "II", "III", "IV")
+
+# Designs behind the tables of the simulation section (Wilhelm, 2018)
+PAPER_REPS = 1000
+PAPER_BOOTNUM = 100
+PAPER_TABLE_GRID = dict(models=("I", "II", "III"), ns=(200, 500),
+                        sigma_mes=(0.2, 0.5, 1.0), prob_mes=(0.25,))
+PAPER_POWER_GRID = dict(models=("I", "II", "III"), ns=(200,),
+                        sigma_mes=(0.5,), prob_mes=(0.0, 0.25, 0.5, 0.75, 1.0))
+
+DEFAULT_TASK_SIZE = 25
+
+# Early stopping of adaptive_rejection_rates
+DEFAULT_TARGET_SE = 0.01
+DEFAULT_BATCH = 50
+CONFIDENCE_Z = 2.576  # 99% Wilson intervals
+
+# Sources of the replication data, see simulate_pvalues
+DGPS = ("replication", "batch")
+# Spawn-key slot of the batch streams, above any replication index
+BATCH_STREAM = 2**32
+DGP_VARIABLES = 5
+# Bytes of the four (chunk x n) float64 arrays of one iter_simulate chunk
+DEFAULT_DGP_CHUNK_BYTES = 32 * 2**20
+
+
+def _model_name(model):
+    name = str(model).split(":")[0].strip().upper()
+    if name not in MODELS:
+        raise ValueError(f"model must be one of {MODELS}, got {model!r}")
+    return name
+
+
+def simulate(model, n, sigma_me, prob_me, rng):
+    """Draw one sample from Model I-IV.
+
+    Y = X*^2 + X*/2 + eps with X* ~ U(0, 1); X = X* + D * eta_X with
+    D ~ Bernoulli(1 - lambda) = Bernoulli(``prob_me``) flagging mismeasured
+    observations.  Returns (X, Y, Z, X*).
+    """
+    return _draw(model, n, sigma_me, prob_me, [rng] * DGP_VARIABLES)
+
+
+def _draw(model, size, sigma_me, prob_me, rngs):
+    # rngs: the streams of X*, D, eps, eta_X and the noise of Z, in draw order
+    model = _model_name(model)
+    x_star = rngs[0].uniform(0, 1, size)
+    d = rngs[1].binomial(1, prob_me, size)
+    sigma_eps = 0.2 if model == "IV" else 0.5
+    eps = rngs[2].normal(0, sigma_eps, size)
+    eta_x = rngs[3].normal(0, sigma_me, size)
+
+    if model == "IV":
+        z = -(x_star - 1) ** 2 + rngs[4].normal(0, 0.2, size)
+    else:
+        noise = rngs[4].normal(0, 0.3, size)
+        if model != "I":
+            scale = np.exp(-np.abs(x_star - 0.5))
+            eta_x = eta_x * scale
+            if model == "III":
+                noise = noise * scale
+        z = x_star + noise
+
+    x = x_star + d * eta_x
+    y = x_star**2 + 0.5 * x_star + eps
+    return x, y, z, x_star
+
+
+@dataclass(frozen=True)
+class Cell:
+    """One design point: model, sample size, sigma_ME and 1 - lambda."""
+
+    model: str
+    n: int
+    sigma_me: float
+    prob_me: float
+
+    def __post_init__(self):
+        object.__setattr__(self, "model", _model_name(self.model))
+
+    def seed_key(self):
+        return (MODELS.index(self.model), int(self.n),
+                int(round(self.sigma_me * 1e6)), int(round(self.prob_me * 1e6)))
+
+
+def grid(models=MODELS, ns=(200,), sigma_mes=(0.5,), prob_mes=(0.25,)):
+    """All cells of the Cartesian product of the design parameters."""
+    return [Cell(m, n, s, p) for m, n, s, p in itertools.product(models, ns, sigma_mes, prob_mes)]
+
+
+def replication_seed(seed, cell, rep):
+    return np.random.SeedSequence(seed, spawn_key=cell.seed_key() + (int(rep),))
+
+
+def batch_streams(seed, cell):
+    """Generators of the five model variables of the batch streams of ``cell``."""
+    root = np.random.SeedSequence(seed, spawn_key=cell.seed_key() + (BATCH_STREAM,))
+    return [np.random.default_rng(child) for child in root.spawn(DGP_VARIABLES)]
+
+
+def default_dgp_chunk(n):
+    return max(1, DEFAULT_DGP_CHUNK_BYTES // (4 * 8 * int(n)))
+
+
+def iter_simulate(model, n, sigma_me, prob_me, reps, seed=0, chunk_reps=None):
+    """Stream ``reps`` samples of a model as chunks ``(start, X, Y, Z, X*)``.
+
+    Every array is (rows, n), rows <= ``chunk_reps`` (default: about 32 MiB
+    per chunk), holding samples start, ..., start + rows - 1.  Sample r is
+    the same whatever the chunk size; see :func:`simulate_batch`.
+    """
+    cell = Cell(model, n, sigma_me, prob_me)
+    rngs = batch_streams(seed, cell)
+    chunk_reps = default_dgp_chunk(n) if chunk_reps is None else int(chunk_reps)
+    if chunk_reps < 1:
+        raise ValueError("chunk_reps must be positive")
+    for start in range(0, reps, chunk_reps):
+        rows = min(chunk_reps, reps - start)
+        yield (start,) + _draw(cell.model, (rows, cell.n), sigma_me, prob_me, rngs)
+
+
+def simulate_batch(model, n, sigma_me, prob_me, reps, seed=0):
+    """Draw ``reps`` samples of Model I-IV at once.
+
+    Returns (X, Y, Z, X*) as (reps, n) arrays, row r being sample r.  The
+    rows come from the batch streams of the cell under the integer ``seed``,
+    the same as those of :func:`iter_simulate`.
+    """
+    cell = Cell(model, n, sigma_me, prob_me)
+    return _draw(cell.model, (reps, cell.n), sigma_me, prob_me, batch_streams(seed, cell))
+
+
+def replicate(cell, rep, seed=0, statistic="CvM", data=None, **test_options):
+    """Bootstrap p-value of replication ``rep`` of ``cell``.
+
+    ``data`` = (X, Y, Z) replaces the replication's own sample; the bootstrap
+    draws are the replication's either way.
+    """
+    data_seed, boot_seed = replication_seed(seed, cell, rep).spawn(2)
+    if data is None:
+        x, y, z, _ = simulate(cell.model, cell.n, cell.sigma_me, cell.prob_me,
+                              np.random.default_rng(data_seed))
+    else:
+        x, y, z = data
+    result = dgmtest(y, x, z, statistic=statistic,
+                     seed=np.random.default_rng(boot_seed), **test_options)
+    return result.pvalue
+
+
+def _dgp_options(options, dgp):
+    if dgp not in DGPS:
+        raise ValueError(f"dgp must be one of {DGPS}, got {dgp!r}")
+    # The default is left out, so stored results keep their keys
+    return options if dgp == "replication" else dict(options, dgp=dgp)
+
+
+def _run_task(task):
+    cell, start, stop, seed, options = task
+    options = dict(options)
+    if options.pop("dgp", "replication") == "replication":
+        values = [replicate(cell, r, seed, **options) for r in range(start, stop)]
+        return cell, start, np.array(values)
+    # Rows before ``start`` are drawn and skipped, so row r does not depend on the task
+    values = []
+    for first, x, y, z, _ in iter_simulate(cell.model, cell.n, cell.sigma_me, cell.prob_me,
+                                           stop, seed):
+        for r in range(max(first, start), first + x.shape[0]):
+            i = r - first
+            values.append(replicate(cell, r, seed, data=(x[i], y[i], z[i]), **options))
+    return cell, start, np.array(values)
+
+
+def _context(mp_context):
+    if isinstance(mp_context, str):
+        return multiprocessing.get_context(mp_context)
+    return mp_context
+
+
+def simulate_pvalues(cells, reps=PAPER_REPS, bootnum=PAPER_BOOTNUM, statistic="CvM",
+                     seed=0, workers=None, task_size=DEFAULT_TASK_SIZE, store=None,
+                     progress=None, dgp="replication", mp_context=None, **test_options):
+    """p-values of ``reps`` replications for every cell.
+
+    Parameters
+    ----------
+    cells : iterable of Cell
+    reps, bootnum : int
+        Monte Carlo replications per cell and bootstrap draws per test.
+    statistic : {"CvM", "KS"}
+    seed : int
+        Root of all replication streams.
+    workers : int, optional
+        Worker processes (default: all cores); 1 runs in the calling process.
+    task_size : int
+        Replications per pool task (and per checkpoint shard).
+    store : ResultStore, optional
+        Loads replications computed by earlier runs with the same cell, seed
+        and options, and saves every finished task as it completes.
+    progress : callable, optional
+        Called as ``progress(replications_done, total)`` after every task.
+        If it raises, queued tasks are cancelled and the exception propagates;
+        tasks already saved to ``store`` are kept.
+    dgp : {"replication", "batch"}
+        Where replication r's sample comes from: its own stream, or row r of
+        the cell's batch streams (:func:`iter_simulate`), drawn a chunk of
+        rows at a time.
+    mp_context : str or multiprocessing context, optional
+        Start method of the worker processes, e.g. "spawn" when the caller
+        is a multi-threaded server, where forking is unsafe.
+    **test_options
+        Passed to :func:`measurementerror.dgm.dgmtest` (kernel, bw, ...).
+
+    Returns
+    -------
+    dict mapping each Cell to an array of ``reps`` p-values.
+    """
+    cells = list(cells)
+    options = _dgp_options(dict(test_options, bootnum=bootnum, statistic=statistic), dgp)
+    pvalues, keys, tasks = {}, {}, []
+    for cell in cells:
+        if store is None:
+            pvalues[cell] = np.full(reps, np.nan)
+        else:
+            keys[cell] = store.key(cell, seed, options)
+            pvalues[cell] = store.load(keys[cell], reps)
+        for start, stop in missing_runs(pvalues[cell], task_size):
+            tasks.append((cell, start, stop, seed, options))
+
+    total = reps * len(cells)
+    done = [total - sum(stop - start for _, start, stop, _, _ in tasks)]
+
+    def record(cell, start, values):
+        pvalues[cell][start:start + values.shape[0]] = values
+        if store is not None:
+            store.save(keys[cell], np.arange(start, start + values.shape[0]), values,
+                       cell, seed, options)
+        done[0] += values.shape[0]
+        if progress is not None:
+            progress(done[0], total)
+
+    if progress is not None:
+        progress(done[0], total)
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            record(*_run_task(task))
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                   mp_context=_context(mp_context))
+        try:
+            for future in as_completed([pool.submit(_run_task, task) for task in tasks]):
+                record(*future.result())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    return pvalues
+
+
+def rejection_rates(cells, reps=PAPER_REPS, bootnum=PAPER_BOOTNUM, level=0.05, **options):
+    """Rejection frequency at ``level`` for every cell, one row per cell."""
+    pvalues = simulate_pvalues(cells, reps, bootnum, **options)
+    rows = []
+    for cell, p in pvalues.items():
+        rows.append({"model": cell.model, "n": cell.n, "sigma_me": cell.sigma_me,
+                     "prob_me": cell.prob_me, "reps": reps,
+                     "rejection_rate": float(np.mean(p < level))})
+    return pd.DataFrame(rows)
+
+
+def paper_table(reps=PAPER_REPS, bootnum=PAPER_BOOTNUM, **options):
+    """Rejection probabilities at 1 - lambda = 0.25 in the layout of ``results_data``."""
+    rates = rejection_rates(grid(**PAPER_TABLE_GRID), reps, bootnum, **options)
+    table = rates.pivot_table(index=["n", "model"], columns="sigma_me",
+                              values="rejection_rate").reset_index()
+    table.columns = ["n", "النموذج"] + [f"σ_ME={s:.1f}" for s in table.columns[2:]]
+    return table
+
+
+def paper_power_curves(reps=PAPER_REPS, bootnum=PAPER_BOOTNUM, **options):
+    """Power against 1 - lambda (n = 200, sigma_ME = 0.5), one column per model."""
+    return power_curves(rejection_rates(grid(**PAPER_POWER_GRID), reps, bootnum, **options))
+
+
+def rate_interval(rejections, reps, z=CONFIDENCE_Z):
+    """Wilson score interval (low, high) of a rejection rate, (0, 1) without replications."""
+    if reps == 0:
+        return 0.0, 1.0
+    rate = rejections / reps
+    denom = 1 + z**2 / reps
+    center = (rate + z**2 / (2 * reps)) / denom
+    half = z * np.sqrt(rate * (1 - rate) / reps + z**2 / (4 * reps**2)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _rate_row(cell, p, level, stopped):
+    reps = p.shape[0]
+    rejections = int(np.sum(p < level))
+    rate = rejections / reps if reps else np.nan
+    low, high = rate_interval(rejections, reps)
+    return {"model": cell.model, "n": cell.n, "sigma_me": cell.sigma_me,
+            "prob_me": cell.prob_me, "reps": reps, "rejection_rate": rate,
+            "se": (high - low) / (2 * CONFIDENCE_Z), "ci_low": low, "ci_high": high,
+            "stopped": stopped}
+
+
+def adaptive_rejection_rates(cells, max_reps=PAPER_REPS, bootnum=PAPER_BOOTNUM, level=0.05,
+                             target_se=DEFAULT_TARGET_SE, batch=DEFAULT_BATCH,
+                             stop_outside_level=True, statistic="CvM", seed=0, workers=None,
+                             task_size=DEFAULT_TASK_SIZE, store=None, progress=None,
+                             dgp="replication", mp_context=None, **test_options):
+    """Rejection frequencies with replications added per cell until they are precise.
+
+    Every cell runs replications 0, 1, ... in batches of ``batch`` and stops
+    once, after a batch,
+
+    * the standard error of its rejection rate is at most ``target_se``, or
+    * with ``stop_outside_level``, the 99% interval excludes ``level``
+      (the test clearly has power, or clearly over-rejects),
+
+    or after ``max_reps`` replications.  The standard error is the half-width
+    of the Wilson interval over z, which unlike the plug-in binomial error
+    does not vanish at rates of 0 or 1.
+
+    Parameters
+    ----------
+    cells : iterable of Cell
+    max_reps, bootnum : int
+        Most replications per cell and bootstrap draws per test.
+    level : float
+        Nominal level of the test (the rejection threshold of the p-values).
+    target_se : float
+    batch : int
+        Replications added to a cell between two checks.
+    stop_outside_level : bool
+    statistic, seed, workers, task_size, store, dgp, mp_context, **test_options
+        As in :func:`simulate_pvalues`; replication ``r`` of a cell is the
+        same here, so a store is shared with fixed-size runs.
+    progress : callable, optional
+        Called as ``progress(replications_done, bound, rates)`` whenever a
+        batch is complete, with ``rates`` the table so far; ``bound`` shrinks
+        as cells stop.  Raising from it cancels queued tasks.
+
+    Returns
+    -------
+    DataFrame, one row per cell: rejection_rate, the replications it is
+    based on, se, the interval (ci_low, ci_high) and whether it stopped early.
+    """
+    cells = list(cells)
+    if batch < 1 or max_reps < 1:
+        raise ValueError("batch and max_reps must be positive")
+    options = _dgp_options(dict(test_options, bootnum=bootnum, statistic=statistic), dgp)
+    pvalues, keys = {}, {}
+    for cell in cells:
+        if store is None:
+            pvalues[cell] = np.full(max_reps, np.nan)
+        else:
+            keys[cell] = store.key(cell, seed, options)
+            pvalues[cell] = store.load(keys[cell], max_reps)
+    reps = dict.fromkeys(cells, 0)
+    goal = dict.fromkeys(cells, 0)
+    pending = dict.fromkeys(cells, 0)
+    stopped = dict.fromkeys(cells, False)
+    active = set(cells)
+
+    def rates():
+        return pd.DataFrame([_rate_row(cell, pvalues[cell][:reps[cell]], level, stopped[cell])
+                             for cell in cells])
+
+    def report():
+        if progress is not None:
+            done = sum(reps.values())
+            progress(done, done + sum(max_reps - reps[cell] for cell in active), rates())
+
+    def settled(cell):
+        if reps[cell] >= max_reps:
+            return True
+        if reps[cell] == 0:
+            return False
+        p = pvalues[cell][:reps[cell]]
+        rejections = int(np.sum(p < level))
+        low, high = rate_interval(rejections, reps[cell])
+        stopped[cell] = ((high - low) / (2 * CONFIDENCE_Z) <= target_se
+                         or (stop_outside_level and not low <= level <= high))
+        return stopped[cell]
+
+    def advance(cell):
+        # Tasks of the next batch of ``cell``; batches found in the store count at once
+        while not settled(cell):
+            goal[cell] = min(max_reps, reps[cell] + batch)
+            runs = missing_runs(pvalues[cell][:goal[cell]], task_size)
+            if runs:
+                pending[cell] = len(runs)
+                return [(cell, start, stop, seed, options) for start, stop in runs]
+            reps[cell] = goal[cell]
+        active.discard(cell)
+        return []
+
+    def record(cell, start, values):
+        pvalues[cell][start:start + values.shape[0]] = values
+        if store is not None:
+            store.save(keys[cell], np.arange(start, start + values.shape[0]), values,
+                       cell, seed, options)
+        pending[cell] -= 1
+        if pending[cell]:
+            return []
+        reps[cell] = goal[cell]
+        tasks = advance(cell)
+        report()
+        return tasks
+
+    tasks = [task for cell in cells for task in advance(cell)]
+    report()
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if workers <= 1:
+        while tasks:
+            tasks += record(*_run_task(tasks.pop(0)))
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=_context(mp_context))
+        try:
+            futures = {pool.submit(_run_task, task) for task in tasks}
+            while futures:
+                finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    futures |= {pool.submit(_run_task, task) for task in record(*future.result())}
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    return rates()
+
+
+def adaptive_power_curves(max_reps=PAPER_REPS, bootnum=PAPER_BOOTNUM, **options):
+    """:func:`adaptive_rejection_rates` on the design of :func:`paper_power_curves`."""
+    return adaptive_rejection_rates(grid(**PAPER_POWER_GRID), max_reps, bootnum, **options)
+
+
+def power_curves(rates, column="rejection_rate"):
+    """``column`` of a rejection-rate table against 1 - lambda, one column per model."""
+    return rates.pivot_table(index="prob_me", columns="model", values=column)
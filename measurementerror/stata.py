@@ -0,0 +1,263 @@
+"""
+واجهة متوافقة مع أمر dgmtest في Stata
+Stata ``dgmtest`` option surface and report
+
+Lee & Wilhelm (2019) ship the test as the Stata command
+
+    dgmtest depvar expvar1 expvar2 [W1 vars] [, test() kernel() bw() bootnum() bootdist()]
+
+with Y = depvar, X = expvar1, Z = expvar2.  :func:`parse_command` reads such a
+line, :func:`stata_options` maps the Stata option names and spellings
+(``test(ks)``, ``kernel(rectangle)``, ``bootdist(normal)``, ...) to the
+arguments of :func:`measurementerror.dgm.dgmtest`, and :func:`report` prints
+a result in the layout of the Stata log, numbers in Stata's ``%9.0g``
+display format, so logs of both can be diffed line by line.
+
+:func:`parse_report` reads the numbers back from such a log and
+:func:`compare_report` sets a Stata log against a Python result: n, the
+bandwidth and the statistic are deterministic and must agree to the printed
+digits; the critical values and p-value come from different random draws
+and are only listed side by side.
+"""
+
+import math
+import re
+import shlex
+
+from .dgm import LEVELS, _statistic_name
+
+# Stata spellings (kdensity's kernel names included) of the engine's options
+STATA_KERNELS = {
+    "epanechnikov": "epanechnikov",
+    "epan": "epanechnikov",
+    "gaussian": "gaussian",
+    "normal": "gaussian",
+    "rectangle": "uniform",
+    "uniform": "uniform",
+    "triangle": "triangular",
+    "triangular": "triangular",
+    "biweight": "biweight",
+}
+STATA_BOOTDIST = {
+    "mammen": "mammen",
+    "rademacher": "rademacher",
+    "normal": "gaussian",
+    "gaussian": "gaussian",
+}
+# Option names accepted in a command line, and what they set
+STATA_OPTION_NAMES = {"test": "test", "kernel": "kernel", "bw": "bw", "bootnum": "bootnum",
+                      "bootdist": "bootdist", "multiplier": "bootdist"}
+# Lee & Wilhelm's example on PSID earnings, and the log Stata prints for it
+EXAMPLE_COMMAND = "dgmtest repearn77 ssearn77 ssearn76, bootnum(5000)"
+EXAMPLE_LOG = """\
+-----------------------------------------------------
+ Delgado and Manteiga test
+-----------------------------------------------------
+H0: E[Y | X,W1,Z] = E[Y | X,W1]
+
+----- parameter settings -----
+Test statistic: CvM (default)
+Kernel: epanechnikov (default)
+bw = n^(1/3q) (default)
+bootstrap multiplier distribution: mammen (default)
+
+number of observations: 2682
+bandwidth: .07197479
+
+----- test results -----
+CvM = .51238949
+bootstrap critical value at 1%: .63053938
+bootstrap critical value at 5%: .41803533
+bootstrap critical value at 10%: .33279162
+p(CvM < CvM*) = .0262
+"""
+# Width of Stata's %9.0g display format
+DISPLAY_WIDTH = 9
+RULE = "-" * 53
+
+
+def stata_options(test="cvm", kernel="epanechnikov", bw=None, bootnum=1000,
+                  bootdist="mammen"):
+    """Arguments of :func:`measurementerror.dgm.dgmtest` for the Stata options.
+
+    Parameters
+    ----------
+    test : {"cvm", "ks"}
+    kernel : str
+        A key of :data:`STATA_KERNELS`.
+    bw : float or str, optional
+        Bandwidth; defaults to n^(-1/(3q)) as in Stata.  Names of the
+        selectors of :mod:`measurementerror.bandwidth` are passed through.
+    bootnum : int
+    bootdist : str
+        A key of :data:`STATA_BOOTDIST`.
+
+    Returns
+    -------
+    dict with keys statistic, kernel, bw, bootnum, multiplier
+    """
+    try:
+        kernel_name = STATA_KERNELS[str(kernel).lower()]
+    except KeyError:
+        raise ValueError(f"unknown kernel({kernel}); choose one of "
+                         f"{', '.join(STATA_KERNELS)}") from None
+    try:
+        multiplier = STATA_BOOTDIST[str(bootdist).lower()]
+    except KeyError:
+        raise ValueError(f"unknown bootdist({bootdist}); choose one of "
+                         f"{', '.join(STATA_BOOTDIST)}") from None
+    if isinstance(bw, str):
+        try:
+            bw = float(bw)
+        except ValueError:
+            bw = bw.lower()
+    bootnum = int(bootnum)
+    if bootnum < 1:
+        raise ValueError("bootnum() must be positive")
+    return {"statistic": _statistic_name(test), "kernel": kernel_name, "bw": bw,
+            "bootnum": bootnum, "multiplier": multiplier}
+
+
+def parse_command(command):
+    """Variables and options of a ``dgmtest`` command line.
+
+    Returns
+    -------
+    (y, x, z, w, options)
+        Column names (``w`` a possibly empty list) and the keyword
+        arguments of :func:`stata_options`.
+    """
+    varlist, _, options_text = command.partition(",")
+    words = shlex.split(varlist)
+    if words and words[0] == "dgmtest":
+        words = words[1:]
+    if len(words) < 3:
+        raise ValueError("dgmtest needs depvar, expvar1 and expvar2")
+    options = {}
+    for name, value in re.findall(r"(\w+)\s*(?:\(([^)]*)\))?", options_text):
+        try:
+            key = STATA_OPTION_NAMES[name.lower()]
+        except KeyError:
+            raise ValueError(f"option {name}() not allowed; choose from "
+                             f"{', '.join(STATA_OPTION_NAMES)}") from None
+        if not value.strip():
+            raise ValueError(f"option {name}() needs a value")
+        options[key] = value.strip()
+    return words[0], words[1], words[2], words[3:], options
+
+
+def stata_number(value, width=DISPLAY_WIDTH):
+    """``value`` as Stata displays it in ``%9.0g`` (``width`` columns).
+
+    As in C's ``%g``, values under 1e-4 in magnitude, or whose integer part
+    does not fit, are printed in e-notation with a sign column and as many
+    mantissa digits as fit (1e-5 is ``1.00e-05``); the others in fixed
+    notation with as many digits as fit, trailing zeros and the leading
+    zero dropped (``.0262``).
+    """
+    value = float(value)
+    if not math.isfinite(value):
+        return "."
+    if value == 0:
+        return "0"
+    if abs(value) >= 1e-4:
+        room = width - (value < 0)
+        digits = len(str(int(abs(value))).lstrip("0"))
+        if digits <= room:
+            text = f"{value:.{max(room - digits - 1, 0)}f}"
+            if "." in text:
+                text = text.rstrip("0").rstrip(".")
+            text = text.replace("0.", ".", 1) if text.lstrip("-").startswith("0.") else text
+            if len(text) <= width:
+                return text
+    exponent = f"{value:e}".partition("e")[2]
+    # A sign column, "d.", "e" and the exponent; the mantissa digits fill the rest
+    places = max(width - 4 - len(exponent), 0)
+    return f"{value:.{places}e}"
+
+
+def _default(value, default):
+    return " (default)" if value == default else ""
+
+
+def report(result, bw=None):
+    """The Stata ``dgmtest`` log of ``result``; ``bw`` is the bandwidth option it was run with."""
+    stat = result.statistic
+    if bw is None:
+        bw_line = "bw = n^(1/3q) (default)"
+    elif isinstance(bw, str):
+        bw_line = f"bw: {bw}"
+    else:
+        bw_line = f"bw = {stata_number(bw)}"
+    lines = [
+        RULE,
+        " Delgado and Manteiga test",
+        RULE,
+        "H0: E[Y | X,W1,Z] = E[Y | X,W1]",
+        "",
+        "----- parameter settings -----",
+        f"Test statistic: {stat}{_default(stat, 'CvM')}",
+        f"Kernel: {result.kernel}{_default(result.kernel, 'epanechnikov')}",
+        bw_line,
+        f"bootstrap multiplier distribution: {result.multiplier}"
+        f"{_default(result.multiplier, 'mammen')}",
+        "",
+        f"number of observations: {result.n}",
+        f"bandwidth: {stata_number(result.bandwidth)}",
+        "",
+        "----- test results -----",
+        f"{stat} = {stata_number(result.value)}",
+    ]
+    for level in LEVELS:
+        lines.append(f"bootstrap critical value at {round(level * 100)}%: "
+                     f"{stata_number(result.critical_value(level))}")
+    lines.append(f"p({stat} < {stat}*) = {stata_number(result.pvalue)}")
+    return "\n".join(lines) + "\n"
+
+
+_NUMBER = r"(-?[0-9]*\.?[0-9]+(?:e[-+]?[0-9]+)?)"
+_REPORT_FIELDS = {
+    "n": rf"number of observations:\s*{_NUMBER}",
+    "bandwidth": rf"bandwidth:\s*{_NUMBER}",
+    "value": rf"^\s*(?:CvM|KS)\s*=\s*{_NUMBER}",
+    "critical_1": rf"critical value at 1%:\s*{_NUMBER}",
+    "critical_5": rf"critical value at 5%:\s*{_NUMBER}",
+    "critical_10": rf"critical value at 10%:\s*{_NUMBER}",
+    "pvalue": rf"p\((?:CvM|KS) < (?:CvM|KS)\*\)\s*=\s*{_NUMBER}",
+}
+# Quantities that do not depend on the bootstrap draws
+DETERMINISTIC = ("n", "bandwidth", "value")
+
+
+def parse_report(text):
+    """Numbers of a ``dgmtest`` log (Stata's or :func:`report`'s), by field name."""
+    values = {}
+    for field, pattern in _REPORT_FIELDS.items():
+        match = re.search(pattern, text, flags=re.MULTILINE)
+        if match is not None:
+            values[field] = float(match.group(1))
+    statistic = re.search(r"^\s*(CvM|KS)\s*=", text, flags=re.MULTILINE)
+    if statistic is not None:
+        values["statistic"] = statistic.group(1)
+    return values
+
+
+def compare_report(text, result):
+    """Rows (field, stata, python, match) of a Stata log against ``result``.
+
+    ``match`` is True or False for the deterministic fields, compared at the
+    precision of the log, and None for the bootstrap quantities.
+    """
+    stata = parse_report(text)
+    ours = parse_report(report(result))
+    rows = []
+    for field in _REPORT_FIELDS:
+        if field not in stata:
+            continue
+        match = None
+        if field in DETERMINISTIC:
+            match = stata_number(stata[field]) == stata_number(ours[field])
+        rows.append({"field": field, "stata": stata[field], "python": ours[field],
+                     "match": match})
+    return rows
+
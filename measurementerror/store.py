@@ -0,0 +1,94 @@
+"""
+مخزن نتائج مونت كارلو على القرص مع الاستئناف بعد الانقطاع
+On-disk, resumable store for Monte Carlo replication results
+
+Each design cell gets a directory named by a hash of everything that
+determines its results (cell parameters, root seed, test options).  Finished
+tasks are written as NPZ shards holding the replication indices and their
+p-values; a shard is first written to a temporary name and then renamed, so
+a crash never leaves a half-written shard behind.  On restart the runner
+loads the shards, and only the replications still missing are recomputed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MEASUREMENTERROR_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "measurementerror"),
+)
+
+
+def _canonical(payload):
+    return json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+
+
+class ResultStore:
+    """Directory of per-cell NPZ shards of Monte Carlo results.
+
+    Layout::
+
+        <root>/<cell key>/cell.json
+        <root>/<cell key>/reps_<start>_<stop>.npz   (arrays ``reps``, ``pvalues``)
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.join(DEFAULT_CACHE_DIR, "montecarlo") if root is None else root
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, cell, seed, options):
+        """Hash of the cell, the root seed and the test options."""
+        payload = {"cell": asdict(cell), "seed": seed, "options": options}
+        return hashlib.sha256(_canonical(payload).encode()).hexdigest()[:24]
+
+    def _cell_dir(self, key, cell=None, seed=None, options=None):
+        path = os.path.join(self.root, key)
+        if cell is not None and not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, "cell.json"), "w") as fh:
+                fh.write(_canonical({"cell": asdict(cell), "seed": seed, "options": options}))
+        return path
+
+    def load(self, key, reps):
+        """p-values of replications 0..reps-1 found on disk; NaN where missing."""
+        values = np.full(reps, np.nan)
+        path = os.path.join(self.root, key)
+        if not os.path.isdir(path):
+            return values
+        for name in os.listdir(path):
+            if not (name.startswith("reps_") and name.endswith(".npz")):
+                continue
+            with np.load(os.path.join(path, name)) as shard:
+                idx, p = shard["reps"], shard["pvalues"]
+            keep = idx < reps
+            values[idx[keep]] = p[keep]
+        return values
+
+    def save(self, key, reps, pvalues, cell=None, seed=None, options=None):
+        """Persist one finished task (replication indices ``reps``)."""
+        path = self._cell_dir(key, cell, seed, options)
+        reps = np.asarray(reps, dtype=np.int64)
+        name = f"reps_{reps.min()}_{reps.max() + 1}.npz"
+        fd, tmp = tempfile.mkstemp(dir=path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            np.savez(fh, reps=reps, pvalues=np.asarray(pvalues, dtype=np.float64))
+        os.replace(tmp, os.path.join(path, name))
+
+
+def missing_runs(values, task_size):
+    """Split the NaN positions of ``values`` into contiguous runs of <= task_size."""
+    todo = np.flatnonzero(np.isnan(values))
+    if todo.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(todo) != 1) + 1
+    runs = []
+    for run in np.split(todo, breaks):
+        for start in range(0, run.size, task_size):
+            part = run[start:start + task_size]
+            runs.append((int(part[0]), int(part[-1]) + 1))
+    return runs
@@ -0,0 +1,203 @@
+"""
+تشغيل الاختبار على عينات فرعية متداخلة في تمريرة واحدة
+Run the DGM test on a list of (nested) subsamples in one pass
+
+The empirical application reports the test on eight subsamples of the CPS
+match file, each row adding one restriction to the previous one.  Here every
+subgroup is fitted once (kernel and indicator passes, influence matrix when it
+fits), and a single stream of multipliers is then drawn for the rows of the
+*whole* dataset, chunk by chunk; each subgroup reads its own columns of every
+chunk.  Observation i therefore carries the same V_i in every subgroup that
+contains it, so nested rows are bootstrapped with common draws, and the
+multipliers are generated once rather than once per row.
+
+All fits stay alive until the last chunk, so ``influence_bytes``, and a
+``memory_budget``, are split evenly between the subgroups: eight CPS rows
+hold at most one default influence allowance between them, not eight.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .bootstrap import bootstrap_statistics, get_multiplier, iter_multipliers
+from .dgm import (DEFAULT_BLOCK_BYTES, DEFAULT_INFLUENCE_BYTES, DEFAULT_GAUSSIAN_TOL,
+                  _fit, _statistic_name)
+from .memory import MemoryTracker
+
+
+@dataclass(frozen=True)
+class Subgroup:
+    """A named row restriction.
+
+    ``condition`` is None (all rows), a boolean array over the rows of the
+    dataset, a pandas ``eval`` expression such as ``"age >= 25 & age <= 65"``,
+    or a callable mapping a DataFrame to a boolean mask.  With ``nested`` the
+    condition is evaluated on the rows of the previous subgroup only (the
+    "+ ..." rows of the paper), so quantile-based restrictions such as
+    :func:`in_iqr` use that subgroup's quantiles.
+    """
+
+    name: str
+    condition: object = None
+    nested: bool = False
+
+
+def in_iqr(column):
+    """Condition keeping rows with ``column`` between its 25th and 75th percentiles."""
+    def condition(frame):
+        lo, hi = frame[column].quantile([0.25, 0.75])
+        return frame[column].between(lo, hi)
+    return condition
+
+
+def cps_subgroups(earnings, white, male, single, age, full_time, high_school):
+    """The eight subsamples of the empirical application, from column names.
+
+    ``white``, ``male``, ``single``, ``full_time`` and ``high_school`` are
+    0/1 indicator columns, ``age`` is in years and ``earnings`` is the
+    earnings column whose interquartile range defines the IQR rows.
+    """
+    return [
+        Subgroup("العينة الكاملة"),
+        Subgroup("الأجور في IQR", in_iqr(earnings)),
+        Subgroup("الذكور البيض", f"`{white}` == 1 & `{male}` == 1"),
+        Subgroup("+ أعزب", f"`{single}` == 1", nested=True),
+        Subgroup("+ عمر [25,65]", f"`{age}` >= 25 & `{age}` <= 65", nested=True),
+        Subgroup("+ دوام كامل (*)", f"`{full_time}` == 1", nested=True),
+        Subgroup("+ ثانوية فأكثر", f"`{high_school}` == 1", nested=True),
+        Subgroup("+ أجور في IQR", in_iqr(earnings), nested=True),
+    ]
+
+
+def _mask(frame, condition):
+    if condition is None:
+        return np.ones(len(frame), dtype=bool)
+    if isinstance(condition, str):
+        mask = frame.eval(condition)
+    elif callable(condition):
+        mask = condition(frame)
+    else:
+        mask = condition
+    mask = np.asarray(mask)
+    if mask.dtype != bool or mask.shape != (len(frame),):
+        raise ValueError("a subgroup condition must give one boolean per row")
+    return mask
+
+
+def subgroup_masks(frame, subgroups):
+    """Boolean row mask of every subgroup, in order."""
+    masks = []
+    for group in subgroups:
+        if group.nested:
+            if not masks:
+                raise ValueError(f"subgroup {group.name!r} is nested but comes first")
+            parent = masks[-1]
+            mask = np.zeros(len(frame), dtype=bool)
+            mask[parent] = _mask(frame[parent], group.condition)
+        else:
+            mask = _mask(frame, group.condition)
+        masks.append(mask)
+    return masks
+
+
+def _columns(names):
+    return [names] if isinstance(names, str) else list(names)
+
+
+def subgroup_tests(data, y, x, z, subgroups, w=None, statistic="CvM",
+                   kernel="epanechnikov", bw=None, bootnum=1000, multiplier="mammen",
+                   seed=None, method="auto", smoothing="auto",
+                   gaussian_tol=DEFAULT_GAUSSIAN_TOL, grid_size=None, chunk_size=None,
+                   block_bytes=DEFAULT_BLOCK_BYTES, influence_bytes=DEFAULT_INFLUENCE_BYTES,
+                   memory_budget=None, measure_memory=False, progress=None):
+    """Test H0: E[Y | X, W1, Z] = E[Y | X, W1] on every subgroup.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame or mapping of columns
+    y, x, z : str or list of str
+        Column names of the outcome, regressors and second measurement.
+    subgroups : list of Subgroup
+    w : str or list of str, optional
+        W1 covariates, conditioned on together with X.
+    bw : float, optional
+        Bandwidth in standard deviations of X within each subgroup; defaults
+        to the rule of thumb for each subgroup's n.
+    seed : int, str or numpy.random.Generator, optional
+        Seed of the shared multiplier stream; a string names a cached stream
+        (see :func:`measurementerror.dgm.dgmtest`).
+    influence_bytes : int
+        Influence-matrix allowance of the whole call, split evenly between
+        the subgroups since all their matrices are held at once.
+    memory_budget : int or str, optional
+        Ceiling of the whole call; each subgroup's fit is planned within an
+        even share of it.
+    progress : callable, optional
+        ``progress(draws_done, bootnum)``, called after every subgroup's fit
+        and as the shared bootstrap advances (see :mod:`measurementerror.jobs`).
+    Other options as in :func:`measurementerror.dgm.dgmtest`.
+
+    Rows with a missing Y, X, Z or W1 are dropped before the subgroups are
+    formed.
+
+    Returns
+    -------
+    dict mapping each subgroup name to its DGMResult, in order.
+    """
+    statistic = _statistic_name(statistic)
+    get_multiplier(multiplier)
+    frame = pd.DataFrame(data)
+    w_cols = [] if w is None else _columns(w)
+    used = _columns(y) + _columns(x) + w_cols + _columns(z)
+    complete = np.isfinite(frame[used].to_numpy(dtype=np.float64)).all(axis=1)
+    frame = frame[complete].reset_index(drop=True)
+
+    names = [group.name for group in subgroups]
+    if len(set(names)) != len(names):
+        raise ValueError("subgroup names must be unique")
+    share = max(len(subgroups), 1)
+    rows, fits = [], []
+    with MemoryTracker(memory_budget, trace=measure_memory or None) as tracker:
+        for group, mask in zip(subgroups, subgroup_masks(frame, subgroups)):
+            part = frame[mask]
+            if len(part) < 2:
+                raise ValueError(f"subgroup {group.name!r} has fewer than 2 observations")
+            rows.append(np.flatnonzero(mask))
+            budget = None if tracker.budget is None else tracker.budget // share
+            with MemoryTracker(budget) as part_tracker:
+                fits.append(_fit(part[_columns(y)].to_numpy(np.float64),
+                                 part[_columns(x)].to_numpy(np.float64),
+                                 part[_columns(z)].to_numpy(np.float64), kernel, bw, method,
+                                 smoothing, gaussian_tol, grid_size, block_bytes,
+                                 influence_bytes // share,
+                                 part[w_cols].to_numpy(np.float64) if w_cols else None,
+                                 part_tracker, chunk_size))
+            if progress is not None:
+                progress(0, bootnum)
+        if tracker.budget is not None:
+            chunk_size = min(fit.chunk_size for fit in fits)
+
+        boot = [(np.empty(bootnum), np.empty(bootnum)) for _ in fits]
+        start = 0
+        for v in iter_multipliers(len(frame), bootnum, multiplier, seed, chunk_size):
+            stop = start + v.shape[0]
+            for fit, idx, (boot_cvm, boot_ks) in zip(fits, rows, boot):
+                boot_cvm[start:stop], boot_ks[start:stop] = bootstrap_statistics(
+                    fit.apply(v[:, idx]))
+            start = stop
+            if progress is not None:
+                progress(stop, bootnum)
+
+    return {name: fit.result(boot_cvm, boot_ks, kernel, multiplier, statistic, tracker.peak)
+            for name, fit, (boot_cvm, boot_ks) in zip(names, fits, boot)}
+
+
+def subgroup_table(results, level=0.05):
+    """One row per subgroup with the columns of the empirical results table."""
+    return pd.DataFrame([
+        {"العينة": name, "إحصائية الاختبار": r.value, "p-value": r.pvalue,
+         f"القيمة الحرجة {level:.0%}": r.critical_value(level), "حجم العينة": r.n}
+        for name, r in results.items()
+    ])
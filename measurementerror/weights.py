@@ -0,0 +1,98 @@
+"""
+ذاكرة تخزين مؤقت لأوزان Bootstrap المضاعف بمفاتيح قابلة للمشاركة
+On-disk cache of multiplier-bootstrap weights under named seeds
+
+A seed given as a string names a stream of multipliers: the B x n matrix V
+is drawn from a Philox generator seeded by ``SeedSequence`` with the SHA-256
+digest of the name, written once to ``<cache>/multipliers`` as a ``.npy``
+file and then memory-mapped read-only, so every test, bandwidth sweep or
+subgroup run under the same (distribution, n, seed) reads the very same
+draws as zero-copy views, in this session or a later one, on any machine.
+
+Rows are drawn one after the other from the one generator, so the first B
+rows do not depend on how many were stored: a file serves every B up to
+its own, and a request for more rows replaces it with a longer one.  Files
+are written under a temporary name and renamed, like the shards of
+:mod:`measurementerror.store`.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from .bootstrap import get_multiplier
+from .store import DEFAULT_CACHE_DIR
+
+# Rows drawn and written at a time while a file is generated
+GENERATE_ROWS = 256
+
+
+def seed_sequence(name):
+    """SeedSequence of the named stream ``name``."""
+    digest = hashlib.sha256(name.encode()).digest()
+    return np.random.SeedSequence(int.from_bytes(digest, "little"))
+
+
+def generate(multiplier, n, bootnum, name, out=None):
+    """Draw the (bootnum, n) multipliers of the named stream, into ``out`` if given."""
+    draw = get_multiplier(multiplier)
+    rng = np.random.Generator(np.random.Philox(seed_sequence(name)))
+    out = np.empty((bootnum, n)) if out is None else out
+    for start in range(0, bootnum, GENERATE_ROWS):
+        stop = min(start + GENERATE_ROWS, bootnum)
+        out[start:stop] = draw(rng, (stop - start, n))
+    return out
+
+
+class WeightCache:
+    """Directory of memory-mapped multiplier matrices, one per (distribution, n, seed).
+
+    Layout::
+
+        <root>/<distribution>_<n>_<hash of the seed name>.npy
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.join(DEFAULT_CACHE_DIR, "multipliers") if root is None else root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, multiplier, n, name):
+        digest = hashlib.sha256(name.encode()).hexdigest()[:24]
+        return os.path.join(self.root, f"{multiplier.lower()}_{int(n)}_{digest}.npy")
+
+    def get(self, multiplier, n, bootnum, name):
+        """Read-only (bootnum, n) view of the named stream, generated on first use."""
+        if not name:
+            raise ValueError("a named seed must be a non-empty string")
+        get_multiplier(multiplier)
+        path = self.path(multiplier, n, name)
+        if os.path.exists(path):
+            matrix = np.load(path, mmap_mode="r")
+            if matrix.shape[0] >= bootnum:
+                return matrix[:bootnum]
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64,
+                                            shape=(bootnum, int(n)))
+            generate(multiplier, int(n), bootnum, name, out)
+            out.flush()
+            del out
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return np.load(path, mmap_mode="r")[:bootnum]
+
+
+_default_cache = None
+
+
+def default_cache():
+    """The cache under ``MEASUREMENTERROR_CACHE`` (default ~/.cache/measurementerror)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = WeightCache()
+    return _default_cache